@@ -1,21 +1,93 @@
+from startup import PROFILE_FLAG, LazyModule, StartupProfile, is_profiled_child, preload, print_startup_report, profile_startup
 import tkinter as tk
 from tkinter import messagebox, ttk, filedialog, simpledialog
-import requests
-from git import Repo, GitCommandError, InvalidGitRepositoryError
 import os
-from PIL import Image, ImageTk
-from io import BytesIO
-import urllib.parse
-import webbrowser
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from app_paths import cache_dir
+from task_runner import TaskRunner, current_task
+from virtual_list import VirtualList
+from repo_search import RepoSearchIndex
+from rate_limit import RateLimitExceeded
+from tracing import tracer
+
+# La ventana del token sólo necesita Tk: requests, GitPython y Pillow (y el
+# núcleo que los usa) se importan la primera vez que hacen falta
+requests = LazyModule('requests')
+git = LazyModule('git')
+ImageTk = LazyModule('PIL.ImageTk')
+webbrowser = LazyModule('webbrowser')
+repo_manager = LazyModule('repo_manager')
+image_cache = LazyModule('image_cache')
+git_handles = LazyModule('git_handles')
+git_clone = LazyModule('git_clone')
+bulk_sync = LazyModule('bulk_sync')
+snapshot = LazyModule('snapshot')
+
+# Se importan en segundo plano en cuanto se muestra la ventana del token
+PRELOAD_MODULES = ('repo_manager', 'image_cache', 'PIL.ImageTk', 'git_clone', 'webbrowser')
+
+# Espera tras la última tecla antes de filtrar la lista
+SEARCH_DEBOUNCE_MS = 150
+# Cada cuánto se buscan clones nuevos en las carpetas de trabajo
+WORKSPACE_REFRESH_MS = 30000
+# Refresco del panel de tiempos y acciones que muestra como mucho
+TIMING_REFRESH_MS = 1000
+TIMING_MAX_ACTIONS = 200
+# Cada cuánto se actualiza la antigüedad de los datos de la instantánea
+SNAPSHOT_AGE_REFRESH_MS = 30000
 
 class GitHubRepoManager:
     
-    def __init__(self, master):
+    def __init__(self, master, preload_modules=True):
         self.master = master
         master.title("Gestor de Repositorios GitHub")
-        self.token = ""
+        # Núcleo de operaciones de GitHub y git (repo_manager.RepoManager),
+        # compartido con la línea de comandos; se crea en load_core()
+        self.core = None
+        self.core_lock = threading.Lock()
+        self.api = self.store = self.workspace = self.images = None
+        self.git_processes = None
+        # Todo el trabajo de red y git se ejecuta fuera del hilo de Tk
+        self.tasks = TaskRunner(master, error_handler=self.show_task_error)
+        self.tasks.add_listener(self.update_activity_indicator)
+        self.tasks.add_listener(self.update_quota_label)
+        self.activity_label = None
+        self.quota_label = None
+        self.snapshot_label = None
+        self.snapshot_after_id = None
+        self.workspace_after_id = None
+        self.load_task = None
+        self.repos = []
+        self.search_index = RepoSearchIndex()
+        self.search_after_id = None
+        self.use_graphql = tk.BooleanVar(value=True)
         self.setup_initial_ui()
-        
+        if preload_modules:
+            preload(PRELOAD_MODULES)
+
+    def load_core(self):
+        # Crea el núcleo la primera vez (importa requests y GitPython y lee
+        # las cachés y el índice de clones del disco); se llama desde un worker
+        with self.core_lock:
+            if self.core is not None:
+                return self.core
+            core = repo_manager.RepoManager(snapshot=True)
+            # Cliente HTTP, metadatos de repositorios y clones locales del núcleo
+            self.api = core.client
+            self.store = core.store
+            self.workspace = core.workspace
+            # Avatares cacheados en disco y en memoria, decodificados fuera del hilo de Tk
+            self.images = image_cache.ImageCache(self.api, directory=cache_dir('images'))
+            # GITAPP_COUNT_GIT=1 muestra en consola los procesos git de cada acción
+            if os.environ.get('GITAPP_COUNT_GIT'):
+                self.git_processes = git_handles.ProcessCounter(verbose=True)
+                self.git_processes.install()
+            self.core = core
+            return core
+
     def center_window(self, window, width, height):
         screen_width = window.winfo_screenwidth()
         screen_height = window.winfo_screenheight()
@@ -34,25 +106,119 @@ class GitHubRepoManager:
         self.token_entry = ttk.Entry(self.frame, width=50, show="*")
         self.token_entry.grid(column=1, row=0, sticky=(tk.W, tk.E), pady=5)
 
-        ttk.Button(self.frame, text="Verificar Token", command=self.verify_token).grid(column=1, row=1, sticky=tk.E, pady=5)
+        self.verify_button = ttk.Button(self.frame, text="Verificar Token", command=self.verify_token)
+        self.verify_button.grid(column=1, row=1, sticky=tk.E, pady=5)
         
         self.center_window(self.master, 420, 80)  # Centrar la ventana inicial
 
-    def verify_token(self):
-        self.token = self.token_entry.get()
-        headers = {
-            'Authorization': f'token {self.token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        response = requests.get('https://api.github.com/user', headers=headers)
-        
-        if response.status_code == 200:
-            user_data = response.json()
-            self.setup_main_ui(user_data)
+    def show_task_error(self, error):
+        messagebox.showerror("Error", f"Ocurrió un error: {str(error)}")
+
+    def update_activity_indicator(self, tasks):
+        # Indicador de operaciones en curso en la ventana principal
+        if self.activity_label is None or not self.activity_label.winfo_exists():
+            return
+        if tasks:
+            descriptions = [task.description for task in tasks if task.description]
+            text = f"{len(tasks)} operación(es) en curso"
+            if descriptions:
+                text += ": " + ", ".join(descriptions[:3])
+            self.activity_label.config(text=text)
+            self.activity_bar.grid()
+            self.activity_bar.start(10)
+            self.cancel_button.grid()
         else:
-            messagebox.showerror("Error", "Token inválido o error de autenticación")
+            self.activity_label.config(text="")
+            self.activity_bar.stop()
+            self.activity_bar.grid_remove()
+            self.cancel_button.grid_remove()
+
+    def update_quota_label(self, *args):
+        # Cuota restante de la API según las últimas cabeceras X-RateLimit-*
+        if self.quota_label is None or not self.quota_label.winfo_exists():
+            return
+        budget = self.api.rate_limit()
+        if not budget or budget['remaining'] is None:
+            return
+        text = f"API: {max(budget['remaining'], 0)}/{budget['limit']}"
+        if budget['blocked_until'] > time.time():
+            text += f" (en espera hasta {time.strftime('%H:%M:%S', time.localtime(budget['blocked_until']))})"
+        elif budget['reset_at']:
+            text += f" (reinicio {time.strftime('%H:%M', time.localtime(budget['reset_at']))})"
+        self.quota_label.config(text=text)
+
+    def load_avatar(self, parent, avatar_url, size, place):
+        # Descarga y decodifica el avatar en segundo plano; place(label) lo coloca
+        if not avatar_url:
+            return
+
+        def show_avatar(img):
+            if not parent.winfo_exists():
+                return
+            photo = ImageTk.PhotoImage(img)
+            avatar_label = ttk.Label(parent, image=photo)
+            avatar_label.image = photo
+            place(avatar_label)
+
+        self.tasks.submit(self.images.load_thumbnail, avatar_url, size, on_success=show_avatar,
+                          on_error=lambda e: print(f"No se pudo cargar el avatar: {e}"),
+                          description="Cargando avatar")
+
+    def verify_token(self):
+        self.verify_button.config(state='disabled')
+        token = self.token_entry.get()
+        # Si hay instantánea de este token la ventana principal se muestra
+        # con ella antes de que responda GitHub y después se revalida
+        cached = []
+
+        def show_cached(account):
+            cached.append(account)
+            self.setup_main_ui(account.user, account)
+
+        def on_verified(user_data):
+            if not cached:
+                self.setup_main_ui(user_data)
+                return
+            self.user_name = user_data.get('name') or user_data.get('login', 'Usuario')
+            self.welcome_label.config(text=f"Bienvenido, {self.user_name}")
+            self.revalidate_repos(cached[0].saved_at)
+
+        def on_error(e):
+            if cached and not isinstance(e, repo_manager.AuthenticationError):
+                # Sin conexión (o GitHub no responde): se sigue con la instantánea
+                self.show_snapshot_age(cached[0].saved_at, offline=True)
+                return
+            if cached:
+                self.core.forget_account(token)
+                self.setup_token_ui()
+            self.verify_button.config(state='normal')
+            if isinstance(e, repo_manager.ManagerError):
+                messagebox.showerror("Error", "Token inválido o error de autenticación")
+            else:
+                messagebox.showerror("Error", f"No se pudo conectar con GitHub: {str(e)}")
+
+        def login(token):
+            core = self.load_core()
+            account = core.cached_account(token)
+            if account is not None:
+                current_task().report(show_cached, account)
+            return core.login(token)
+
+        self.tasks.submit(login, token, on_success=on_verified,
+                          on_error=on_error, description="Verificando token")
+
+    def setup_token_ui(self):
+        # Vuelta a la ventana del token (el token de la instantánea ya no es válido)
+        for after_id in (self.workspace_after_id, self.snapshot_after_id):
+            if after_id is not None:
+                self.master.after_cancel(after_id)
+        self.workspace_after_id = self.snapshot_after_id = None
+        if self.load_task is not None:
+            self.load_task.cancel()
+        self.frame.destroy()
+        self.setup_initial_ui()
 
-    def setup_main_ui(self, user_data):
+    def setup_main_ui(self, user_data, cached=None):
         self.frame.destroy()
         self.frame = ttk.Frame(self.master, padding="10")
         self.frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -62,19 +228,11 @@ class GitHubRepoManager:
         user_frame.grid(column=0, row=0, columnspan=2, sticky=(tk.W, tk.E))
 
         self.user_name = user_data.get('name') or user_data.get('login', 'Usuario')
-        ttk.Label(user_frame, text=f"Bienvenido, {self.user_name}").grid(column=1, row=0, sticky=tk.W)
+        self.welcome_label = ttk.Label(user_frame, text=f"Bienvenido, {self.user_name}")
+        self.welcome_label.grid(column=1, row=0, sticky=tk.W)
 
-        try:
-            avatar_url = user_data['avatar_url']
-            response = requests.get(avatar_url)
-            img = Image.open(BytesIO(response.content))
-            img = img.resize((50, 50), Image.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
-            avatar_label = ttk.Label(user_frame, image=photo)
-            avatar_label.image = photo
-            avatar_label.grid(column=0, row=0, padx=(0, 10))
-        except Exception as e:
-            print(f"No se pudo cargar el avatar: {e}")
+        self.load_avatar(user_frame, user_data.get('avatar_url'), (50, 50),
+                         lambda label: label.grid(column=0, row=0, padx=(0, 10)))
 
         # Frame izquierdo para la lista de repositorios
         left_frame = ttk.Frame(self.frame, padding="10")
@@ -88,48 +246,59 @@ class GitHubRepoManager:
         search_entry = ttk.Entry(left_frame, textvariable=self.search_var)
         search_entry.grid(column=0, row=1, sticky=(tk.W, tk.E), pady=(0, 5))
 
-        self.repo_buttons_frame = ttk.Frame(left_frame)
-        self.repo_buttons_frame.grid(column=0, row=2, sticky=(tk.N, tk.S, tk.W, tk.E))
-
-        # Scrollbar para los botones de repositorios
-        self.repo_canvas = tk.Canvas(self.repo_buttons_frame)
-        self.repo_scrollbar = ttk.Scrollbar(self.repo_buttons_frame, orient="vertical", command=self.repo_canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.repo_canvas)
-
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.repo_canvas.configure(
-                scrollregion=self.repo_canvas.bbox("all")
-            )
-        )
-
-        self.repo_canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.repo_canvas.configure(yscrollcommand=self.repo_scrollbar.set)
-
-        self.repo_canvas.pack(side="left", fill="both", expand=True)
-        self.repo_scrollbar.pack(side="right", fill="y")
+        # Lista virtualizada de repositorios: sólo existen botones para las filas visibles
+        self.repo_list = VirtualList(left_frame, text=self.repo_row_text, command=self.open_repo_window)
+        self.repo_list.grid(column=0, row=2, sticky=(tk.N, tk.S, tk.W, tk.E))
 
         # Botón de refrescar
         ttk.Button(left_frame, text="Refrescar", command=self.refresh_repos).grid(column=0, row=3, sticky=(tk.W, tk.E), pady=5)
 
+        # Carga por GraphQL: lista, metadatos y ramas en una consulta por cada 100 repositorios
+        ttk.Checkbutton(left_frame, text="Carga rápida (GraphQL)", variable=self.use_graphql).grid(column=0, row=4, sticky=tk.W)
+
+        # Antigüedad de la lista si viene de la instantánea local
+        self.snapshot_label = ttk.Label(left_frame, text="", foreground="gray")
+        self.snapshot_label.grid(column=0, row=5, sticky=tk.W)
+
         # Frame derecho para las acciones
         right_frame = ttk.Frame(self.frame, padding="10")
         right_frame.grid(column=1, row=1, sticky=(tk.N, tk.S, tk.W, tk.E))
 
         ttk.Button(right_frame, text="Crear Nuevo Repositorio", command=self.create_repo_window).grid(column=0, row=0, sticky=(tk.W, tk.E), pady=5)
         ttk.Button(right_frame, text="Clonar Repositorio", command=self.clone_repo_window).grid(column=0, row=1, sticky=(tk.W, tk.E), pady=5)
-        
-        # Configurar Git con la información del usuario
-        os.environ['GIT_AUTHOR_NAME'] = self.user_name
-        os.environ['GIT_AUTHOR_EMAIL'] = user_data.get('email') or f"{user_data['login']}@users.noreply.github.com"
-        os.environ['GIT_COMMITTER_NAME'] = self.user_name
-        os.environ['GIT_COMMITTER_EMAIL'] = user_data.get('email') or f"{user_data['login']}@users.noreply.github.com"
-
-        self.load_repos()
+        ttk.Button(right_frame, text="Añadir Carpeta de Trabajo", command=self.add_workspace_root).grid(column=0, row=2, sticky=(tk.W, tk.E), pady=5)
+        ttk.Button(right_frame, text="Sincronizar Todo", command=self.sync_all_window).grid(column=0, row=3, sticky=(tk.W, tk.E), pady=5)
+        ttk.Button(right_frame, text="Crear Rama en Varios Repos", command=self.create_branch_in_repos_window).grid(column=0, row=4, sticky=(tk.W, tk.E), pady=5)
+
+        # Barra de estado con las operaciones en curso
+        status_frame = ttk.Frame(self.frame, padding=(10, 0))
+        status_frame.grid(column=0, row=2, columnspan=2, sticky=(tk.W, tk.E))
+        self.activity_label = ttk.Label(status_frame, text="")
+        self.activity_label.grid(column=0, row=0, sticky=tk.W)
+        self.activity_bar = ttk.Progressbar(status_frame, mode='indeterminate', length=100)
+        self.activity_bar.grid(column=1, row=0, padx=5)
+        self.cancel_button = ttk.Button(status_frame, text="Cancelar", command=self.tasks.cancel_all)
+        self.cancel_button.grid(column=2, row=0)
+        self.quota_label = ttk.Label(status_frame, text="")
+        self.quota_label.grid(column=3, row=0, sticky=tk.E, padx=(10, 0))
+        ttk.Button(status_frame, text="Tiempos", command=self.timing_window).grid(column=4, row=0, padx=(10, 0))
+        status_frame.columnconfigure(0, weight=1)
+        self.update_activity_indicator(self.tasks.in_flight)
+        self.update_quota_label()
+
+        if cached is None:
+            self.load_repos()
+        else:
+            # La revalidación empieza cuando GitHub confirme el token
+            self.repos = list(cached.repos)
+            self.search_index = RepoSearchIndex(self.repos)
+            self.display_repos()
+            self.show_snapshot_age(cached.saved_at)
+        self.refresh_workspace()
         
         # Centrar la ventana principal después de configurar toda la interfaz
         #self.master.update_idletasks()
-        self.center_window(self.master, 600, 460)
+        self.center_window(self.master, 600, 490)
     
     def open_repo_window(self, repo):
         repo_window = tk.Toplevel(self.master)
@@ -137,13 +306,21 @@ class GitHubRepoManager:
         
         # Mantener la ventana en primer plano
         repo_window.transient(self.master)
+
+        # Al cerrar la ventana se liberan el Repo y sus procesos git
+        repo_window.bind("<Destroy>", lambda e: self.close_git_repo(repo) if e.widget is repo_window else None)
         
         # Frame superior para la URL
         top_frame = ttk.Frame(repo_window, padding="10")
         top_frame.pack(fill=tk.X, expand=False)
         
         # Etiqueta y campo de texto para la URL
-        ttk.Label(top_frame, text="URL del Repositorio:").pack(side=tk.LEFT, padx=(0, 5))
+        url_label = ttk.Label(top_frame, text="URL del Repositorio:")
+        url_label.pack(side=tk.LEFT, padx=(0, 5))
+
+        # Avatar del propietario (compartido con el resto de ventanas a través de la caché)
+        self.load_avatar(top_frame, repo.get('owner', {}).get('avatar_url'), (24, 24),
+                         lambda label: label.pack(side=tk.LEFT, padx=(0, 5), before=url_label))
         url_var = tk.StringVar(value=repo.get('clone_url', ''))
         url_entry = ttk.Entry(top_frame, textvariable=url_var, state='readonly', width=50)
         url_entry.pack(side=tk.LEFT, expand=True, fill=tk.X)
@@ -161,8 +338,18 @@ class GitHubRepoManager:
         
         # Función para actualizar la etiqueta de la rama predeterminada
         def update_default_branch_label():
-            default_branch = self.get_default_branch(repo)
-            default_branch_label.config(text=f"Rama predeterminada: {default_branch}")
+            def show(default_branch):
+                if default_branch_label.winfo_exists():
+                    default_branch_label.config(text=f"Rama predeterminada: {default_branch}")
+
+            # /user/repos ya trae la rama predeterminada: sólo se pide si ha caducado
+            if self.store.is_fresh(repo, 'default_branch'):
+                show(repo['default_branch'])
+                return
+
+            self.tasks.submit(self.get_default_branch, repo, on_success=show,
+                              on_error=lambda e: show('Error al obtener la rama'),
+                              description=f"Rama predeterminada de {repo['name']}")
 
         # Llamar a la función para actualizar la etiqueta inicialmente
         update_default_branch_label()
@@ -200,48 +387,137 @@ class GitHubRepoManager:
         messagebox.showinfo("Copiado", "URL copiada al portapapeles")
 
     def load_repos(self):
-        headers = {
-            'Authorization': f'token {self.token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        response = requests.get('https://api.github.com/user/repos', headers=headers)
-        if response.status_code == 200:
-            self.repos = response.json()
-            self.display_repos()
+        # Un refresco sustituye a la carga anterior si aún no había terminado
+        if self.load_task is not None:
+            self.load_task.cancel()
+
+        self.repos = []
+        self.search_index = RepoSearchIndex()
+        self.display_repos()
+
+        # Las tandas llegan ya en el orden de la lista: cada una se añade al
+        # final en cuanto se ha leído, sin esperar al resto de su página
+        def add_batch(batch):
+            new_repos = self.store.put_many(batch)
+            self.repos.extend(new_repos)
+            self.search_index.add(new_repos)
+            self.apply_search(reset_scroll=False)
+
+        use_graphql = self.use_graphql.get()
+
+        def fetch_batches():
+            task = current_task()
+            loaded = []
+            for batch in self.core.iter_repo_batches(use_graphql):
+                task.check_cancelled()
+                loaded.extend(batch)
+                task.report(add_batch, batch)
+            self.core.save_snapshot(loaded)
+
+        def on_error(e):
+            if isinstance(e, RateLimitExceeded):
+                messagebox.showerror("Límite de la API", f"No se pudieron cargar los repositorios: {str(e)}")
+            elif isinstance(e, requests.RequestException):
+                messagebox.showerror("Error", "No se pudieron cargar los repositorios")
+            else:
+                self.show_task_error(e)
+
+        self.show_snapshot_age(None)
+        self.load_task = self.tasks.submit(fetch_batches, on_error=on_error,
+                                           description="Cargando repositorios")
+
+    def revalidate_repos(self, saved_at):
+        # La lista de la instantánea sigue en pantalla mientras se vuelve a
+        # cargar; al terminar sólo se redibuja si algo ha cambiado
+        previous = list(self.repos)
+
+        def on_done(diff):
+            self.show_snapshot_age(None)
+            if diff.changed or diff.removed or len(diff.repos) != len(previous) or \
+                    any(a is not b for a, b in zip(diff.repos, previous)):
+                self.repos = diff.repos
+                self.search_index = RepoSearchIndex(self.repos)
+                self.apply_search(reset_scroll=False)
+
+        def on_error(e):
+            if isinstance(e, (requests.RequestException, RateLimitExceeded)):
+                self.show_snapshot_age(saved_at, offline=True)
+            else:
+                self.show_task_error(e)
+
+        self.load_task = self.tasks.submit(self.core.revalidate_repos, previous, self.use_graphql.get(),
+                                           on_success=on_done, on_error=on_error,
+                                           description="Actualizando repositorios")
+
+    def show_snapshot_age(self, saved_at, offline=False):
+        # saved_at None: la lista ya está al día y no se indica nada
+        if self.snapshot_after_id is not None:
+            self.master.after_cancel(self.snapshot_after_id)
+            self.snapshot_after_id = None
+        if self.snapshot_label is None or not self.snapshot_label.winfo_exists():
+            return
+        if saved_at is None:
+            self.snapshot_label.config(text="")
+            return
+        age = snapshot.format_age(time.time() - saved_at)
+        if offline:
+            self.snapshot_label.config(text=f"Sin conexión: datos guardados hace {age}")
         else:
-            messagebox.showerror("Error", "No se pudieron cargar los repositorios")
+            self.snapshot_label.config(text=f"Datos guardados hace {age}, actualizando...")
+        self.snapshot_after_id = self.master.after(SNAPSHOT_AGE_REFRESH_MS, self.show_snapshot_age,
+                                                   saved_at, offline)
 
     def display_repos(self):
-        # Limpiar el frame scrollable
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-
-        for repo in self.repos:
-            repo_button = ttk.Button(self.scrollable_frame, text=repo['name'], 
-                                     command=lambda r=repo: self.open_repo_window(r))
-            repo_button.pack(fill='x', padx=5, pady=2)
-
-    def select_repo(self, repo):
-        self.selected_repo = repo
-        messagebox.showinfo("Repositorio Seleccionado", f"Has seleccionado: {repo['name']}")
+        self.repo_list.set_items(self.repos)
 
     def filter_repos(self, *args):
-        search_term = self.search_var.get().lower()
-        filtered_repos = [repo for repo in self.repos if search_term in repo['name'].lower()]
-        self.display_filtered_repos(filtered_repos)
+        # Se filtra cuando el usuario deja de escribir, no en cada tecla
+        if self.search_after_id is not None:
+            self.master.after_cancel(self.search_after_id)
+        self.search_after_id = self.master.after(SEARCH_DEBOUNCE_MS, self.apply_search)
 
-    def display_filtered_repos(self, filtered_repos):
-        # Limpiar el frame scrollable
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+    def apply_search(self, reset_scroll=True):
+        self.search_after_id = None
+        filtered_repos = self.search_index.search(self.search_var.get())
+        self.display_filtered_repos(filtered_repos, reset_scroll)
 
-        for repo in filtered_repos:
-            repo_button = ttk.Button(self.scrollable_frame, text=repo['name'], command=lambda r=repo: self.select_repo(r))
-            repo_button.pack(fill='x', padx=5, pady=2)
+    def display_filtered_repos(self, filtered_repos, reset_scroll=True):
+        # Sólo cambia el modelo de la lista; las filas visibles se reutilizan
+        self.repo_list.set_items(filtered_repos, reset_scroll)
 
     def refresh_repos(self):
         self.load_repos()
 
+    def repo_row_text(self, repo):
+        # Los repositorios con un clon local se marcan en la lista
+        if self.workspace.is_cloned(repo):
+            return f"{repo['name']}  (clonado)"
+        return repo['name']
+
+    def add_workspace_root(self):
+        root = filedialog.askdirectory(title="Seleccione una carpeta de trabajo con clones")
+        if not root or not self.workspace.add_root(root):
+            return
+        self.tasks.submit(self.workspace.refresh, on_success=lambda _: self.repo_list.render(),
+                          description="Buscando clones locales")
+
+    def refresh_workspace(self):
+        # Sólo se vuelven a listar los directorios modificados desde la última vez
+        def on_done(changed):
+            if changed and self.repo_list.winfo_exists():
+                self.repo_list.render()
+
+        self.tasks.submit(self.workspace.refresh, on_success=on_done,
+                          on_error=lambda e: print(f"No se pudieron buscar clones locales: {e}"))
+        self.workspace_after_id = self.master.after(WORKSPACE_REFRESH_MS, self.refresh_workspace)
+
+    def remove_repo(self, repo):
+        # Quitar un repositorio de la lista sin recargarla
+        self.store.remove(repo['full_name'])
+        self.repos = [r for r in self.repos if r is not repo]
+        self.search_index = RepoSearchIndex(self.repos)
+        self.apply_search(reset_scroll=False)
+
     def create_repo_window(self):
         create_window = tk.Toplevel(self.master)
         create_window.title("Crear Nuevo Repositorio")
@@ -263,21 +539,232 @@ class GitHubRepoManager:
         ttk.Button(create_window, text="Crear", command=lambda: self.create_repo(repo_name.get(), repo_description.get(), private_var.get())).grid(column=0, row=3, columnspan=2, pady=10)
 
     def create_repo(self, name, description, private):
-        headers = {
-            'Authorization': f'token {self.token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        data = {
-            'name': name,
-            'description': description,
-            'private': private
-        }
-        response = requests.post('https://api.github.com/user/repos', headers=headers, json=data)
-        if response.status_code == 201:
+        def on_created(repo):
             messagebox.showinfo("Éxito", f"Repositorio '{name}' creado con éxito!")
-            self.refresh_repos()
-        else:
-            messagebox.showerror("Error", "No se pudo crear el repositorio")
+            # Se añade a la lista con la respuesta del POST, sin recargarla
+            self.repos.append(repo)
+            self.search_index.add([repo])
+            self.apply_search(reset_scroll=False)
+
+        def on_error(e):
+            if isinstance(e, repo_manager.ManagerError):
+                messagebox.showerror("Error", "No se pudo crear el repositorio")
+            else:
+                self.show_task_error(e)
+
+        self.tasks.submit(self.core.create_repo, name, description, private, on_success=on_created,
+                          on_error=on_error, description=f"Creando {name}")
+
+    def timing_window(self):
+        # Tramos registrados por acción: peticiones HTTP y procesos git anidados
+        # bajo la tarea que los lanzó, con duración, estado, bytes y caché
+        timing_window = tk.Toplevel(self.master)
+        timing_window.title("Tiempos")
+        timing_window.transient(self.master)
+
+        toolbar = ttk.Frame(timing_window, padding=(10, 10, 10, 0))
+        toolbar.pack(fill='x')
+        enabled_var = tk.BooleanVar(value=tracer.enabled)
+
+        def toggle():
+            if enabled_var.get():
+                tracer.enable()
+            else:
+                tracer.disable()
+
+        ttk.Checkbutton(toolbar, text="Registrar tiempos", variable=enabled_var, command=toggle).pack(side='left')
+        ttk.Button(toolbar, text="Exportar (Chrome trace)...", command=lambda: export()).pack(side='right')
+        ttk.Button(toolbar, text="Limpiar", command=lambda: (tracer.clear(), render())).pack(side='right', padx=5)
+
+        columns = ('duration', 'status', 'bytes', 'cache', 'detail')
+        table = ttk.Treeview(timing_window, columns=columns, height=18)
+        table.heading('#0', text="Acción / operación")
+        table.column('#0', width=320)
+        for column, heading, width in (('duration', "ms", 70), ('status', "Estado", 60), ('bytes', "Bytes", 80),
+                                       ('cache', "Caché", 50), ('detail', "Detalle", 260)):
+            table.heading(column, text=heading)
+            table.column(column, width=width, anchor=tk.W if column == 'detail' else tk.E)
+        scrollbar = ttk.Scrollbar(timing_window, orient="vertical", command=table.yview)
+        table.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side='right', fill='y', pady=10, padx=(0, 10))
+        table.pack(fill='both', expand=True, padx=(10, 0), pady=10)
+        table.tag_configure('error', foreground='red')
+
+        shown = [None]
+
+        def render():
+            spans = tracer.spans()
+            # Sólo se repinta si se ha cerrado algún tramo desde la última vez
+            last = (len(spans), spans[-1].id if spans else None)
+            if not timing_window.winfo_exists() or last == shown[0]:
+                return
+            shown[0] = last
+            # Se conservan desplegadas las acciones que lo estaban
+            opened = {item for item in table.get_children() if table.item(item, 'open')}
+            table.delete(*table.get_children())
+            children = {}
+            for span in spans:
+                children.setdefault(span.parent_id, []).append(span)
+            known = {span.id for span in spans}
+            roots = [span for span in spans if span.parent_id is None or span.parent_id not in known]
+            roots.sort(key=lambda span: span.start, reverse=True)
+
+            def insert(parent, span):
+                args = span.args
+                detail = args.get('error') or args.get('url') or args.get('command') or ''
+                values = (f"{span.duration * 1000:.1f}", args.get('status', ''),
+                          '' if args.get('bytes') is None else args['bytes'], args.get('cache') or '', detail)
+                item = table.insert(parent, 'end', iid=str(span.id), text=span.name, values=values,
+                                    open=str(span.id) in opened, tags=('error',) if 'error' in args else ())
+                for child in sorted(children.get(span.id, ()), key=lambda child: child.start):
+                    insert(item, child)
+
+            for span in roots[:TIMING_MAX_ACTIONS]:
+                insert('', span)
+
+        def export():
+            path = filedialog.asksaveasfilename(parent=timing_window, defaultextension='.json',
+                                                initialfile='gitapp-trace.json',
+                                                filetypes=[("Chrome trace", "*.json")])
+            if path:
+                tracer.export_chrome_trace(path)
+                messagebox.showinfo("Exportado", f"Abra {os.path.basename(path)} en chrome://tracing o ui.perfetto.dev",
+                                    parent=timing_window)
+
+        def refresh():
+            if timing_window.winfo_exists():
+                render()
+                timing_window.after(TIMING_REFRESH_MS, refresh)
+
+        refresh()
+        self.center_window(timing_window, 900, 460)
+
+    def sync_all_window(self):
+        clones = self.workspace.clones()
+        if not clones:
+            messagebox.showinfo("Información", "No hay clones locales. Añada una carpeta de trabajo primero.")
+            return
+        names = dict(clones)
+
+        sync_window = tk.Toplevel(self.master)
+        sync_window.title("Sincronizar Todo")
+        sync_window.transient(self.master)
+
+        # Resumen por repositorio, rellenado según terminan
+        columns = ('repo', 'state', 'detail', 'duration', 'received')
+        table = ttk.Treeview(sync_window, columns=columns, show='headings', height=15)
+        for column, heading, width in (('repo', "Repositorio", 200), ('state', "Estado", 170),
+                                       ('detail', "Detalle", 220), ('duration', "Tiempo (s)", 80),
+                                       ('received', "Recibido", 90)):
+            table.heading(column, text=heading)
+            table.column(column, width=width, anchor=tk.W if column in ('repo', 'state', 'detail') else tk.E)
+        scrollbar = ttk.Scrollbar(sync_window, orient="vertical", command=table.yview)
+        table.configure(yscrollcommand=scrollbar.set)
+        table.grid(column=0, row=0, sticky=(tk.N, tk.S, tk.W, tk.E), padx=(10, 0), pady=10)
+        scrollbar.grid(column=1, row=0, sticky=(tk.N, tk.S), padx=(0, 10), pady=10)
+        summary_label = ttk.Label(sync_window, text=f"Sincronizando {len(clones)} clones...")
+        summary_label.grid(column=0, row=1, columnspan=2, sticky=tk.W, padx=10, pady=(0, 10))
+        sync_window.columnconfigure(0, weight=1)
+        sync_window.rowconfigure(0, weight=1)
+
+        results = []
+        start = time.perf_counter()
+
+        def summary():
+            counts = {}
+            for result in results:
+                counts[result['state']] = counts.get(result['state'], 0) + 1
+            received = sum(result['received'] for result in results)
+            parts = [f"{count} {state.lower()}" for state, count in sorted(counts.items())]
+            return (f"{len(results)}/{len(clones)} clones en {time.perf_counter() - start:.1f} s, "
+                    f"{bulk_sync.format_bytes(received)} recibidos: " + ", ".join(parts))
+
+        def add_result(result):
+            results.append(result)
+            if not sync_window.winfo_exists():
+                return
+            # Omitidos y errores primero, para que se vean sin desplazarse
+            done = (bulk_sync.SYNC_UP_TO_DATE, bulk_sync.SYNC_FAST_FORWARD, bulk_sync.SYNC_AHEAD)
+            position = 'end' if result['state'] in done else 0
+            tag = 'error' if result['state'] == bulk_sync.SYNC_ERROR else ''
+            table.insert('', position, values=(names[result['path']] or os.path.basename(result['path']),
+                                               result['state'], result['detail'],
+                                               f"{result['duration']:.2f}", bulk_sync.format_bytes(result['received'])),
+                         tags=(tag,))
+            summary_label.config(text=summary())
+
+        def on_done(_):
+            # El estado cacheado de cada clon caduca solo: fetch y merge
+            # cambian FETCH_HEAD y la rama
+            if sync_window.winfo_exists():
+                summary_label.config(text=summary())
+
+        table.tag_configure('error', foreground='red')
+
+        def run():
+            task = current_task()
+            return self.core.sync([path for path, _ in clones],
+                                  on_result=lambda result: task.report(add_result, result))
+
+        task = self.tasks.submit(run, on_success=on_done, description=f"Sincronizando {len(clones)} clones")
+        sync_window.protocol("WM_DELETE_WINDOW", lambda: (task.cancel(), sync_window.destroy()))
+
+    def create_branch_in_repos_window(self):
+        if not self.repos:
+            messagebox.showinfo("Información", "No hay repositorios cargados")
+            return
+        repos = sorted(self.repos, key=lambda r: r['full_name'].lower())
+
+        branch_window = tk.Toplevel(self.master)
+        branch_window.title("Crear Rama en Varios Repos")
+        branch_window.transient(self.master)
+
+        ttk.Label(branch_window, text="Nombre de la nueva rama:").grid(column=0, row=0, sticky=tk.W, padx=10, pady=(10, 5))
+        name_entry = ttk.Entry(branch_window, width=40)
+        name_entry.grid(column=1, row=0, sticky=(tk.W, tk.E), padx=10, pady=(10, 5))
+        ttk.Label(branch_window, text="Repositorios (Ctrl/Mayús para varios):").grid(column=0, row=1, columnspan=2, sticky=tk.W, padx=10)
+        repo_listbox = tk.Listbox(branch_window, selectmode='extended', height=15)
+        repo_listbox.insert('end', *(r['full_name'] for r in repos))
+        scrollbar = ttk.Scrollbar(branch_window, orient="vertical", command=repo_listbox.yview)
+        repo_listbox.configure(yscrollcommand=scrollbar.set)
+        repo_listbox.grid(column=0, row=2, columnspan=2, sticky=(tk.N, tk.S, tk.W, tk.E), padx=(10, 0), pady=5)
+        scrollbar.grid(column=2, row=2, sticky=(tk.N, tk.S), padx=(0, 10), pady=5)
+        status_label = ttk.Label(branch_window, text="")
+        status_label.grid(column=0, row=3, columnspan=2, sticky=tk.W, padx=10)
+        branch_window.columnconfigure(1, weight=1)
+        branch_window.rowconfigure(2, weight=1)
+
+        def on_done(result):
+            if branch_window.winfo_exists():
+                create_button.config(state='normal')
+                status_label.config(text="")
+            if not result.failed:
+                messagebox.showinfo("Éxito", f"Rama creada en {len(result.succeeded)} repositorio(s)")
+            else:
+                messagebox.showerror("Error", f"Rama creada en {len(result.succeeded)} repositorio(s), "
+                                              f"{len(result.failed)} con error:\n{result.failure_lines()}")
+
+        def on_error(e):
+            if branch_window.winfo_exists():
+                create_button.config(state='normal')
+                status_label.config(text="")
+            self.show_task_error(e)
+
+        def create():
+            name = name_entry.get().strip()
+            selected = [repos[index] for index in repo_listbox.curselection()]
+            if not name or not selected:
+                messagebox.showerror("Error", "Indique el nombre de la rama y al menos un repositorio")
+                return
+            create_button.config(state='disabled')
+            status_label.config(text=f"Creando '{name}' en {len(selected)} repositorio(s)...")
+            self.tasks.submit(self.core.create_branch, selected, name,
+                              on_success=on_done, on_error=on_error,
+                              description=f"Creando rama {name} en {len(selected)} repositorios")
+
+        create_button = ttk.Button(branch_window, text="Crear", command=create)
+        create_button.grid(column=1, row=4, sticky=tk.E, padx=10, pady=10)
+        self.center_window(branch_window, 460, 420)
 
     def clone_repo_window(self):
         clone_window = tk.Toplevel(self.master)
@@ -295,23 +782,100 @@ class GitHubRepoManager:
         local_dir.grid(column=1, row=1, padx=5, pady=5)
         ttk.Button(clone_window, text="Examinar", command=lambda: local_dir.insert(0, filedialog.askdirectory())).grid(column=2, row=1, padx=5, pady=5)
 
-        ttk.Button(clone_window, text="Clonar", command=lambda: self.clone_repo(repo_url.get(), local_dir.get())).grid(column=0, row=2, columnspan=3, pady=10)
+        # Modos rápidos para repositorios grandes
+        ttk.Label(clone_window, text="Modo:").grid(column=0, row=2, padx=5, pady=5)
+        modes = {label: mode for mode, (label, _) in git_clone.CLONE_MODES.items()}
+        mode_var = tk.StringVar(value=git_clone.CLONE_MODES['full'][0])
+        ttk.Combobox(clone_window, textvariable=mode_var, values=list(modes), state='readonly', width=47).grid(column=1, row=2, padx=5, pady=5)
+
+        ttk.Label(clone_window, text="Profundidad:").grid(column=0, row=3, padx=5, pady=5)
+        depth_var = tk.IntVar(value=1)
+        ttk.Spinbox(clone_window, from_=1, to=100000, textvariable=depth_var, width=8).grid(column=1, row=3, padx=5, pady=5, sticky=tk.W)
+
+        ttk.Label(clone_window, text="Rama:").grid(column=0, row=4, padx=5, pady=5)
+        branch = ttk.Entry(clone_window, width=50)
+        branch.grid(column=1, row=4, padx=5, pady=5)
+        single_branch_var = tk.BooleanVar()
+        ttk.Checkbutton(clone_window, text="Sólo esta rama", variable=single_branch_var).grid(column=2, row=4, padx=5, pady=5)
+
+        # Clon local cuyos objetos se reutilizan en lugar de descargarlos
+        ttk.Label(clone_window, text="Referencia local:").grid(column=0, row=5, padx=5, pady=5)
+        reference = ttk.Entry(clone_window, width=50)
+        reference.grid(column=1, row=5, padx=5, pady=5)
+        ttk.Button(clone_window, text="Examinar", command=lambda: reference.insert(0, filedialog.askdirectory())).grid(column=2, row=5, padx=5, pady=5)
+
+        progress_label = ttk.Label(clone_window, text="")
+        progress_label.grid(column=0, row=7, columnspan=3, padx=5, sticky=tk.W)
+        progress_bar = ttk.Progressbar(clone_window, maximum=1.0, length=400)
+        progress_bar.grid(column=0, row=8, columnspan=2, padx=5, pady=5, sticky=(tk.W, tk.E))
+        cancel_button = ttk.Button(clone_window, text="Cancelar", state='disabled')
+        cancel_button.grid(column=2, row=8, padx=5, pady=5)
+
+        def show_progress(phase, fraction, message):
+            if not clone_window.winfo_exists():
+                return
+            text = phase if fraction is None else f"{phase}: {fraction:.0%}"
+            if message:
+                text += f" ({message})"
+            progress_label.config(text=text)
+            if fraction is None:
+                progress_bar.config(mode='indeterminate')
+                progress_bar.start(10)
+            else:
+                progress_bar.stop()
+                progress_bar.config(mode='determinate', value=fraction)
+
+        def finished():
+            if clone_window.winfo_exists():
+                progress_bar.stop()
+                clone_button.config(state='normal')
+                cancel_button.config(state='disabled')
 
-    def clone_repo(self, url, local_dir):
-        try:
-            Repo.clone_from(url, local_dir)
+        def cancel(task):
+            task.cancel()
+            finished()
+            progress_label.config(text="Clonado cancelado")
+
+        def start():
+            try:
+                depth = depth_var.get()
+            except tk.TclError:
+                depth = 1
+            options = git_clone.clone_options(modes[mode_var.get()], depth, branch.get().strip() or None,
+                                              single_branch_var.get(), reference.get().strip() or None)
+            task = self.clone_repo(repo_url.get(), local_dir.get(), options, on_progress=show_progress, on_done=finished)
+            clone_button.config(state='disabled')
+            cancel_button.config(state='normal', command=lambda: cancel(task))
+
+        clone_button = ttk.Button(clone_window, text="Clonar", command=start)
+        clone_button.grid(column=0, row=6, columnspan=3, pady=10)
+
+    def clone_repo(self, url, local_dir, options=(), on_progress=None, on_done=None):
+        def on_cloned(_):
+            if on_done:
+                on_done()
+            self.repo_list.render()
             messagebox.showinfo("Éxito", f"Repositorio clonado con éxito en {local_dir}")
-        except GitCommandError as e:
-            messagebox.showerror("Error", f"No se pudo clonar el repositorio: {str(e)}")
+
+        def on_error(e):
+            if on_done:
+                on_done()
+            if isinstance(e, git.GitCommandError):
+                messagebox.showerror("Error", f"No se pudo clonar el repositorio: {str(e)}")
+            else:
+                self.show_task_error(e)
+
+        def run():
+            # El progreso de git se lleva al hilo de Tk a través de la tarea
+            task = current_task()
+            progress = git_clone.CloneProgress(lambda *args: task.report(on_progress, *args)) if on_progress else None
+            return self.core.clone(url, local_dir, options, progress)
+
+        return self.tasks.submit(run, on_success=on_cloned, on_error=on_error,
+                                 description=f"Clonando {url}")
 
     def view_repo_details(self, repo):
-        headers = {
-            'Authorization': f'token {self.token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        response = requests.get(repo['url'], headers=headers)
-        if response.status_code == 200:
-            repo_details = response.json()
+        def show_details(repo_details):
             details = f"Nombre: {repo_details['name']}\n"
             details += f"Descripción: {repo_details['description']}\n"
             details += f"Estrellas: {repo_details['stargazers_count']}\n"
@@ -320,10 +884,22 @@ class GitHubRepoManager:
             details += f"Visibilidad: {'Privado' if repo_details['private'] else 'Público'}\n"
             details += f"Creado el: {repo_details['created_at']}\n"
             details += f"Última actualización: {repo_details['updated_at']}\n"
-                
+
             messagebox.showinfo("Detalles del Repositorio", details)
-        else:
-            messagebox.showerror("Error", "No se pudieron obtener los detalles del repositorio")
+
+        # Los detalles de la lista se reutilizan mientras estén vigentes
+        if self.store.is_fresh(repo, 'details'):
+            show_details(repo)
+            return
+
+        def on_error(e):
+            if isinstance(e, requests.RequestException):
+                messagebox.showerror("Error", "No se pudieron obtener los detalles del repositorio")
+            else:
+                self.show_task_error(e)
+
+        self.tasks.submit(self.core.details, repo, on_success=show_details, on_error=on_error,
+                          description=f"Detalles de {repo['name']}")
     
     def open_in_browser(self, repo):
         webbrowser.open(repo['html_url'])
@@ -331,63 +907,92 @@ class GitHubRepoManager:
     def delete_repo(self, repo):
         confirm = messagebox.askyesno("Confirmar", f"¿Está seguro de que desea eliminar el repositorio '{repo['name']}'?")
         if confirm:
-            headers = {
-                'Authorization': f'token {self.token}',
-                'Accept': 'application/vnd.github.v3+json'
-            }
-            response = requests.delete(repo['url'], headers=headers)
-            if response.status_code == 204:
+            def on_deleted(_):
                 messagebox.showinfo("Éxito", f"Repositorio '{repo['name']}' eliminado con éxito")
-                self.refresh_repos()
-            else:
-                messagebox.showerror("Error", "No se pudo eliminar el repositorio")
+                self.remove_repo(repo)
+
+            def on_error(e):
+                if isinstance(e, repo_manager.ManagerError):
+                    messagebox.showerror("Error", "No se pudo eliminar el repositorio")
+                else:
+                    self.show_task_error(e)
+
+            self.tasks.submit(self.core.delete_repo, repo, on_success=on_deleted, on_error=on_error,
+                              description=f"Eliminando {repo['name']}")
 
     def change_visibility(self, repo):    
         new_visibility = 'private' if not repo['private'] else 'public'
         confirm = messagebox.askyesno("Confirmar", f"¿Está seguro de que desea cambiar la visibilidad del repositorio '{repo['name']}' a {new_visibility}?")
         if confirm:
-            headers = {
-                'Authorization': f'token {self.token}',
-                'Accept': 'application/vnd.github.v3+json'
-            }
-            data = {
-                'private': not repo['private']
-            }
-            response = requests.patch(repo['url'], headers=headers, json=data)
-            if response.status_code == 200:
-                messagebox.showinfo("Éxito", f"Visibilidad del repositorio '{repo['name']}' cambiada a {new_visibility}")
-                self.refresh_repos()
-            else:
-                messagebox.showerror("Error", "No se pudo cambiar la visibilidad del repositorio")
+            def on_error(e):
+                if isinstance(e, repo_manager.ManagerError):
+                    messagebox.showerror("Error", "No se pudo cambiar la visibilidad del repositorio")
+                else:
+                    self.show_task_error(e)
+
+            self.tasks.submit(self.core.set_visibility, repo, not repo['private'],
+                              on_success=lambda _: messagebox.showinfo("Éxito", f"Visibilidad del repositorio '{repo['name']}' cambiada a {new_visibility}"),
+                              on_error=on_error, description=f"Cambiando visibilidad de {repo['name']}")
+
+    def close_git_repo(self, repo):
+        self.core.close_git(repo)
+
+    def get_local_path(self, repo):
+        local_path = self.workspace.path_for(repo)
+        if not local_path:
+            local_path = filedialog.askdirectory(title="Seleccione el directorio local del repositorio")
+            if local_path:
+                # No se volverá a preguntar por este repositorio
+                self.core.remember_clone(repo, local_path)
+                self.repo_list.render()
+        return local_path
 
     def git_commit(self, repo):
-        try:
-            local_path = repo.get('local_path')
-            if not local_path or not os.path.exists(local_path):
-                local_path = filedialog.askdirectory(title="Seleccione el directorio local del repositorio")
-                if not local_path:
-                    return
+        local_path = self.get_local_path(repo)
+        if not local_path:
+            return
+
+        def on_error(e):
+            if isinstance(e, git.GitCommandError):
+                messagebox.showerror("Error", f"No se pudo realizar el commit: {str(e)}")
+            elif isinstance(e, git.InvalidGitRepositoryError):
+                messagebox.showerror("Error", f"No se pudo inicializar el repositorio Git: {str(e)}")
+            else:
+                messagebox.showerror("Error", f"Ocurrió un error: {str(e)}")
 
-            # Verificar si es un repositorio Git válido
+        # Verificar si es un repositorio Git válido y si hay cambios (en segundo plano)
+        def load_status():
             try:
-                git_repo = Repo(local_path)
-            except InvalidGitRepositoryError:
+                git_repo = self.core.open_git(local_path)
+            except git.InvalidGitRepositoryError:
+                return None, None
+            return git_repo, self.core.status(git_repo).summary()
+
+        def init_repo():
+            self.core.init_git(local_path)  # Inicializar el repositorio
+            return load_status()
+
+        def on_init(result):
+            messagebox.showinfo("Éxito", "Repositorio Git inicializado exitosamente.")
+            on_status(result)
+
+        def on_status(result):
+            git_repo, status = result
+            if git_repo is None:
                 # Si no es un repositorio, ofrecer inicializarlo
-                initialize_repo = messagebox.askyesno("Inicializar repositorio", 
+                initialize_repo = messagebox.askyesno("Inicializar repositorio",
                                                     "El directorio seleccionado no es un repositorio Git. ¿Desea inicializar uno?")
                 if initialize_repo:
-                    git_repo = Repo.init(local_path)  # Inicializar el repositorio
-                    messagebox.showinfo("Éxito", "Repositorio Git inicializado exitosamente.")
-                else:
-                    return
+                    self.tasks.submit(init_repo, on_success=on_init, on_error=on_error,
+                                      description="Inicializando repositorio")
+                return
 
             # Verificar si hay cambios para commitear
-            if not git_repo.is_dirty() and len(git_repo.untracked_files) == 0:
+            if not status:
                 messagebox.showinfo("Información", "No hay cambios para commitear.")
                 return
 
             # Mostrar los archivos modificados y sin seguimiento
-            status = git_repo.git.status(porcelain=True)
             files_to_commit = simpledialog.askstring(
                 "Archivos para commit",
                 f"Archivos modificados y sin seguimiento:\n{status}\n\n"
@@ -400,13 +1005,6 @@ class GitHubRepoManager:
                 # Usuario canceló
                 return
 
-            # Si se especificaron archivos, añadirlos. Si no, añadir todos.
-            if files_to_commit.strip():
-                for file in files_to_commit.split(','):
-                    git_repo.git.add(file.strip())
-            else:
-                git_repo.git.add(A=True)
-
             # Pedir mensaje de commit
             commit_message = simpledialog.askstring("Mensaje de Commit", "Ingrese el mensaje para el commit (puede dejarlo en blanco):")
             if commit_message is None:
@@ -417,61 +1015,43 @@ class GitHubRepoManager:
             if commit_message.strip() == "":
                 commit_message = "Commit realizado desde la aplicación"
 
-            # Realizar el commit
-            if git_repo.is_dirty(untracked_files=True):
-                git_repo.git.commit('-m', f'Commit inicial: {commit_message}')
-            messagebox.showinfo("Éxito", "Commit realizado con éxito.")
+            # Si se especificaron archivos, añadirlos. Si no, añadir todos.
+            files = [file.strip() for file in files_to_commit.split(',') if file.strip()]
+            self.tasks.submit(self.core.commit, git_repo, f'Commit inicial: {commit_message}', files,
+                              on_success=lambda _: messagebox.showinfo("Éxito", "Commit realizado con éxito."),
+                              on_error=on_error, description=f"Commit en {repo['name']}")
 
-        except GitCommandError as e:
-            messagebox.showerror("Error", f"No se pudo realizar el commit: {str(e)}")
-        except InvalidGitRepositoryError as e:
-            messagebox.showerror("Error", f"No se pudo inicializar el repositorio Git: {str(e)}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Ocurrió un error: {str(e)}")
+        self.tasks.submit(load_status, on_success=on_status, on_error=on_error,
+                          description=f"Estado de {repo['name']}")
 
     def git_pull(self, repo):
-        try:
-            local_path = repo.get('local_path')
-            if not local_path or not os.path.exists(local_path):
-                local_path = filedialog.askdirectory(title="Seleccione el directorio local del repositorio")
-                if not local_path:
-                    return
+        local_path = self.get_local_path(repo)
+        if not local_path:
+            return
 
-            # Verificar si es un repositorio Git válido
-            try:
-                git_repo = Repo(local_path)
-            except InvalidGitRepositoryError:
+        def on_load_error(e):
+            if isinstance(e, git.InvalidGitRepositoryError):
                 messagebox.showerror("Error", "El directorio seleccionado no es un repositorio Git válido.")
-                return
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo cargar el repositorio: {str(e)}")
-                return
-            
-            # Obtener todas las ramas remotas
-            git_repo.git.fetch('--all')  # Asegurarse de tener la información más reciente del remoto
-            remote_branches = []
-            for remote in git_repo.remotes:
-                for ref in remote.refs:
-                    remote_branches.append(ref.remote_head)
-            
-            # Eliminar duplicados y ordenar
-            remote_branches = sorted(list(set(remote_branches)))
+            else:
+                messagebox.showerror("Error", f"Ocurrió un error general en git_pull: {str(e)}")
+
+        def load_branches():
+            # Verificar si es un repositorio Git válido
+            git_repo = self.core.open_git(local_path)
+
+            # Sólo se listan las ramas remotas; el único fetch se hace
+            # después, de la rama elegida
+            remote_branches = self.core.remote_branches(repo, git_repo)
+            status = self.core.branch_status(git_repo, 'pull')
+            changes = status.summary() if status.dirty else None
+            return git_repo, remote_branches, status.branch, changes
+
+        def on_branches(result):
+            git_repo, remote_branches, active_branch, changes = result
 
             # Imprimir las ramas para depuración
             print("Ramas remotas encontradas:", remote_branches)
 
-            # Si solo hay una rama, usarla directamente
-            #if len(remote_branches) == 1:
-            #    branch_to_pull = remote_branches[0]
-            #else:
-                # Si hay múltiples ramas, permitir al usuario seleccionar una
-            #    branch_to_pull = simpledialog.askstring("Seleccionar Rama", 
-            #                                            "Seleccione la rama de la cual desea hacer pull:",
-            #                                            initialvalue=git_repo.active_branch.name)
-            #    if not branch_to_pull or branch_to_pull not in remote_branches:
-            #        messagebox.showerror("Error", "Rama no válida seleccionada.")
-            #        return
-            
             # Crear una ventana emergente para el combobox
             popup = tk.Toplevel(self.master)
             popup.title("Seleccionar Rama")
@@ -481,326 +1061,445 @@ class GitHubRepoManager:
             branch_var = tk.StringVar()
             branch_combobox = ttk.Combobox(popup, textvariable=branch_var)
             branch_combobox['values'] = remote_branches
-            branch_combobox.set(git_repo.active_branch.name)  # Valor inicial
+            branch_combobox.set(active_branch)  # Valor inicial
             branch_combobox.pack(pady=10)
 
-            # Variable para almacenar la selección
-            selected_branch = [None]
-
             # Función para manejar la selección
             def on_select():
-                selected_branch[0] = branch_var.get()
+                branch_to_pull = branch_var.get()
                 popup.destroy()
+                self.pull_branch(repo, git_repo, remote_branches, branch_to_pull, changes)
 
             # Botón para confirmar la selección
             select_button = ttk.Button(popup, text="Seleccionar", command=on_select)
             select_button.pack(pady=5)
 
-            # Esperar a que se cierre la ventana emergente
-            popup.wait_window()
+        self.tasks.submit(load_branches, on_success=on_branches, on_error=on_load_error,
+                          description=f"Ramas remotas de {repo['name']}")
+
+    def pull_branch(self, repo, git_repo, remote_branches, branch_to_pull, changes):
+        if not branch_to_pull or branch_to_pull not in remote_branches:
+            messagebox.showerror("Error", "Rama no válida seleccionada.")
+            return
+
+        # Verificar si hay cambios locales no confirmados
+        commit_message = None
+        discard = False
+        if changes is not None:
+            confirm = messagebox.askyesno("Cambios locales detectados",
+                                        "Se detectaron cambios locales no confirmados. "
+                                        "¿Desea confirmar estos cambios antes de hacer pull?")
+            if confirm:
+                # Mostrar los cambios al usuario
+                print(changes)
+
+                # Pedir al usuario que escriba su mensaje de commit
+                commit_message = simpledialog.askstring("Mensaje de Commit",
+                                                        "Por favor, escriba su mensaje de commit:")
+                if not commit_message:
+                    print("Commit cancelado por el usuario.")
+                    return
+            else:
+                # Descartar cambios locales
+                discard = messagebox.askyesno("Descartar cambios",
+                                            "¿Está seguro de que desea descartar los cambios locales?")
+                if not discard:
+                    return
 
-            branch_to_pull = selected_branch[0]
-            
-            if not branch_to_pull or branch_to_pull not in remote_branches:
-                messagebox.showerror("Error", "Rama no válida seleccionada.")
-                return
+        if not repo.get('clone_url'):
+            messagebox.showerror("Error", "No se encontró la URL del repositorio remoto.")
+            return
 
-            # Verificar si hay cambios locales no confirmados
-            if git_repo.is_dirty():
-                confirm = messagebox.askyesno("Cambios locales detectados", 
-                                            "Se detectaron cambios locales no confirmados. "
-                                            "¿Desea confirmar estos cambios antes de hacer pull?")
-                if confirm:
-                    # Mostrar los cambios al usuario
-                    changes = git_repo.git.status(porcelain=True)
-                    print(changes)
-                    
-                    # Pedir al usuario que escriba su mensaje de commit
-                    commit_message = simpledialog.askstring("Mensaje de Commit", 
-                                                            "Por favor, escriba su mensaje de commit:")
-                    
-                    if commit_message:
-                        # Confirmar cambios locales con el mensaje personalizado
-                        git_repo.git.add(A=True)
-                        git_repo.git.commit('-m',f'{commit_message}')
-                    else:
-                        print("Commit cancelado por el usuario.")
-                        return
+        def on_error(e):
+            if isinstance(e, git.GitCommandError):
+                if "Permission denied" in str(e):
+                    messagebox.showerror("Error de Autenticación", "No se pudo autenticar con el repositorio remoto. Verifique sus credenciales.")
+                elif "couldn't find remote ref" in str(e).lower():
+                    messagebox.showerror("Error de Pull", f"No se pudo encontrar la referencia remota para la rama '{branch_to_pull}'. Verifique que la rama exista en el repositorio remoto.")
                 else:
-                    # Descartar cambios locales
-                    discard = messagebox.askyesno("Descartar cambios", 
-                                                "¿Está seguro de que desea descartar los cambios locales?")
-                    if discard:
-                        git_repo.git.reset('--hard')
-                    else:
-                        return
-
-            # Configurar el remoto con la URL autenticada
-            repo_url = repo.get('clone_url')
-            if not repo_url:
-                messagebox.showerror("Error", "No se encontró la URL del repositorio remoto.")
-                return
+                    messagebox.showerror("Error", f"No se pudo realizar la operación: {str(e)}")
+            else:
+                messagebox.showerror("Error", f"Ocurrió un error durante la operación: {str(e)}")
 
-            parsed_url = urllib.parse.urlparse(repo_url)
-            authenticated_url = parsed_url._replace(
-                netloc=f"{self.token}@{parsed_url.netloc}"
-            ).geturl()
+        def on_pulled(result):
+            # Verificar si hubo cambios
+            if result.changed:
+                messagebox.showinfo("Pull Exitoso", "Se recibieron cambios del repositorio remoto.")
+            else:
+                messagebox.showinfo("Repositorio Actualizado", "El repositorio local ya estaba actualizado con el remoto.")
 
-            try:
-                if 'origin' in git_repo.remotes:
-                    origin = git_repo.remotes.origin
-                    origin.set_url(authenticated_url)
-                else:
-                    origin = git_repo.create_remote('origin', authenticated_url)
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo configurar el remoto: {str(e)}")
+            # Preguntar al usuario si quiere hacer push de los cambios
+            push_confirmed = messagebox.askyesno("Confirmar Push",
+                                                "¿Desea hacer push de los cambios locales a GitHub?")
+            if not push_confirmed:
+                print("Push cancelado por el usuario.")
                 return
 
-            # Realizar el pull
-            try:
-                pull_info = origin.pull(branch_to_pull)
+            def push():
+                push_info = self.core.push(repo, git_repo, git_repo.active_branch.name, branch_to_pull)
+                print(f"Push realizado: {push_info}")
 
-                # Verificar si hubo cambios
-                if not pull_info[0].flags & pull_info[0].HEAD_UPTODATE:
-                    messagebox.showinfo("Pull Exitoso", "Se recibieron cambios del repositorio remoto.")
-                else:
-                    messagebox.showinfo("Repositorio Actualizado", "El repositorio local ya estaba actualizado con el remoto.")
-
-                # Preguntar al usuario si quiere hacer push de los cambios
-                push_confirmed = messagebox.askyesno("Confirmar Push", 
-                                                    "¿Desea hacer push de los cambios locales a GitHub?")
-                if push_confirmed:
-                    push_info = origin.push(refspec=f'{git_repo.active_branch.name}:{branch_to_pull}')
-                    print(f"Push realizado: {push_info}")
-                    messagebox.showinfo("Éxito", f"Push realizado con éxito en la rama '{branch_to_pull}'.")
-                else:
-                    print("Push cancelado por el usuario.")
+            self.tasks.submit(push, on_success=lambda _: messagebox.showinfo("Éxito", f"Push realizado con éxito en la rama '{branch_to_pull}'."),
+                              on_error=on_error, description=f"Push de {repo['name']}")
 
-            except GitCommandError as e:
-                if "Permission denied" in str(e):
-                    messagebox.showerror("Error de Autenticación", "No se pudo autenticar con el repositorio remoto. Verifique sus credenciales.")
-                elif "Couldn't find remote ref" in str(e):
-                    messagebox.showerror("Error de Pull", f"No se pudo encontrar la referencia remota para la rama '{branch_to_pull}'. Verifique que la rama exista en el repositorio remoto.")
-                else:
-                    messagebox.showerror("Error", f"No se pudo realizar la operación: {str(e)}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Ocurrió un error durante la operación: {str(e)}")
+        # Los cambios locales se confirman (commit_message) o se descartan antes del pull
+        self.tasks.submit(self.core.pull, repo, git_repo, branch_to_pull, commit_message, discard,
+                          on_success=on_pulled, on_error=on_error,
+                          description=f"Pull de {repo['name']}")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Ocurrió un error general en git_pull: {str(e)}")
-        
     def git_push(self, repo):
-        try:
-            local_path = repo.get('local_path')
-            if not local_path or not os.path.exists(local_path):
-                local_path = filedialog.askdirectory(title="Seleccione el directorio local del repositorio")
-                if not local_path:
-                    return
+        local_path = self.get_local_path(repo)
+        if not local_path:
+            return
 
-            # Verificar si es un repositorio Git válido
-            try:
-                git_repo = Repo(local_path)
-            except InvalidGitRepositoryError:
+        def on_error(e):
+            if isinstance(e, git.InvalidGitRepositoryError):
                 messagebox.showerror("Error", "El directorio seleccionado no es un repositorio Git válido.")
-                return
+            elif isinstance(e, git.GitCommandError):
+                if "Permission denied (publickey)" in str(e):
+                    messagebox.showerror("Error de Autenticación", "No se pudo autenticar con el repositorio remoto. Verifique sus credenciales SSH.")
+                elif "rejected" in str(e):
+                    messagebox.showerror("Error de Push", "El push fue rechazado. Puede que necesite hacer un pull primero.")
+                else:
+                    messagebox.showerror("Error", f"No se pudo realizar el push: {str(e)}")
+            else:
+                messagebox.showerror("Error", f"Ocurrió un error: {str(e)}")
 
-            # Verificar si hay cambios para pushear
-            if not git_repo.is_dirty() and len(git_repo.untracked_files) == 0 and not git_repo.head.is_detached:
-                status = git_repo.git.status()
-                if "Your branch is up to date" in status:
-                    messagebox.showinfo("Información", "No hay cambios para subir al repositorio remoto.")
-                    return
+        def load_state():
+            # Verificar si es un repositorio Git válido
+            git_repo = self.core.open_git(local_path)
 
-            # Obtener la rama actual
-            current_branch = git_repo.active_branch.name
+            # Verificar si hay cambios para pushear y obtener la rama actual
+            status = self.core.branch_status(git_repo, 'push')
+            return git_repo, status.clean and status.up_to_date, status.branch
+
+        def on_state(result):
+            git_repo, up_to_date, current_branch = result
+            if up_to_date:
+                messagebox.showinfo("Información", "No hay cambios para subir al repositorio remoto.")
+                return
 
             # Preguntar al usuario si quiere hacer push
-            push_confirmed = messagebox.askyesno("Confirmar Push", 
+            push_confirmed = messagebox.askyesno("Confirmar Push",
                                                 f"¿Desea hacer push de la rama '{current_branch}' al repositorio remoto?")
             if not push_confirmed:
                 return
 
             # Obtener la URL del repositorio del objeto repo
-            repo_url = repo.get('clone_url')
-            if not repo_url:
+            if not repo.get('clone_url'):
                 messagebox.showerror("Error", "No se encontró la URL del repositorio remoto.")
                 return
-            
-            # Modificar la URL del repositorio para incluir el token
-            parsed_url = urllib.parse.urlparse(repo_url)
-            authenticated_url = parsed_url._replace(
-                netloc=f"{self.token}@{parsed_url.netloc}"
-            ).geturl()
-
-            # Configurar el remoto con la URL autenticada
-            if 'origin' in git_repo.remotes:
-                origin = git_repo.remotes.origin
-                origin.set_url(authenticated_url)
-            else:
-                origin = git_repo.create_remote('origin', authenticated_url)
-
-            # Realizar el push
-            push_info = origin.push(refspec=f'{current_branch}:{current_branch}')
-            
-            # Verificar el resultado del push
-            if push_info[0].flags & push_info[0].ERROR:
-                raise GitCommandError("git push", push_info[0].summary)
-
-            messagebox.showinfo("Éxito", f"Push realizado con éxito a la rama '{current_branch}'.")
-
-        except GitCommandError as e:
-            if "Permission denied (publickey)" in str(e):
-                messagebox.showerror("Error de Autenticación", "No se pudo autenticar con el repositorio remoto. Verifique sus credenciales SSH.")
-            elif "rejected" in str(e):
-                messagebox.showerror("Error de Push", "El push fue rechazado. Puede que necesite hacer un pull primero.")
-            else:
-                messagebox.showerror("Error", f"No se pudo realizar el push: {str(e)}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Ocurrió un error: {str(e)}")
-
-    def manage_branches(self, repo, existing_window=None, update_default_branch_label=None):
-        self.selected_repo = repo  # Guardar el repositorio seleccionado
 
-        if existing_window:
-            branches_window = existing_window
-            # Clear existing content
-            for widget in branches_window.winfo_children():
-                widget.destroy()
-        else:
-            branches_window = tk.Toplevel(self.master)
-            branches_window.title(f"Gestionar Ramas - {repo['name']}")
-            # Mantener la ventana en primer plano
-            branches_window.transient(self.master)
-
-        # Crear un canvas y un frame dentro de él para permitir el scrolling
-        canvas = tk.Canvas(branches_window)
-        scrollbar = ttk.Scrollbar(branches_window, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
-
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        headers = {
-            'Authorization': f'token {self.token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        response = requests.get(f"{repo['url']}/branches", headers=headers)
-        if response.status_code == 200:
-            branches = response.json()
-
-            for branch in branches:
-                branch_frame = ttk.Frame(scrollable_frame)
-                branch_frame.pack(fill='x', padx=5, pady=2)
-
-                ttk.Label(branch_frame, text=branch['name']).pack(side='left')
-                ttk.Button(branch_frame, text="Eliminar", command=lambda b=branch: self.delete_branch(b, branches_window)).pack(side='right')
-                ttk.Button(branch_frame, text="Establecer como predeterminada", command=lambda b=branch: self.set_default_branch(b, branches_window, update_default_branch_label)).pack(side='right')
-
-            ttk.Button(scrollable_frame, text="Crear Nueva Rama", command=lambda: self.create_branch(branches_window)).pack(pady=10)
+            self.tasks.submit(self.core.push, repo, git_repo, current_branch, on_success=lambda _: messagebox.showinfo("Éxito", f"Push realizado con éxito a la rama '{current_branch}'."),
+                              on_error=on_error, description=f"Push de {repo['name']}")
 
-            if update_default_branch_label:
-                branches_window.after(100, update_default_branch_label)
+        self.tasks.submit(load_state, on_success=on_state, on_error=on_error,
+                          description=f"Estado de {repo['name']}")
 
-        else:
-            messagebox.showerror("Error", "No se pudieron obtener las ramas del repositorio")
+    def manage_branches(self, repo, update_default_branch_label=None):
+        self.selected_repo = repo  # Guardar el repositorio seleccionado
 
-        # Configurar el layout
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        branches_window = tk.Toplevel(self.master)
+        branches_window.title(f"Gestionar Ramas - {repo['name']}")
+        # Mantener la ventana en primer plano
+        branches_window.transient(self.master)
+
+        # Filtro por prefijo: en GitHub mientras no esté cargada la lista completa
+        filter_var = tk.StringVar()
+        ttk.Entry(branches_window, textvariable=filter_var).pack(fill='x', padx=5, pady=5)
+        count_label = ttk.Label(branches_window, text="Cargando ramas...")
+        count_label.pack(fill='x', padx=5)
+
+        items = []
+        # Ramas marcadas (por nombre) y, tras analizarlas, si están fusionadas y su fecha
+        checked = set()
+        info = {}
+        load_task = None
+        filter_after_id = None
+
+        def branch_text(branch):
+            text = f"{'☑' if branch['name'] in checked else '☐'} {branch['name']}"
+            if branch['name'] == repo.get('default_branch'):
+                text += "  (predeterminada)"
+            details = info.get(branch['name'])
+            if details:
+                if details['merged']:
+                    text += "  · fusionada"
+                if details['date']:
+                    text += f"  · {details['date']:%Y-%m-%d}"
+            return text
+
+        def update_selection():
+            if len(checked) == 1:
+                selection_label.config(text=f"Rama seleccionada: {next(iter(checked))}")
+            else:
+                selection_label.config(text=f"{len(checked)} ramas seleccionadas" if checked else "Seleccione una o varias ramas")
+            delete_button.config(state='normal' if checked else 'disabled')
+            default_button.config(state='normal' if len(checked) == 1 else 'disabled')
+            branch_list.render()
+
+        def toggle(branch):
+            checked.symmetric_difference_update({branch['name']})
+            update_selection()
+
+        def check(predicate):
+            # Marca las ramas visibles que cumplen predicate(detalles), nunca la predeterminada
+            checked.clear()
+            checked.update(b['name'] for b in items
+                           if b['name'] != repo.get('default_branch') and b['name'] in info and predicate(info[b['name']]))
+            update_selection()
+
+        # Lista virtualizada: sólo hay botones para las filas visibles
+        branch_list = VirtualList(branches_window, text=branch_text, command=toggle)
+        branch_list.pack(fill='both', expand=True, padx=5, pady=5)
+
+        # Selección en bloque: ramas ya fusionadas o sin commits desde una fecha
+        selectors = ttk.Frame(branches_window)
+        selectors.pack(fill='x', padx=5)
+        ttk.Button(selectors, text="Fusionadas", command=lambda: analyze(lambda d: d['merged'])).pack(side='left')
+        ttk.Label(selectors, text="Sin commits desde:").pack(side='left', padx=(10, 2))
+        since_var = tk.StringVar()
+        ttk.Entry(selectors, textvariable=since_var, width=11).pack(side='left')
+        ttk.Button(selectors, text="Antiguas", command=lambda: select_stale()).pack(side='left', padx=2)
+        ttk.Button(selectors, text="Ninguna", command=lambda: (checked.clear(), update_selection())).pack(side='right')
+
+        selection_label = ttk.Label(branches_window, text="Seleccione una o varias ramas")
+        selection_label.pack(fill='x', padx=5)
+        actions = ttk.Frame(branches_window)
+        actions.pack(fill='x', padx=5, pady=5)
+        delete_button = ttk.Button(actions, text="Eliminar", state='disabled',
+                                   command=lambda: self.delete_branches(repo, sorted(checked), on_deleted))
+        delete_button.pack(side='left')
+        default_button = ttk.Button(actions, text="Establecer como predeterminada", state='disabled',
+                                    command=lambda: self.set_default_branch(repo, {'name': next(iter(checked))}, on_default_changed))
+        default_button.pack(side='left', padx=5)
+        ttk.Button(actions, text="Crear Nueva Rama", command=lambda: self.create_branch(repo, on_created)).pack(side='right')
+
+        def analyze(predicate):
+            # Fusión y fecha del último commit de cada rama: una consulta por
+            # cada 100 ramas, hecha una sola vez por ventana
+            if info:
+                check(predicate)
+                return
 
-        # Ajustar el tamaño de la ventana y centrarla
-        branches_window.update_idletasks()  # Actualizar la geometría de la ventana
-        width = min(branches_window.winfo_reqwidth(), 350)  # Limitar el ancho máximo a 500
-        height = min(branches_window.winfo_reqheight(), 100)  # Limitar la altura máxima a 400
-        self.center_window(branches_window, width, height)
+            def on_info(result):
+                info.update(result)
+                if branches_window.winfo_exists():
+                    check(predicate)
 
-        # Configurar el evento de redimensionamiento
-        branches_window.bind("<Configure>", lambda e: self.on_window_configure(e, canvas))
+            selection_label.config(text="Analizando ramas...")
+            self.tasks.submit(self.core.branch_info, repo,
+                              on_success=on_info, on_error=on_analyze_error, description=f"Analizando ramas de {repo['name']}")
 
-    def on_window_configure(self, event, canvas):
-        # Ajustar el tamaño del canvas al tamaño de la ventana
-        canvas.config(width=event.width-20, height=event.height-20)  # -20 para dar espacio a la barra de desplazamiento
+        def on_analyze_error(e):
+            if branches_window.winfo_exists():
+                update_selection()
+            if isinstance(e, requests.RequestException):
+                messagebox.showerror("Error", "No se pudieron analizar las ramas del repositorio")
+            else:
+                self.show_task_error(e)
 
-    def delete_branch(self, branch, branches_window):
-        confirm = messagebox.askyesno("Confirmar", f"¿Está seguro de que desea eliminar la rama '{branch['name']}'?")
-        if confirm:
-            headers = {
-                'Authorization': f'token {self.token}',
-                'Accept': 'application/vnd.github.v3+json'
-            }
-            response = requests.delete(f"{self.selected_repo['url']}/git/refs/heads/{branch['name']}", headers=headers)
-            if response.status_code == 204:
-                messagebox.showinfo("Éxito", f"Rama '{branch['name']}' eliminada con éxito")
-                self.manage_branches(self.selected_repo, branches_window)  # Refresh the branches window
+        def select_stale():
+            try:
+                since = datetime.strptime(since_var.get().strip(), '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            except ValueError:
+                messagebox.showerror("Error", "Introduzca la fecha como AAAA-MM-DD")
+                return
+            analyze(lambda details: details['date'] is not None and details['date'] < since)
+
+        def show_count(complete=True):
+            prefix = filter_var.get().strip()
+            text = f"{len(items)} ramas"
+            if prefix:
+                text += f" que empiezan por '{prefix}'"
+            if not complete:
+                text += " (cargando...)"
+            count_label.config(text=text)
+
+        def show(branches, prefix, complete=True, reset_scroll=True):
+            # Se descartan resultados de un filtro que ya no es el actual
+            if not branches_window.winfo_exists() or prefix != filter_var.get().strip():
+                return
+            items[:] = branches
+            # Sólo se mantienen marcadas las ramas que siguen a la vista (las
+            # que aún no han llegado se comprueban al terminar)
+            if complete:
+                checked.intersection_update(b['name'] for b in branches)
+            branch_list.set_items(items, reset_scroll)
+            show_count(complete)
+            update_selection()
+
+        def on_error(e):
+            if isinstance(e, requests.RequestException):
+                if branches_window.winfo_exists():
+                    count_label.config(text="Error")
+                messagebox.showerror("Error", "No se pudieron obtener las ramas del repositorio")
             else:
-                messagebox.showerror("Error", "No se pudo eliminar la rama")
-
-    def set_default_branch(self, branch, branches_window, update_default_branch_label=None):
-        headers = {
-            'Authorization': f'token {self.token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        data = {
-            'default_branch': branch['name']
-        }
-        response = requests.patch(self.selected_repo['url'], headers=headers, json=data)
-        if response.status_code == 200:
-            messagebox.showinfo("Éxito", f"Rama '{branch['name']}' establecida como predeterminada")
+                self.show_task_error(e)
+
+        def load():
+            nonlocal load_task, filter_after_id
+            filter_after_id = None
+            if load_task is not None:
+                load_task.cancel()
+            prefix = filter_var.get().strip()
+            if self.store.is_fresh(repo, 'branches'):
+                # Ramas ya en memoria (GraphQL o una carga anterior)
+                show(self.core.branches(repo, prefix), prefix)
+                return
+            count_label.config(text="Cargando ramas...")
+            # Sin prefijo las ramas se muestran según van llegando; el scroll
+            # sólo vuelve arriba con la primera tanda
+            shown = []
+
+            def fetch():
+                task = current_task()
+
+                def progress(branches):
+                    task.report(show, branches, prefix, False, not shown)
+                    shown.append(True)
+                return self.core.branches(repo, prefix, on_progress=progress)
+
+            load_task = self.tasks.submit(fetch, on_success=lambda branches: show(branches, prefix, True, not shown),
+                                          on_error=on_error, description=f"Ramas de {repo['name']}")
+
+        def on_filter(*args):
+            nonlocal filter_after_id
+            if filter_after_id is not None:
+                branches_window.after_cancel(filter_after_id)
+            filter_after_id = branches_window.after(SEARCH_DEBOUNCE_MS, load)
+
+        # Tras cada cambio sólo se actualizan las filas afectadas
+        def on_deleted(names):
+            if not branches_window.winfo_exists():
+                return
+            deleted = set(names)
+            items[:] = [b for b in items if b['name'] not in deleted]
+            checked.difference_update(deleted)
+            branch_list.set_items(items, reset_scroll=False)
+            show_count()
+            update_selection()
+
+        def on_default_changed(branch):
             if update_default_branch_label:
                 update_default_branch_label()
-            self.manage_branches(self.selected_repo, branches_window, update_default_branch_label)  # Actualizar la ventana de ramas
+            if branches_window.winfo_exists():
+                branch_list.render()
+
+        def on_created(branch):
+            if branches_window.winfo_exists() and branch['name'].startswith(filter_var.get().strip()):
+                items.append(branch)
+                branch_list.set_items(items, reset_scroll=False)
+                show_count()
+
+        filter_var.trace("w", on_filter)
+        self.center_window(branches_window, 420, 480)
+        load()
+
+    def delete_branches(self, repo, names, on_deleted):
+        if len(names) == 1:
+            question = f"¿Está seguro de que desea eliminar la rama '{names[0]}'?"
         else:
-            messagebox.showerror("Error", "No se pudo establecer la rama como predeterminada")
+            question = f"¿Está seguro de que desea eliminar {len(names)} ramas?"
+        if not messagebox.askyesno("Confirmar", question):
+            return
+
+        # Borrados en paralelo y un único resumen al final
+        def on_done(result):
+            on_deleted(result.succeeded)
+            if not result.failed:
+                messagebox.showinfo("Éxito", f"{len(result.succeeded)} rama(s) eliminada(s) con éxito")
+            else:
+                messagebox.showerror("Error", f"{len(result.succeeded)} rama(s) eliminada(s), "
+                                              f"{len(result.failed)} con error:\n{result.failure_lines()}")
+
+        def on_error(e):
+            # No se sabe qué ramas llegaron a borrarse: la próxima carga las pide de nuevo
+            self.store.invalidate(repo, 'branches')
+            if isinstance(e, RateLimitExceeded):
+                messagebox.showerror("Límite de la API", f"No se pudieron eliminar las ramas: {str(e)}")
+            else:
+                self.show_task_error(e)
+
+        self.tasks.submit(self.core.delete_branches, repo, names, on_success=on_done, on_error=on_error,
+                          description=f"Eliminando {len(names)} rama(s) de {repo['name']}")
+
+    def set_default_branch(self, repo, branch, on_changed):
+        def on_done(_):
+            messagebox.showinfo("Éxito", f"Rama '{branch['name']}' establecida como predeterminada")
+            on_changed(branch)
+
+        def on_error(e):
+            if isinstance(e, repo_manager.ManagerError):
+                messagebox.showerror("Error", "No se pudo establecer la rama como predeterminada")
+            else:
+                self.show_task_error(e)
 
-    def create_branch(self, branches_window):
+        self.tasks.submit(self.core.set_default_branch, repo, branch['name'], on_success=on_done,
+                          on_error=on_error, description=f"Rama predeterminada de {repo['name']}")
+
+    def create_branch(self, repo, on_created):
         new_branch_name = simpledialog.askstring("Nueva Rama", "Nombre de la nueva rama:")
-        if new_branch_name:
-            headers = {
-                'Authorization': f'token {self.token}',
-                'Accept': 'application/vnd.github.v3+json'
-            }
-            # Primero, obtener la rama predeterminada del repositorio
-            response = requests.get(self.selected_repo['url'], headers=headers)
-            if response.status_code == 200:
-                default_branch = response.json()['default_branch']
-                # Ahora, obtener el SHA del último commit en la rama predeterminada
-                response = requests.get(f"{self.selected_repo['url']}/git/refs/heads/{default_branch}", headers=headers)
-                if response.status_code == 200:
-                    default_branch_sha = response.json()['object']['sha']
-                    # Crear la nueva rama
-                    data = {
-                        'ref': f'refs/heads/{new_branch_name}',
-                        'sha': default_branch_sha
-                    }
-                    response = requests.post(f"{self.selected_repo['url']}/git/refs", headers=headers, json=data)
-                    if response.status_code == 201:
-                        messagebox.showinfo("Éxito", f"Rama '{new_branch_name}' creada con éxito")
-                        self.manage_branches(self.selected_repo, branches_window)  # Refrescar la ventana de ramas
-                    else:
-                        messagebox.showerror("Error", f"No se pudo crear la nueva rama. Código de estado: {response.status_code}")
-                else:
-                    messagebox.showerror("Error", f"No se pudo obtener la referencia de la rama predeterminada. Código de estado: {response.status_code}")
+        if not new_branch_name:
+            return
+
+        # El SHA de la rama predeterminada se resuelve siempre actual
+        def on_done(result):
+            if result.failed:
+                messagebox.showerror("Error", result.failed[repo['full_name']])
+                return
+            messagebox.showinfo("Éxito", f"Rama '{new_branch_name}' creada con éxito")
+            on_created(result.values[repo['full_name']])
+
+        def on_error(e):
+            # No se sabe si la rama llegó a crearse: la próxima carga las pide de nuevo
+            self.store.invalidate(repo, 'branches')
+            if isinstance(e, RateLimitExceeded):
+                messagebox.showerror("Límite de la API", f"No se pudo crear la rama: {str(e)}")
+            elif isinstance(e, repo_manager.ManagerError):
+                messagebox.showerror("Error", f"No se pudo crear la rama: {str(e)}")
             else:
-                messagebox.showerror("Error", f"No se pudo obtener la información del repositorio. Código de estado: {response.status_code}")
+                self.show_task_error(e)
+
+        self.tasks.submit(self.core.create_branch, [repo], new_branch_name, on_success=on_done, on_error=on_error,
+                          description=f"Creando rama {new_branch_name}")
     
     def get_default_branch(self, repo):
-        headers = {
-            'Authorization': f'token {self.token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        response = requests.get(repo['url'], headers=headers)
-        if response.status_code == 200:
-            repo_data = response.json()
-            return repo_data.get('default_branch', 'N/A')
-        else:
+        try:
+            return self.core.default_branch(repo) or 'N/A'
+        except requests.RequestException:
             return 'Error al obtener la rama'
 
+def profiled_main():
+    # Proceso lanzado por --profile-startup: marca cada fase hasta que la
+    # ventana del token está pintada y termina sin entrar en el bucle de Tk
+    profile = StartupProfile()
+    profile.mark("módulos importados")
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        profile.finish(error=str(e))
+        return
+    profile.mark("Tk inicializado")
+    app = GitHubRepoManager(root, preload_modules=False)
+    profile.mark("ventana del token creada")
+    root.wait_visibility(app.token_entry)
+    root.update_idletasks()
+    profile.mark("primer pintado")
+    profile.finish()
+    root.destroy()
+
+
 if __name__ == "__main__":
+    if PROFILE_FLAG in sys.argv:
+        if is_profiled_child():
+            profiled_main()
+        else:
+            print_startup_report(profile_startup(os.path.abspath(__file__)))
+        sys.exit(0)
     root = tk.Tk()
     app = GitHubRepoManager(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    app.tasks.shutdown()
+    if app.core is not None:
+        app.core.close()
\ No newline at end of file
@@ -0,0 +1,19 @@
+import os
+
+APP_NAME = 'gitapp'
+
+
+def cache_dir(*parts):
+    # Directorio de caché de la aplicación (respeta XDG_CACHE_HOME si existe)
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    path = os.path.join(base, APP_NAME, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def config_dir(*parts):
+    # Configuración del usuario (respeta XDG_CONFIG_HOME si existe)
+    base = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    path = os.path.join(base, APP_NAME, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
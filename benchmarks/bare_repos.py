@@ -0,0 +1,71 @@
+# Repositorios bare locales de tamaño configurable para medir clone, pull y
+# push sin red. La historia se genera con git fast-import (un único proceso,
+# sin árbol de trabajo) y es determinista: mismos parámetros, mismos hashes.
+import os
+import random
+import subprocess
+
+GIT_ENV = dict(os.environ, GIT_AUTHOR_NAME='bench', GIT_AUTHOR_EMAIL='bench@example.com',
+               GIT_COMMITTER_NAME='bench', GIT_COMMITTER_EMAIL='bench@example.com')
+
+# Fecha fija de los commits generados, para que los hashes no cambien
+EPOCH = 1700000000
+
+
+def git(*args, cwd=None, input=None):
+    return subprocess.run(['git', *args], cwd=cwd, input=input, check=True, env=GIT_ENV,
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout
+
+
+def _blob(rng, size):
+    # Texto pseudoaleatorio: se comprime como código, no como ceros
+    words = ('def', 'return', 'self', 'value', 'import', 'class', 'for', 'in', 'if', 'else', 'None')
+    out = []
+    length = 0
+    while length < size:
+        line = ' '.join(rng.choice(words) for _ in range(8)) + f' {rng.getrandbits(32):08x}\n'
+        out.append(line)
+        length += len(line)
+    return ''.join(out)[:size].encode()
+
+
+def fast_import_stream(files, file_size, commits, branches, seed=0):
+    # commits en main, cada uno cambiando ~1/commits de los ficheros (el
+    # primero los crea todos); las ramas salen de commits repartidos por la
+    # historia
+    rng = random.Random(seed)
+    chunks = []
+    for number in range(1, commits + 1):
+        message = f'commit {number}\n'.encode()
+        chunks.append(b'commit refs/heads/main\n')
+        chunks.append(f'mark :{number}\n'.encode())
+        chunks.append(f'committer bench <bench@example.com> {EPOCH + number * 60} +0000\n'.encode())
+        chunks.append(f'data {len(message)}\n'.encode() + message)
+        if number > 1:
+            chunks.append(f'from :{number - 1}\n'.encode())
+        changed = range(files) if number == 1 else rng.sample(range(files), max(1, files // commits))
+        for index in changed:
+            data = _blob(rng, file_size)
+            chunks.append(f'M 644 inline src/file_{index:05d}.py\ndata {len(data)}\n'.encode() + data + b'\n')
+        chunks.append(b'\n')
+    for index in range(branches):
+        chunks.append(f'reset refs/heads/rama-{index:04d}\nfrom :{rng.randint(1, commits)}\n\n'.encode())
+    return b''.join(chunks)
+
+
+def make_bare_repo(path, files=200, file_size=2048, commits=50, branches=20, seed=0):
+    git('init', '-q', '--bare', '-b', 'main', path)
+    git('fast-import', '--quiet', cwd=path, input=fast_import_stream(files, file_size, commits, branches, seed))
+    # Empaquetado como lo serviría GitHub
+    git('repack', '-adq', cwd=path)
+    return path
+
+
+def push_commit(work, branch='main', name='cambio.txt'):
+    # Un commit nuevo en work, subido a su origin (para que otro clon tenga
+    # algo que traer)
+    with open(os.path.join(work, name), 'a') as f:
+        f.write(os.urandom(256).hex() + '\n')
+    git('add', name, cwd=work)
+    git('commit', '-qm', f'cambio en {branch}', cwd=work)
+    git('push', '-q', 'origin', f'HEAD:{branch}', cwd=work)
@@ -0,0 +1,92 @@
+# Compara los modos de clonado (completo, sin blobs, sin árboles, superficial,
+# una sola rama y con --reference) contra un repositorio bare local servido
+# por file://, que usa el mismo protocolo de transferencia que un remoto.
+#
+#   python benchmarks/bench_clone_modes.py [--commits 200] [--files 200] [--branches 20]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from git_clone import clone, clone_options  # noqa: E402
+
+GIT_ENV = dict(os.environ, GIT_AUTHOR_NAME='bench', GIT_AUTHOR_EMAIL='bench@example.com',
+               GIT_COMMITTER_NAME='bench', GIT_COMMITTER_EMAIL='bench@example.com')
+
+
+def git(*args, cwd=None):
+    subprocess.run(['git', *args], cwd=cwd, check=True, env=GIT_ENV,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def make_bare(directory, commits, files, branches):
+    # Historia en la que cada commit reescribe una parte de los archivos, para
+    # que la historia completa pese bastante más que la última versión
+    work = os.path.join(directory, 'work')
+    bare = os.path.join(directory, 'origin.git')
+    git('init', '-q', '-b', 'main', work)
+    for commit in range(commits):
+        for i in range(commit % 10, files, 10):
+            with open(os.path.join(work, f'file{i}.txt'), 'w') as f:
+                f.write(os.urandom(2048).hex())
+        git('add', '-A', cwd=work)
+        git('commit', '-qm', f'commit {commit}', cwd=work)
+        if commit % max(commits // branches, 1) == 0:
+            git('branch', f'rama-{commit}', cwd=work)
+    git('clone', '-q', '--bare', work, bare)
+    # Necesario para servir clones parciales
+    git('config', 'uploadpack.allowFilter', 'true', cwd=bare)
+    return bare
+
+
+def size_of(path):
+    total = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--commits', type=int, default=200)
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--branches', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        bare = make_bare(directory, args.commits, args.files, args.branches)
+        url = f'file://{bare}'
+        reference = os.path.join(directory, 'referencia')
+        clone(url, reference)
+
+        print(f"{args.commits} commits, {args.files} archivos, {args.branches} ramas")
+        print(f"{'modo':<34}{'tiempo (s)':>12}{'.git (MiB)':>12}")
+        scenarios = [
+            ('completo', clone_options('full')),
+            ('sin blobs', clone_options('blobless')),
+            ('sin árboles', clone_options('treeless')),
+            ('superficial, depth=1', clone_options('shallow', depth=1)),
+            ('superficial + una rama', clone_options('shallow', depth=1, single_branch=True)),
+            ('una rama', clone_options('full', branch='main', single_branch=True)),
+            ('sin blobs + una rama', clone_options('blobless', branch='main', single_branch=True)),
+            ('--reference a clon local', clone_options('full', reference=reference)),
+        ]
+        for index, (label, options) in enumerate(scenarios):
+            target = os.path.join(directory, f'clon{index}')
+            start = time.perf_counter()
+            clone(url, target, options)
+            elapsed = time.perf_counter() - start
+            size = size_of(os.path.join(target, '.git')) / (1024 * 1024)
+            print(f"{label:<34}{elapsed:>12.3f}{size:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# Cuenta los procesos git y el tiempo de acciones repetidas sobre un mismo
+# clon (estado para commit, comprobación de push y lectura del último
+# commit), abriendo un Repo nuevo y varios git status en cada acción como
+# antes o con Repo reutilizado y un único git status por acción, como ahora.
+#
+#   python benchmarks/bench_git_processes.py [--files 2000] [--actions 10]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from git import Repo  # noqa: E402
+from git_handles import ProcessCounter, RepoHandles  # noqa: E402
+from git_status import read_status  # noqa: E402
+
+GIT_ENV = {'GIT_AUTHOR_NAME': 'bench', 'GIT_AUTHOR_EMAIL': 'bench@example.com',
+           'GIT_COMMITTER_NAME': 'bench', 'GIT_COMMITTER_EMAIL': 'bench@example.com'}
+
+
+def make_clone(directory, files):
+    subprocess.run(['git', 'init', '-q', directory], check=True)
+    for i in range(files):
+        subdir = os.path.join(directory, f'dir{i % 50}')
+        os.makedirs(subdir, exist_ok=True)
+        with open(os.path.join(subdir, f'file{i}.txt'), 'w') as f:
+            f.write(f'{i}\n')
+    env = dict(os.environ, **GIT_ENV)
+    subprocess.run(['git', '-C', directory, 'add', '-A'], check=True, env=env)
+    subprocess.run(['git', '-C', directory, 'commit', '-qm', 'inicial'], check=True, env=env)
+    # Un cambio sin confirmar para que haya algo que mostrar
+    with open(os.path.join(directory, 'dir0', 'file0.txt'), 'a') as f:
+        f.write('cambio\n')
+
+
+def old_action(path):
+    git_repo = Repo(path)
+    if git_repo.is_dirty() or git_repo.untracked_files:
+        git_repo.git.status(porcelain=True)
+    git_repo = Repo(path)
+    if not git_repo.is_dirty() and not git_repo.untracked_files and not git_repo.head.is_detached:
+        git_repo.git.status()
+    git_repo.active_branch.name
+    Repo(path).head.commit.message
+
+
+def new_action(path, handles):
+    # Como RepoManager.status y branch_status: el estado se lee siempre
+    git_repo = handles.get(path)
+    read_status(git_repo).summary()
+    git_repo = handles.get(path)
+    status = read_status(git_repo)
+    status.clean and status.up_to_date
+    git_repo.head.commit.message
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--actions', type=int, default=10)
+    args = parser.parse_args()
+
+    counter = ProcessCounter()
+    counter.install()
+    with tempfile.TemporaryDirectory() as directory:
+        make_clone(directory, args.files)
+        print(f"{args.files} archivos, {args.actions} acciones")
+        print(f"{'modo':<34}{'procesos':>10}{'total (s)':>12}")
+
+        counter.reset()
+        start = time.perf_counter()
+        for _ in range(args.actions):
+            old_action(directory)
+        print(f"{'Repo nuevo + varios status':<34}{counter.total:>10}{time.perf_counter() - start:>12.3f}")
+
+        handles = RepoHandles()
+        counter.reset()
+        start = time.perf_counter()
+        for _ in range(args.actions):
+            new_action(directory, handles)
+        print(f"{'Repo cacheado + status al momento':<34}{counter.total:>10}{time.perf_counter() - start:>12.3f}")
+        handles.close_all()
+    counter.uninstall()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# Mide la carga de la lista de repositorios (load_repos) contra la API simulada:
+# tiempo hasta la primera fila y tiempo total, con distintos grados de paralelismo.
+#
+#   python benchmarks/bench_load_repos.py [--repos 5000] [--latency 0.05]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_client import GitHubClient  # noqa: E402
+from mock_github import MockGitHub  # noqa: E402
+
+
+def run(base_url, max_workers, per_page):
+    client = GitHubClient('token-de-prueba', base_url=base_url)
+    start = time.perf_counter()
+    first_row = None
+    pending, next_page, loaded = {}, 1, 0
+    for page, items in client.iter_pages('/user/repos', per_page=per_page, max_workers=max_workers):
+        pending[page] = items
+        # Mismo criterio que load_repos: sólo se "pinta" en orden estable
+        while next_page in pending:
+            loaded += len(pending.pop(next_page))
+            next_page += 1
+            if first_row is None:
+                first_row = time.perf_counter() - start
+    total = time.perf_counter() - start
+    client.close()
+    return first_row, total, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repos', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.05, help='latencia simulada por petición (s)')
+    args = parser.parse_args()
+
+    with MockGitHub(repo_count=args.repos, latency=args.latency) as mock:
+        print(f"{args.repos} repos, latencia {args.latency * 1000:.0f} ms por petición")
+        print(f"{'modo':<28}{'primera fila (s)':>18}{'total (s)':>12}{'repos':>8}")
+        scenarios = [
+            ('per_page=30, serie', 30, 1),
+            ('per_page=100, serie', 100, 1),
+            ('per_page=100, 4 workers', 100, 4),
+            ('per_page=100, 8 workers', 100, 8),
+        ]
+        for label, per_page, workers in scenarios:
+            first_row, total, loaded = run(mock.base_url, workers, per_page)
+            print(f"{label:<28}{first_row:>18.3f}{total:>12.3f}{loaded:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# Compara las dos formas de hacer pull de una rama contra un remoto bare local
+# con muchas ramas, todas con commits nuevos:
+#   antes: git fetch --all (todas las ramas) + origin.pull(rama) (otro fetch)
+#   ahora: git ls-remote --heads + fetch de una sola refspec + merge local
+#
+#   python benchmarks/bench_pull_paths.py [--branches 500] [--rounds 5]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from git import Repo  # noqa: E402
+
+GIT_ENV = dict(os.environ, GIT_AUTHOR_NAME='bench', GIT_AUTHOR_EMAIL='bench@example.com',
+               GIT_COMMITTER_NAME='bench', GIT_COMMITTER_EMAIL='bench@example.com')
+
+
+def git(*args, cwd=None):
+    subprocess.run(['git', *args], cwd=cwd, check=True, env=GIT_ENV,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def advance_all(work, branches, round_number):
+    # Un commit nuevo en cada rama, para que fetch --all tenga trabajo de verdad
+    for branch in ['main'] + [f'rama-{i}' for i in range(branches)]:
+        git('checkout', '-q', branch, cwd=work)
+        with open(os.path.join(work, f'{branch}.txt'), 'w') as f:
+            f.write(f'{round_number} {os.urandom(512).hex()}\n')
+        git('add', '-A', cwd=work)
+        git('commit', '-qm', f'{branch} {round_number}', cwd=work)
+    git('push', '-q', '--all', 'origin', cwd=work)
+
+
+def old_pull(clone):
+    git_repo = Repo(clone)
+    git_repo.git.fetch('--all')
+    sorted({ref.remote_head for remote in git_repo.remotes for ref in remote.refs})
+    git_repo.remotes.origin.pull('main', no_rebase=True, env=GIT_ENV)
+    git_repo.close()
+
+
+def new_pull(clone, url):
+    git_repo = Repo(clone)
+    output = git_repo.git.ls_remote('--heads', url)
+    sorted(line.split('\trefs/heads/', 1)[1] for line in output.splitlines() if '\trefs/heads/' in line)
+    git_repo.git.fetch('origin', '+refs/heads/main:refs/remotes/origin/main')
+    git_repo.git.merge('--no-edit', 'origin/main', env=GIT_ENV)
+    git_repo.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--branches', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        bare = os.path.join(directory, 'origin.git')
+        work = os.path.join(directory, 'work')
+        git('init', '-q', '--bare', bare)
+        git('clone', '-q', bare, work)
+        git('checkout', '-q', '-b', 'main', cwd=work)
+        git('commit', '-q', '--allow-empty', '-m', 'inicial', cwd=work)
+        for i in range(args.branches):
+            git('branch', f'rama-{i}', cwd=work)
+        git('push', '-q', '--all', 'origin', cwd=work)
+        url = f'file://{bare}'
+        clones = {}
+        for mode in ('antes', 'ahora'):
+            clones[mode] = os.path.join(directory, mode)
+            git('clone', '-q', '-b', 'main', url, clones[mode])
+
+        print(f"{args.branches} ramas, {args.rounds} rondas con un commit nuevo en cada rama")
+        totals = {'antes': 0.0, 'ahora': 0.0}
+        for round_number in range(args.rounds):
+            advance_all(work, args.branches, round_number)
+            start = time.perf_counter()
+            old_pull(clones['antes'])
+            totals['antes'] += time.perf_counter() - start
+            start = time.perf_counter()
+            new_pull(clones['ahora'], url)
+            totals['ahora'] += time.perf_counter() - start
+
+        print(f"{'modo':<44}{'media (s)':>12}")
+        print(f"{'fetch --all + pull':<44}{totals['antes'] / args.rounds:>12.3f}")
+        print(f"{'ls-remote + fetch de una refspec + merge':<44}{totals['ahora'] / args.rounds:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
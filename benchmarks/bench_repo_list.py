@@ -0,0 +1,80 @@
+# Mide la latencia tecla -> repintado de la lista de repositorios con 10k repos:
+# la versión anterior (destruir y crear un botón por repo) frente a VirtualList.
+# Necesita un display (en Linux sin escritorio: xvfb-run python benchmarks/bench_repo_list.py).
+#
+#   python benchmarks/bench_repo_list.py [--repos 10000]
+import argparse
+import os
+import statistics
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from virtual_list import VirtualList  # noqa: E402
+from mock_github import make_repo  # noqa: E402
+
+# Lo que escribe el usuario en la barra de búsqueda, tecla a tecla
+KEYSTROKES = ['r', 're', 'rep', 'repo', 'repo-', 'repo-0', 'repo-00', 'repo-0', 'repo-', '']
+
+
+class RebuildList:
+    # Comportamiento anterior de display_filtered_repos: destruir y recrear todo
+
+    def __init__(self, master):
+        self.canvas = tk.Canvas(master)
+        self.frame = ttk.Frame(self.canvas)
+        self.frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
+        self.canvas.create_window((0, 0), window=self.frame, anchor="nw")
+        self.canvas.pack(fill="both", expand=True)
+
+    def set_items(self, repos):
+        for widget in self.frame.winfo_children():
+            widget.destroy()
+        for repo in repos:
+            ttk.Button(self.frame, text=repo['name']).pack(fill='x', padx=5, pady=2)
+
+
+def measure(root, widget, repos):
+    timings = []
+    for term in KEYSTROKES:
+        start = time.perf_counter()
+        widget.set_items([repo for repo in repos if term in repo['name'].lower()])
+        root.update()  # Hasta que la lista está repintada
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repos', type=int, default=10000)
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"No hay display disponible ({e}); ejecute con xvfb-run.")
+        return 1
+    root.geometry("400x400")
+    repos = [make_repo(i, 'http://localhost') for i in range(args.repos)]
+
+    print(f"{args.repos} repos, {len(KEYSTROKES)} pulsaciones")
+    print(f"{'lista':<16}{'mediana (ms)':>14}{'máx (ms)':>12}")
+    for label, factory in (('reconstruir', RebuildList), ('VirtualList', lambda m: VirtualList(m, text=lambda r: r['name']))):
+        container = ttk.Frame(root)
+        container.pack(fill="both", expand=True)
+        widget = factory(container)
+        if isinstance(widget, VirtualList):
+            widget.pack(fill="both", expand=True)
+        root.update()
+        timings = measure(root, widget, repos)
+        print(f"{label:<16}{statistics.median(timings) * 1000:>14.1f}{max(timings) * 1000:>12.1f}")
+        container.destroy()
+    root.destroy()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
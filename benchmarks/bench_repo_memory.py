@@ -0,0 +1,91 @@
+# Memoria que ocupa la lista de repositorios en la aplicación con 50 000
+# repositorios repartidos entre varias cuentas y organizaciones, según cómo se
+# guarda cada uno:
+#   diccionario completo: response.json() de /user/repos tal cual (~100 campos)
+#   diccionario reducido: sólo los campos que usa la aplicación
+#   RepoRecord: slots, campos derivados de full_name y cadenas compartidas
+# Las páginas (100 repositorios, con todos los campos de GitHub) se generan
+# una a una y se leen como en la aplicación; se mide con tracemalloc lo que
+# queda al terminar, el tiempo de construir la lista (con tracemalloc activo:
+# sólo sirve para comparar) y el de leer de cada repositorio lo que muestra
+# la lista (nombre y visibilidad).
+#
+#   python benchmarks/bench_repo_memory.py [--repos 50000] [--owners 20]
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_github import full_payload_repo, make_repo  # noqa: E402
+from repo_store import REPO_FIELDS, RepoRecord  # noqa: E402
+
+BASE_URL = 'https://api.github.com'
+PAGE_SIZE = 100
+
+
+def iter_pages(repos, owners):
+    for start in range(0, repos, PAGE_SIZE):
+        page = []
+        for index in range(start, min(start + PAGE_SIZE, repos)):
+            login = f'org-{index % owners:02d}'
+            page.append(full_payload_repo(make_repo(index, BASE_URL, login), BASE_URL, login))
+        yield json.dumps(page).encode()
+
+
+def slim_dict(data):
+    repo = {key: data[key] for key in REPO_FIELDS if key in data and key != 'owner'}
+    owner = data.get('owner')
+    if owner:
+        repo['owner'] = {'login': owner.get('login'), 'avatar_url': owner.get('avatar_url')}
+    return repo
+
+
+def measure(args, convert):
+    gc.collect()
+    tracemalloc.start()
+    repos = []
+    elapsed = 0.0
+    for body in iter_pages(args.repos, args.owners):
+        # Sólo cuenta leer la página y convertirla, no generarla
+        start = time.perf_counter()
+        repos.extend(convert(item) for item in json.loads(body))
+        elapsed += time.perf_counter() - start
+        del body
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for repo in repos:
+        repo['name'], repo['private']
+    read = time.perf_counter() - start
+    assert len(repos) == args.repos
+    return retained, elapsed, read
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repos', type=int, default=50000)
+    parser.add_argument('--owners', type=int, default=20, help="cuentas y organizaciones entre las que se reparten")
+    args = parser.parse_args()
+
+    print(f"{args.repos} repositorios de {args.owners} propietarios")
+    print(f"{'formato':<24}{'memoria (MB)':>14}{'bytes/repo':>12}{'carga (ms)':>12}{'lectura (ms)':>14}")
+    modes = [
+        ('diccionario completo', lambda data: data),
+        ('diccionario reducido', slim_dict),
+        ('RepoRecord', RepoRecord.from_api),
+    ]
+    for label, convert in modes:
+        retained, elapsed, read = measure(args, convert)
+        print(f"{label:<24}{retained / 2 ** 20:>14.1f}{retained / args.repos:>12.0f}"
+              f"{elapsed * 1000:>12.0f}{read * 1000:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
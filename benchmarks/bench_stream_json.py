@@ -0,0 +1,107 @@
+# Compara la lectura de /user/repos (páginas de 100 repositorios con los ~100
+# campos de GitHub) de dos formas:
+#   antes: iter_pages, response.json() de cada página completa
+#   ahora: iter_items, cuerpo en streaming y cada repositorio reducido a los
+#          campos que usa la aplicación en cuanto se completa
+# Mide el tiempo hasta la primera fila y hasta la última con un enlace
+# limitado, y la memoria (tracemalloc) máxima y la que queda al terminar.
+# La API simulada va en otro proceso para que no cuente en la memoria ni
+# compita por el GIL.
+#
+#   python benchmarks/bench_stream_json.py [--repos 1000] [--bandwidth 2000000] [--rounds 3]
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_client import GitHubClient  # noqa: E402
+from mock_github import MockGitHub  # noqa: E402
+from repo_store import RepoRecord  # noqa: E402
+
+
+def serve(conn, repos, bandwidth):
+    with MockGitHub(repo_count=repos, full_payload=True, bandwidth=bandwidth) as mock:
+        conn.send(mock.base_url)
+        conn.recv()
+
+
+def load_pages(client):
+    # Como antes en load_repos: las páginas se muestran en orden cuando
+    # están completas
+    start = time.perf_counter()
+    first_row = None
+    pending, next_page, repos = {}, 1, []
+    for page, items in client.iter_pages('/user/repos'):
+        pending[page] = items
+        while next_page in pending:
+            repos.extend(pending.pop(next_page))
+            next_page += 1
+            if first_row is None:
+                first_row = time.perf_counter() - start
+    return first_row, time.perf_counter() - start, repos
+
+
+def load_stream(client, reduce):
+    start = time.perf_counter()
+    first_row = None
+    repos = []
+    for batch in client.iter_items('/user/repos', reduce=reduce):
+        repos.extend(batch)
+        if first_row is None:
+            first_row = time.perf_counter() - start
+    return first_row, time.perf_counter() - start, repos
+
+
+def measure(base_url, load, rounds):
+    times = []
+    for _ in range(rounds):
+        client = GitHubClient('token-de-prueba', base_url=base_url)
+        first_row, total, repos = load(client)
+        times.append((first_row, total))
+        client.close()
+    # Memoria en una ronda aparte: tracemalloc ralentiza la lectura
+    client = GitHubClient('token-de-prueba', base_url=base_url)
+    tracemalloc.start()
+    _, _, repos = load(client)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    client.close()
+    return (statistics.median(t[0] for t in times), statistics.median(t[1] for t in times),
+            peak / 2 ** 20, retained / 2 ** 20, len(repos))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repos', type=int, default=1000)
+    parser.add_argument('--bandwidth', type=float, default=2e6, help="bytes por segundo por respuesta (0: sin límite)")
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    conn, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(child, args.repos, args.bandwidth or None), daemon=True)
+    server.start()
+    base_url = conn.recv()
+    try:
+        print(f"{args.repos} repos en páginas de 100, {args.bandwidth / 1e6:.1f} MB/s por respuesta")
+        print(f"{'modo':<34}{'1ª fila (ms)':>14}{'total (ms)':>12}{'pico (MB)':>11}{'retenido (MB)':>15}")
+        modes = [
+            ('response.json() por página', load_pages),
+            ('streaming, objetos completos', lambda client: load_stream(client, None)),
+            ('streaming + campos usados', lambda client: load_stream(client, RepoRecord.from_api)),
+        ]
+        for label, load in modes:
+            first_row, total, peak, retained, count = measure(base_url, load, args.rounds)
+            assert count == args.repos
+            print(f"{label:<34}{first_row * 1000:>14.1f}{total * 1000:>12.1f}{peak:>11.1f}{retained:>15.1f}")
+    finally:
+        conn.send(None)
+        server.join(5)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# Coste del registro de tiempos: un tramo vacío desactivado y activado, y
+# peticiones reales contra la API simulada y comandos git con el registro
+# sin instalar, desactivado y activado.
+#
+#   python benchmarks/bench_tracing_overhead.py [--requests 300] [--git 100]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from git import Repo  # noqa: E402
+
+from github_client import GitHubClient  # noqa: E402
+from mock_github import MockGitHub  # noqa: E402
+from tracing import tracer  # noqa: E402
+
+
+SPAN = "with tracer.span('x', 'http'): pass"
+
+
+def per_call_ns(statement, number=200000):
+    return min(timeit.repeat(statement, number=number, repeat=5, globals={'tracer': tracer})) / number * 1e9
+
+
+def http_ms(client, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        client.get('/user')
+    return (time.perf_counter() - start) / count * 1000
+
+
+def git_ms(git_repo, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        git_repo.git.rev_parse('HEAD')
+    return (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--git', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'tramo vacío':<28}{'ns por llamada':>16}")
+    tracer.disable()
+    print(f"{'  desactivado':<28}{per_call_ns(SPAN):>16.0f}")
+    tracer.enable()
+    print(f"{'  activado':<28}{per_call_ns(SPAN, 20000):>16.0f}")
+    tracer.disable()
+    tracer.clear()
+
+    with MockGitHub(repo_count=10) as mock, tempfile.TemporaryDirectory() as directory:
+        client = GitHubClient('token-de-prueba', base_url=mock.base_url)
+        subprocess.run(['git', 'init', '-q', directory], check=True)
+        subprocess.run(['git', '-c', 'user.name=bench', '-c', 'user.email=bench@example.com',
+                        'commit', '-q', '--allow-empty', '-m', 'inicial'], cwd=directory, check=True)
+        git_repo = Repo(directory)
+        http_ms(client, 20)
+
+        print(f"\n{'modo':<28}{'HTTP (ms/petición)':>20}{'git (ms/comando)':>18}")
+        # Sin instalar: Git.execute aún no está envuelto
+        print(f"{'sin instalar':<28}{http_ms(client, args.requests):>20.3f}{git_ms(git_repo, args.git):>18.3f}")
+        tracer.enable()
+        tracer.disable()
+        print(f"{'desactivado':<28}{http_ms(client, args.requests):>20.3f}{git_ms(git_repo, args.git):>18.3f}")
+        tracer.enable()
+        print(f"{'activado':<28}{http_ms(client, args.requests):>20.3f}{git_ms(git_repo, args.git):>18.3f}")
+        print(f"\n{len(tracer.spans())} tramos registrados")
+        git_repo.close()
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# Comprueba que el arranque no empeora: lanza GITApp.py --profile-startup
+# varias veces y falla (código 1) si la mediana del tiempo hasta la ventana
+# del token supera el presupuesto, o si antes de ella ya se han importado
+# requests, GitPython o Pillow. Sin pantalla (CI) sólo se mide hasta tener
+# los módulos importados, con su propio presupuesto.
+#
+#   python benchmarks/check_startup_budget.py [--runs 5] [--budget-ms 600] [--import-budget-ms 250]
+import argparse
+import os
+import statistics
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from startup import profile_startup  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=600,
+                        help="hasta el primer pintado de la ventana del token")
+    parser.add_argument('--import-budget-ms', type=float, default=250,
+                        help="hasta tener importados los módulos de GITApp")
+    args = parser.parse_args()
+
+    script = os.path.join(ROOT, 'GITApp.py')
+    times = {}
+    heavy = set()
+    error = None
+    for _ in range(args.runs):
+        report = profile_startup(script)
+        for label, seconds in report['marks']:
+            times.setdefault(label, []).append(seconds * 1000)
+        heavy.update(report['heavy_modules'])
+        error = report['error']
+
+    print(f"{'fase':<32}{'mediana (ms)':>14}{'máximo (ms)':>14}")
+    for label, values in times.items():
+        print(f"{label:<32}{statistics.median(values):>14.1f}{max(values):>14.1f}")
+
+    failures = []
+    if heavy:
+        failures.append(f"módulos pesados cargados antes de la ventana del token: {', '.join(sorted(heavy))}")
+    if 'primer pintado' in times:
+        measured, budget, phase = statistics.median(times['primer pintado']), args.budget_ms, "primer pintado"
+    elif 'módulos importados' in times:
+        print(f"Sin ventana ({error}): sólo se comprueba la importación")
+        measured, budget, phase = statistics.median(times['módulos importados']), args.import_budget_ms, "módulos importados"
+    else:
+        print(f"No se pudo arrancar GITApp.py: {error}")
+        return 1
+    if measured > budget:
+        failures.append(f"{phase}: {measured:.1f} ms supera el presupuesto de {budget:.0f} ms")
+
+    for failure in failures:
+        print(f"FALLO: {failure}")
+    if not failures:
+        print(f"OK: {phase} en {measured:.1f} ms (presupuesto {budget:.0f} ms)")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,346 @@
+# Servidor local que imita los endpoints de la API de GitHub que usa la
+# aplicación, para poder medir sin red ni token real: /user, /user/repos,
+# /repos/{owner}/{name} con sus ramas (/branches, /git/matching-refs,
+# /git/ref, /git/refs) y las consultas GraphQL de la lista de repositorios
+# y de las ramas predeterminadas. Las demás consultas GraphQL responden con
+# un error, como un GitHub Enterprise sin ese esquema, y la aplicación pasa
+# a REST.
+import hashlib
+import json
+import threading
+import time
+import urllib.parse
+from urllib.parse import unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Campos *_url de un repositorio en /user/repos (GitHub los envía siempre)
+URL_FIELDS = ('archive', 'assignees', 'blobs', 'branches', 'collaborators', 'comments', 'commits', 'compare',
+              'contents', 'contributors', 'deployments', 'downloads', 'events', 'forks', 'git_commits',
+              'git_refs', 'git_tags', 'hooks', 'issue_comment', 'issue_events', 'issues', 'keys', 'labels',
+              'languages', 'merges', 'milestones', 'notifications', 'pulls', 'releases', 'stargazers',
+              'statuses', 'subscribers', 'subscription', 'tags', 'teams', 'trees')
+OWNER_URL_FIELDS = ('followers', 'following', 'gists', 'starred', 'subscriptions', 'organizations', 'repos',
+                    'events', 'received_events')
+
+
+def full_payload_repo(repo, base_url, login):
+    # El resto de campos de un repositorio real (unos 100 en total), para
+    # medir con respuestas del tamaño de las de GitHub
+    api = f"{base_url}/repos/{repo['full_name']}"
+    extra = {f'{field}_url': f'{api}/{field}{{/id}}' for field in URL_FIELDS}
+    extra.update({
+        'node_id': f"R_kgDO{repo['id']:08d}",
+        'owner': {'login': login, 'id': 1, 'node_id': 'MDQ6VXNlcjE=', 'avatar_url': f'{base_url}/avatar.png',
+                  'gravatar_id': '', 'url': f'{base_url}/users/{login}', 'html_url': f'https://github.com/{login}',
+                  'type': 'User', 'site_admin': False,
+                  **{f'{field}_url': f'{base_url}/users/{login}/{field}' for field in OWNER_URL_FIELDS}},
+        'fork': False, 'homepage': None, 'size': repo['id'] % 50000, 'watchers_count': repo['stargazers_count'],
+        'has_issues': True, 'has_projects': True, 'has_downloads': True, 'has_wiki': True, 'has_pages': False,
+        'has_discussions': False, 'mirror_url': None, 'archived': False, 'disabled': False,
+        'open_issues_count': repo['id'] % 7, 'license': {'key': 'mit', 'name': 'MIT License', 'spdx_id': 'MIT',
+                                                          'url': f'{base_url}/licenses/mit', 'node_id': 'MDc6TGljZW5zZTEz'},
+        'allow_forking': True, 'is_template': False, 'web_commit_signoff_required': False,
+        'topics': ['benchmark', repo['language'].lower()], 'visibility': 'private' if repo['private'] else 'public',
+        'forks': repo['forks_count'], 'open_issues': repo['id'] % 7, 'watchers': repo['stargazers_count'],
+        'pushed_at': '2024-01-01T00:00:00Z', 'git_url': f"git://github.com/{repo['full_name']}.git",
+        'ssh_url': f"git@github.com:{repo['full_name']}.git", 'svn_url': f"https://github.com/{repo['full_name']}",
+        'permissions': {'admin': True, 'maintain': True, 'push': True, 'triage': True, 'pull': True},
+    })
+    return dict(repo, **extra)
+
+
+def make_repo(index, base_url, login='octocat'):
+    name = f'repo-{index:05d}'
+    full_name = f'{login}/{name}'
+    return {
+        'id': 100000 + index,
+        'name': name,
+        'full_name': full_name,
+        'private': index % 3 == 0,
+        'description': f'Repositorio de prueba número {index}',
+        'language': ('Python', 'Rust', 'Go', 'JavaScript')[index % 4],
+        'url': f'{base_url}/repos/{full_name}',
+        'html_url': f'https://github.com/{full_name}',
+        'clone_url': f'https://github.com/{full_name}.git',
+        'default_branch': 'main',
+        'stargazers_count': index % 97,
+        'forks_count': index % 13,
+        'created_at': '2020-01-01T00:00:00Z',
+        'updated_at': '2024-01-01T00:00:00Z',
+    }
+
+
+def branch_names(count):
+    # main y, detrás, ramas con los prefijos habituales
+    prefixes = ('feature', 'fix', 'release', 'chore')
+    return ['main'] + [f'{prefixes[i % len(prefixes)]}/{i:05d}' for i in range(count - 1)]
+
+
+def branch_sha(full_name, branch):
+    return hashlib.sha1(f'{full_name}:{branch}'.encode()).hexdigest()
+
+
+class MockGitHub:
+
+    def __init__(self, repo_count=100, latency=0.0, login='octocat', rate_limit=5000, rate_window=3600,
+                 branch_count=30, full_payload=False, bandwidth=None):
+        self.repo_count = repo_count
+        self.branch_count = branch_count
+        # Bytes por segundo al enviar cada cuerpo (None: sin límite), para
+        # imitar un enlace lento
+        self.bandwidth = bandwidth
+        self.latency = latency
+        self.login = login
+        self.request_count = 0
+        self.not_modified_count = 0
+        self.rate_limit = rate_limit
+        self.rate_remaining = rate_limit
+        self.rate_window = rate_window
+        self.rate_reset = int(time.time()) + rate_window
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self.server.daemon_threads = True
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        self._repos = [make_repo(i, self.base_url, login) for i in range(repo_count)]
+        if full_payload:
+            self._repos = [full_payload_repo(repo, self.base_url, login) for repo in self._repos]
+        self._by_name = {repo['full_name']: repo for repo in self._repos}
+        self._branches = {}    # full_name -> {rama: sha}, creado al pedirlo
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def set_clone_url(self, full_name, url):
+        # Para que git trabaje contra un repositorio bare local
+        self._by_name[full_name]['clone_url'] = url
+
+    def branches(self, full_name):
+        with self._lock:
+            branches = self._branches.get(full_name)
+            if branches is None:
+                branches = self._branches[full_name] = {
+                    name: branch_sha(full_name, name) for name in branch_names(self.branch_count)}
+            return branches
+
+    def ref(self, full_name, branch):
+        return {'ref': f'refs/heads/{branch}', 'url': f'{self.base_url}/repos/{full_name}/git/refs/heads/{branch}',
+                'object': {'sha': self.branches(full_name)[branch], 'type': 'commit'}}
+
+    def graphql_page(self, variables):
+        # Página de viewer.repositories con el cursor como desplazamiento
+        start = int(variables.get('cursor') or 0)
+        size = variables.get('pageSize', 100)
+        nodes = []
+        for repo in self._repos[start:start + size]:
+            branches = self.branches(repo['full_name'])
+            first = list(branches.items())[:variables.get('branches', 30)]
+            nodes.append({
+                'databaseId': repo['id'], 'name': repo['name'], 'nameWithOwner': repo['full_name'],
+                'description': repo['description'], 'url': repo['html_url'], 'isPrivate': repo['private'],
+                'stargazerCount': repo['stargazers_count'], 'forkCount': repo['forks_count'],
+                'createdAt': repo['created_at'], 'updatedAt': repo['updated_at'],
+                'primaryLanguage': {'name': repo['language']},
+                'owner': {'login': self.login, 'avatarUrl': f'{self.base_url}/avatar.png'},
+                'repositoryTopics': {'nodes': []},
+                'defaultBranchRef': {'name': repo['default_branch']},
+                'refs': {'totalCount': len(branches),
+                         'nodes': [{'name': name, 'target': {'oid': sha}} for name, sha in first]},
+            })
+        end = start + len(nodes)
+        return {'pageInfo': {'hasNextPage': end < len(self._repos), 'endCursor': str(end)}, 'nodes': nodes}
+
+    def graphql_heads(self, variables):
+        # Consulta con alias r0, r1... de repository(owner: $oN, name: $nN).
+        # Como GitHub, un repositorio que no existe viene a null con su error
+        data, errors = {}, []
+        index = 0
+        while f'o{index}' in variables:
+            full_name = f"{variables[f'o{index}']}/{variables[f'n{index}']}"
+            repo = self._by_name.get(full_name)
+            data[f'r{index}'] = repo and {'defaultBranchRef': {
+                'name': repo['default_branch'],
+                'target': {'oid': self.branches(full_name)[repo['default_branch']]}}}
+            if repo is None:
+                errors.append({'type': 'NOT_FOUND', 'path': [f'r{index}'],
+                               'message': f"Could not resolve to a Repository with the name '{full_name}'."})
+            index += 1
+        return data, errors
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with mock._lock:
+                    mock.request_count += 1
+                if mock.latency:
+                    time.sleep(mock.latency)
+
+                parsed = urllib.parse.urlparse(self.path)
+                query = urllib.parse.parse_qs(parsed.query)
+                if parsed.path == '/user':
+                    self.send_json({'login': mock.login, 'name': 'Octo Cat',
+                                    'avatar_url': f'{mock.base_url}/avatar.png'})
+                elif parsed.path == '/user/repos':
+                    self.send_page(parsed.path, query, mock._repos)
+                else:
+                    self.repo_get(parsed.path, query)
+
+            def repo_get(self, path, query):
+                full_name, rest = self.split_repo_path(path)
+                if full_name is None:
+                    self.send_json({'message': 'Not Found'}, status=404)
+                elif rest == '':
+                    self.send_json(mock._by_name[full_name])
+                elif rest == '/branches':
+                    branches = [{'name': name, 'protected': False,
+                                 'commit': {'sha': sha, 'url': f'{mock.base_url}/repos/{full_name}/commits/{sha}'}}
+                                for name, sha in mock.branches(full_name).items()]
+                    self.send_page(path, query, branches)
+                elif rest.startswith('/git/matching-refs/heads/'):
+                    prefix = unquote(rest[len('/git/matching-refs/heads/'):])
+                    refs = [mock.ref(full_name, name) for name in mock.branches(full_name) if name.startswith(prefix)]
+                    self.send_page(path, query, refs)
+                elif rest.startswith('/git/ref/heads/') and unquote(rest[len('/git/ref/heads/'):]) in mock.branches(full_name):
+                    self.send_json(mock.ref(full_name, unquote(rest[len('/git/ref/heads/'):])))
+                else:
+                    self.send_json({'message': 'Not Found'}, status=404)
+
+            def split_repo_path(self, path):
+                # ('owner/name', resto de la ruta) o (None, None) si el repositorio no existe
+                parts = path.split('/', 4)
+                if len(parts) < 4 or parts[1] != 'repos':
+                    return None, None
+                full_name = f'{parts[2]}/{parts[3]}'
+                if full_name not in mock._by_name:
+                    return None, None
+                return full_name, '/' + parts[4] if len(parts) > 4 else ''
+
+            def do_POST(self):
+                with mock._lock:
+                    mock.request_count += 1
+                if mock.latency:
+                    time.sleep(mock.latency)
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if self.path == '/graphql':
+                    variables = payload.get('variables') or {}
+                    if 'viewer' in payload.get('query', ''):
+                        self.send_json({'data': {'viewer': {'repositories': mock.graphql_page(variables)}}})
+                    elif 'o0' in variables:
+                        data, errors = mock.graphql_heads(variables)
+                        self.send_json({'data': data, 'errors': errors} if errors else {'data': data})
+                    else:
+                        self.send_json({'errors': [{'message': 'Consulta no disponible en el servidor simulado'}]})
+                    return
+                full_name, rest = self.split_repo_path(self.path)
+                if full_name is None or rest != '/git/refs':
+                    self.send_json({'message': 'Not Found'}, status=404)
+                    return
+                branch = payload.get('ref', '')[len('refs/heads/'):]
+                branches = mock.branches(full_name)
+                with mock._lock:
+                    exists = branch in branches
+                    if not exists:
+                        branches[branch] = payload.get('sha')
+                if exists:
+                    self.send_json({'message': 'Reference already exists'}, status=422)
+                else:
+                    self.send_json(mock.ref(full_name, branch), status=201)
+
+            def do_DELETE(self):
+                with mock._lock:
+                    mock.request_count += 1
+                if mock.latency:
+                    time.sleep(mock.latency)
+                full_name, rest = self.split_repo_path(self.path)
+                branch = unquote(rest[len('/git/refs/heads/'):]) if rest and rest.startswith('/git/refs/heads/') else None
+                branches = mock.branches(full_name) if full_name else {}
+                with mock._lock:
+                    removed = branches.pop(branch, None) is not None
+                if not removed:
+                    self.send_json({'message': 'Reference does not exist'}, status=422)
+                    return
+                self.send_response(204)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def send_page(self, path, query, items):
+                per_page = min(int(query.get('per_page', ['30'])[0]), 100)
+                page = int(query.get('page', ['1'])[0])
+                last_page = max(1, -(-len(items) // per_page))
+                start = (page - 1) * per_page
+                headers = {}
+                links = []
+                if page < last_page:
+                    links.append(f'<{mock.base_url}{path}?per_page={per_page}&page={page + 1}>; rel="next"')
+                    links.append(f'<{mock.base_url}{path}?per_page={per_page}&page={last_page}>; rel="last"')
+                if links:
+                    headers['Link'] = ', '.join(links)
+                self.send_json(items[start:start + per_page], headers=headers)
+
+            def send_json(self, data, status=200, headers=None):
+                headers = dict(headers or {})
+                # Cuota como la de GitHub: los 304 no consumen
+                with mock._lock:
+                    if time.time() >= mock.rate_reset:
+                        mock.rate_remaining = mock.rate_limit
+                        mock.rate_reset = int(time.time()) + mock.rate_window
+                    if mock.rate_remaining <= 0:
+                        status, data = 403, {'message': 'API rate limit exceeded'}
+                    elif not self.headers.get('If-None-Match'):
+                        mock.rate_remaining -= 1
+                    headers['X-RateLimit-Limit'] = str(mock.rate_limit)
+                    headers['X-RateLimit-Remaining'] = str(max(mock.rate_remaining, 0))
+                    headers['X-RateLimit-Reset'] = str(mock.rate_reset)
+                body = json.dumps(data).encode()
+                if status == 200:
+                    etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                    headers['ETag'] = etag
+                    if self.headers.get('If-None-Match') == etag:
+                        with mock._lock:
+                            mock.not_modified_count += 1
+                        self.send_response(304)
+                        self.send_header('ETag', etag)
+                        for key in ('X-RateLimit-Limit', 'X-RateLimit-Remaining', 'X-RateLimit-Reset'):
+                            self.send_header(key, headers[key])
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if not mock.bandwidth:
+                    self.wfile.write(body)
+                    return
+                step = 16 * 1024
+                for start in range(0, len(body), step):
+                    self.wfile.write(body[start:start + step])
+                    self.wfile.flush()
+                    time.sleep(min(step, len(body) - start) / mock.bandwidth)
+
+        return Handler
@@ -0,0 +1,340 @@
+# Batería de benchmarks reproducible y sin red: levanta la API simulada
+# (mock_github.py) y un repositorio bare local (bare_repos.py) y mide, con
+# RepoManager (el mismo núcleo que la aplicación y la línea de comandos), los
+# escenarios de uso habituales. Escribe los resultados en JSON para poder
+# compararlos entre versiones; con --compare falla (código 1) si algún
+# escenario es más lento que en el fichero anterior más allá de la
+# tolerancia.
+#
+#   python benchmarks/run_suite.py [--repos 1000] [--branches 300] [--rounds 5]
+#       [--files 200] [--file-kb 2] [--commits 50] [--latency 0]
+#       [--only login,clone,...] [--output resultados.json]
+#       [--compare anterior.json] [--tolerance 1.25]
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bare_repos import git, make_bare_repo, push_commit  # noqa: E402
+from github_client import GitHubClient  # noqa: E402
+from mock_github import MockGitHub  # noqa: E402
+from repo_manager import RepoManager  # noqa: E402
+from repo_search import RepoSearchIndex  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+from snapshot import AccountSnapshot  # noqa: E402
+
+TOKEN = 'token-de-prueba'
+
+# Lo que se escribe en el filtro de la lista, tecla a tecla
+FILTER_TYPING = ('repo-001', 'python 42')
+
+# Escenarios por orden: (nombre, función). Cada función prepara lo necesario
+# y devuelve lo que hay que medir, sin argumentos.
+SCENARIOS = []
+
+
+def scenario(func):
+    SCENARIOS.append((func.__name__, func))
+    return func
+
+
+class Context:
+    # Lo que comparten los escenarios: la API simulada, el repositorio bare y
+    # los clones de trabajo, creados la primera vez que se necesitan
+
+    def __init__(self, args, mock, directory):
+        self.args = args
+        self.mock = mock
+        self.directory = directory
+        self.repo_name = mock._repos[0]['full_name']
+        self._clones = {}
+        self._managers = []
+        self._count = 0
+        self.bare = make_bare_repo(os.path.join(directory, 'remoto.git'), args.files, args.file_kb * 1024,
+                                   args.commits, args.branches)
+        # El repositorio de la API apunta al bare local
+        mock.set_clone_url(self.repo_name, self.bare)
+
+    def path(self, name):
+        self._count += 1
+        return os.path.join(self.directory, f'{name}-{self._count}')
+
+    def manager(self, cache=False, snapshot=False):
+        # Uno nuevo por ronda: sin caché HTTP, RepoStore vacío y sin procesos
+        # git abiertos; la instantánea, si se pide, en el directorio temporal
+        client = GitHubClient(TOKEN, base_url=self.mock.base_url, cache=ResponseCache() if cache else None)
+        manager = RepoManager(client=client, workspace_path=os.path.join(self.directory, 'workspace.json'))
+        if snapshot:
+            manager.snapshot = AccountSnapshot(os.path.join(self.directory, 'snapshot.sqlite3'))
+        self._managers.append(manager)
+        return manager
+
+    def logged_in(self, cache=False, snapshot=False):
+        manager = self.manager(cache, snapshot)
+        manager.login()
+        return manager
+
+    def release(self):
+        # Sesiones HTTP y procesos git de la ronda terminada
+        for manager in self._managers:
+            manager.close()
+        self._managers.clear()
+
+    def clone_of_bare(self, name):
+        if name not in self._clones:
+            path = self._clones[name] = os.path.join(self.directory, name)
+            git('clone', '-q', self.bare, path)
+        return self._clones[name]
+
+
+@scenario
+def login(ctx):
+    return ctx.manager().login
+
+
+@scenario
+def load_repos_graphql(ctx):
+    manager = ctx.logged_in()
+    return lambda: manager.list_repos(use_graphql=True)
+
+
+@scenario
+def load_repos_rest(ctx):
+    manager = ctx.logged_in()
+    return lambda: manager.list_repos(use_graphql=False)
+
+
+@scenario
+def load_repos_revalidated(ctx):
+    # Segunda carga con la caché llena: todas las páginas vuelven como 304
+    manager = ctx.logged_in(cache=True)
+    manager.list_repos(use_graphql=False)
+    return lambda: manager.list_repos(use_graphql=False)
+
+
+@scenario
+def start_from_snapshot(ctx):
+    # Del token a la lista en pantalla con la instantánea de la sesión anterior
+    ctx.logged_in(snapshot=True).list_repos()
+    manager = ctx.manager(snapshot=True)
+    return lambda: manager.cached_account(TOKEN)
+
+
+@scenario
+def revalidate_snapshot(ctx):
+    # Recarga en segundo plano tras mostrar la instantánea, aplicando sólo las diferencias
+    ctx.logged_in(snapshot=True).list_repos()
+    manager = ctx.logged_in(snapshot=True)
+    cached = manager.cached_account(TOKEN)
+    return lambda: manager.revalidate_repos(cached.repos)
+
+
+@scenario
+def filter_repos(ctx):
+    # Índice nuevo y consultas escritas tecla a tecla, como en la lista
+    repos = ctx.logged_in().list_repos()
+
+    def run():
+        index = RepoSearchIndex(repos)
+        for text in FILTER_TYPING:
+            for length in range(1, len(text) + 1):
+                index.search(text[:length])
+    return run
+
+
+@scenario
+def open_repo(ctx):
+    # Lo que carga la ventana de un repositorio de la lista: detalles, rama
+    # predeterminada y estado del clon local
+    manager = ctx.logged_in()
+    manager.list_repos()
+    repo = manager.store.get(ctx.repo_name)
+    local_path = ctx.clone_of_bare('ventana')
+
+    def run():
+        manager.details(repo)
+        manager.default_branch(repo)
+        git_repo = manager.open_git(local_path)
+        manager.status(git_repo).summary()
+        manager.git_repos.close(local_path)
+    return run
+
+
+@scenario
+def branches(ctx):
+    # Todas las ramas de un repositorio sin precargar (varias páginas REST)
+    manager = ctx.logged_in()
+    repo = manager.find_repo(ctx.repo_name)
+    return lambda: manager.branches(repo)
+
+
+@scenario
+def branches_prefix(ctx):
+    manager = ctx.logged_in()
+    repo = manager.find_repo(ctx.repo_name)
+    return lambda: manager.branches(repo, 'fix/')
+
+
+@scenario
+def create_branch(ctx):
+    # La misma rama en 20 repositorios: una consulta GraphQL y un POST por repositorio
+    manager = ctx.logged_in()
+    repos = manager.list_repos()[:20]
+    name = os.path.basename(ctx.path('rama'))
+    return lambda: manager.create_branch(repos, name)
+
+
+@scenario
+def clone(ctx):
+    manager = ctx.logged_in()
+    url = manager.find_repo(ctx.repo_name)['clone_url']
+    directory = ctx.path('clon')
+    return lambda: manager.clone(url, directory)
+
+
+@scenario
+def pull(ctx):
+    # Otro clon sube un commit y se trae con pull
+    manager = ctx.logged_in()
+    repo = manager.find_repo(ctx.repo_name)
+    push_commit(ctx.clone_of_bare('otro'))
+    git_repo = manager.open_git(ctx.clone_of_bare('pull'))
+    return lambda: manager.pull(repo, git_repo, 'main')
+
+
+@scenario
+def push(ctx):
+    manager = ctx.logged_in()
+    repo = manager.find_repo(ctx.repo_name)
+    work = ctx.clone_of_bare('push')
+    git_repo = manager.open_git(work)
+    with open(os.path.join(work, 'subida.txt'), 'a') as f:
+        f.write(os.urandom(256).hex() + '\n')
+    manager.commit(git_repo, 'cambio para push')
+    return lambda: manager.push(repo, git_repo, 'main', 'bench-push')
+
+
+def measure(ctx, func, rounds, warmup):
+    # (milisegundos por ronda, peticiones a la API por ronda)
+    times, requests = [], []
+    for round_number in range(warmup + rounds):
+        run = func(ctx)
+        before = ctx.mock.request_count
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        ctx.release()
+        if round_number >= warmup:
+            times.append(elapsed * 1000)
+            requests.append(ctx.mock.request_count - before)
+    return times, requests
+
+
+def environment():
+    try:
+        version = subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=ROOT, capture_output=True,
+                                 text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        version = None
+    return {
+        'version': version,
+        'python': platform.python_version(),
+        'git': git('--version').decode().strip(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(results, path, tolerance):
+    # Escenarios más lentos que en el fichero anterior (por mediana)
+    with open(path, encoding='utf-8') as f:
+        previous = json.load(f)
+    if previous.get('parameters') != results['parameters']:
+        print("Aviso: los parámetros no coinciden con los del fichero anterior")
+    print(f"\n{'escenario':<26}{'antes (ms)':>12}{'ahora (ms)':>12}{'relación':>10}")
+    regressions = []
+    for name, current in results['scenarios'].items():
+        before = previous.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        ratio = current['median_ms'] / before['median_ms'] if before['median_ms'] else float('inf')
+        flag = '  <-- más lento' if ratio > tolerance else ''
+        print(f"{name:<26}{before['median_ms']:>12.2f}{current['median_ms']:>12.2f}{ratio:>10.2f}{flag}")
+        if ratio > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repos', type=int, default=1000, help="repositorios de la API simulada")
+    parser.add_argument('--branches', type=int, default=300, help="ramas por repositorio")
+    parser.add_argument('--files', type=int, default=200, help="ficheros del repositorio bare")
+    parser.add_argument('--file-kb', type=int, default=2, help="tamaño de cada fichero")
+    parser.add_argument('--commits', type=int, default=50, help="commits de la rama main del bare")
+    parser.add_argument('--latency', type=float, default=0.0, help="segundos de espera por petición")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--only', help="escenarios separados por comas")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', metavar='FICHERO', help="resultados anteriores con los que comparar")
+    parser.add_argument('--tolerance', type=float, default=1.25,
+                        help="relación ahora/antes a partir de la que se considera regresión")
+    args = parser.parse_args()
+
+    selected = SCENARIOS
+    if args.only:
+        names = args.only.split(',')
+        unknown = set(names) - {name for name, _ in SCENARIOS}
+        if unknown:
+            parser.error(f"escenarios desconocidos: {', '.join(sorted(unknown))}")
+        selected = [(name, func) for name, func in SCENARIOS if name in names]
+
+    results = {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'parameters': {key: getattr(args, key) for key in
+                       ('repos', 'branches', 'files', 'file_kb', 'commits', 'latency', 'rounds', 'warmup')},
+        'scenarios': {},
+    }
+    print(f"{'escenario':<26}{'mediana (ms)':>14}{'mín (ms)':>12}{'máx (ms)':>12}{'peticiones':>12}")
+    with MockGitHub(repo_count=args.repos, latency=args.latency, branch_count=args.branches,
+                    rate_limit=10 ** 9) as mock, tempfile.TemporaryDirectory() as directory:
+        ctx = Context(args, mock, directory)
+        for name, func in selected:
+            times, requests = measure(ctx, func, args.rounds, args.warmup)
+            results['scenarios'][name] = {
+                'median_ms': round(statistics.median(times), 3),
+                'min_ms': round(min(times), 3),
+                'max_ms': round(max(times), 3),
+                'runs_ms': [round(value, 3) for value in times],
+                'requests': round(statistics.mean(requests), 1),
+            }
+            row = results['scenarios'][name]
+            print(f"{name:<26}{row['median_ms']:>14.2f}{row['min_ms']:>12.2f}{row['max_ms']:>12.2f}"
+                  f"{row['requests']:>12.1f}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+    print(f"\nResultados en {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"FALLO: más lentos que antes: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
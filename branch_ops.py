@@ -0,0 +1,200 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import quote
+
+from requests import RequestException
+
+from github_client import GraphQLError
+from rate_limit import PRIORITY_BACKGROUND, RateLimitExceeded
+from repo_store import slim_branch
+from tracing import tracer
+
+# Repositorios por consulta al resolver ramas predeterminadas en bloque
+REPOS_PER_QUERY = 50
+
+BRANCH_INFO_QUERY = """
+query($owner: String!, $name: String!, $cursor: String, $default: String!) {
+  repository(owner: $owner, name: $name) {
+    refs(refPrefix: "refs/heads/", first: 100, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        target { ... on Commit { committedDate } }
+        compare(headRef: $default) { behindBy }
+      }
+    }
+  }
+}
+"""
+
+
+def parse_date(value):
+    # Fechas ISO de la API ('2024-05-01T10:00:00Z') como datetime con zona
+    return datetime.fromisoformat(value.replace('Z', '+00:00')) if value else None
+
+
+def branch_info(client, repo, default_branch):
+    # {rama: {'merged': bool, 'date': datetime}} de todas las ramas. Por
+    # GraphQL es una consulta por cada 100 ramas; si no está disponible, una
+    # comparación REST por rama en paralelo.
+    try:
+        return _branch_info_graphql(client, repo, default_branch)
+    except (GraphQLError, RequestException) as e:
+        print(f"Análisis por GraphQL no disponible, se usa REST: {e}", file=sys.stderr)
+    branches = client.get_all_pages(f"{repo['url']}/branches", priority=PRIORITY_BACKGROUND, reduce=slim_branch)
+
+    def compare(branch):
+        # base...head: behind_by son los commits de la rama que no están en la predeterminada
+        response = client.get(f"{repo['url']}/compare/{quote(branch['name'])}...{quote(default_branch)}",
+                              priority=PRIORITY_BACKGROUND)
+        response.raise_for_status()
+        data = response.json()
+        return branch['name'], {'merged': data['behind_by'] == 0,
+                                'date': parse_date(data['base_commit']['commit']['committer']['date'])}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        return dict(pool.map(tracer.propagate(compare), branches))
+
+
+def _branch_info_graphql(client, repo, default_branch):
+    owner, name = repo['full_name'].split('/', 1)
+    info = {}
+    cursor = None
+    while True:
+        data = client.graphql(BRANCH_INFO_QUERY, {'owner': owner, 'name': name, 'cursor': cursor,
+                                                  'default': f'refs/heads/{default_branch}'},
+                              priority=PRIORITY_BACKGROUND)
+        refs = data['repository']['refs']
+        for node in refs['nodes']:
+            comparison = node.get('compare') or {}
+            info[node['name']] = {'merged': comparison.get('behindBy') == 0,
+                                  'date': parse_date((node.get('target') or {}).get('committedDate'))}
+        if not refs['pageInfo']['hasNextPage']:
+            return info
+        cursor = refs['pageInfo']['endCursor']
+
+
+def delete_branches(client, repo, names, max_workers=8):
+    # Borra las ramas en paralelo; la concurrencia real la limita el
+    # planificador de cuota del cliente. Devuelve {rama: None o error}; un
+    # fallo (también la cuota agotada) sólo afecta a su rama. Es una acción
+    # confirmada por el usuario: va con la prioridad interactiva.
+    def delete(name):
+        try:
+            response = client.delete(f"{repo['url']}/git/refs/heads/{quote(name)}")
+        except (RequestException, RateLimitExceeded) as e:
+            return name, str(e)
+        if response.status_code == 204:
+            return name, None
+        return name, f"Código de estado: {response.status_code}"
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(pool.map(tracer.propagate(delete), names))
+
+
+def _alias_errors(errors):
+    # {alias: mensaje} de los errores GraphQL de cada alias (path = ['r3', ...])
+    messages = {}
+    for error in errors:
+        path = error.get('path') or ()
+        if path:
+            messages.setdefault(path[0], error.get('message', str(error)))
+    return messages
+
+
+def default_branch_heads(client, store, repos):
+    # ({full_name: (rama predeterminada, sha)}, {full_name: error}) con una
+    # consulta GraphQL por cada REPOS_PER_QUERY repositorios (alias r0,
+    # r1...). Si GraphQL no está disponible, una petición por repositorio;
+    # si sólo fallan algunos alias (repositorio borrado o sin acceso), se
+    # usa el resto de la respuesta y sólo esos se piden por REST.
+    heads, errors = {}, {}
+    pending = []
+    use_graphql = True
+    for start in range(0, len(repos), REPOS_PER_QUERY):
+        chunk = repos[start:start + REPOS_PER_QUERY]
+        if not use_graphql:
+            pending.extend(chunk)
+            continue
+        params, fields, variables = [], [], {}
+        for index, repo in enumerate(chunk):
+            owner, name = repo['full_name'].split('/', 1)
+            params.append(f'$o{index}: String!, $n{index}: String!')
+            fields.append(f'r{index}: repository(owner: $o{index}, name: $n{index}) '
+                          '{ defaultBranchRef { name target { oid } } }')
+            variables[f'o{index}'], variables[f'n{index}'] = owner, name
+        query = f"query({', '.join(params)}) {{ {' '.join(fields)} }}"
+        alias_errors = {}
+        try:
+            data = client.graphql(query, variables)
+        except GraphQLError as e:
+            if not e.data:
+                print(f"Resolución por GraphQL no disponible, se usa REST: {e}", file=sys.stderr)
+                use_graphql = False
+                pending.extend(chunk)
+                continue
+            data, alias_errors = e.data, _alias_errors(e.errors)
+        except RequestException as e:
+            print(f"Resolución por GraphQL no disponible, se usa REST: {e}", file=sys.stderr)
+            use_graphql = False
+            pending.extend(chunk)
+            continue
+        for index, repo in enumerate(chunk):
+            node = data.get(f'r{index}')
+            ref = (node or {}).get('defaultBranchRef')
+            if ref:
+                store.update(repo, default_branch=ref['name'])
+                heads[repo['full_name']] = (ref['name'], ref['target']['oid'])
+            elif node is None:
+                # Alias con error: se reintenta por REST, que da el error concreto
+                pending.append(repo)
+                if f'r{index}' in alias_errors:
+                    errors[repo['full_name']] = alias_errors[f'r{index}']
+            else:
+                errors[repo['full_name']] = "El repositorio no tiene rama predeterminada (está vacío)"
+
+    def resolve(repo):
+        # La rama predeterminada suele estar ya en el almacén: sólo se pide su SHA
+        try:
+            default_branch = store.default_branch(repo)
+            response = client.get(f"{repo['url']}/git/ref/heads/{quote(default_branch)}")
+            response.raise_for_status()
+        except (RequestException, RateLimitExceeded) as e:
+            return repo['full_name'], None, f"No se pudo obtener la rama predeterminada: {e}"
+        return repo['full_name'], (default_branch, response.json()['object']['sha']), None
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for full_name, head, error in pool.map(tracer.propagate(resolve), pending):
+            if head is not None:
+                heads[full_name] = head
+                errors.pop(full_name, None)
+            else:
+                errors[full_name] = error
+    return heads, errors
+
+
+def create_branch_in_repos(client, store, repos, branch_name, max_workers=8):
+    # Crea la misma rama, desde la rama predeterminada, en varios
+    # repositorios a la vez. Devuelve {full_name: (error o None, rama creada)};
+    # un fallo (también la cuota agotada) sólo afecta a su repositorio.
+    heads, errors = default_branch_heads(client, store, repos)
+
+    def create(repo):
+        head = heads.get(repo['full_name'])
+        if head is None:
+            return repo['full_name'], (errors.get(repo['full_name'], "No se pudo obtener la rama predeterminada"), None)
+        data = {'ref': f'refs/heads/{branch_name}', 'sha': head[1]}
+        try:
+            response = client.post(f"{repo['url']}/git/refs", json=data)
+        except (RequestException, RateLimitExceeded) as e:
+            return repo['full_name'], (str(e), None)
+        if response.status_code != 201:
+            return repo['full_name'], (f"No se pudo crear la nueva rama. Código de estado: {response.status_code}", None)
+        branch = {'name': branch_name, 'commit': {'sha': head[1]}}
+        if store.is_fresh(repo, 'branches'):
+            store.update(repo, branches=repo['branches'] + [branch])
+        return repo['full_name'], (None, branch)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(pool.map(tracer.propagate(create), repos))
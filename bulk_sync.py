@@ -0,0 +1,156 @@
+import base64
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+from git import GitCommandError, RemoteProgress, Repo
+
+from git_status import read_status
+from task_runner import TaskCancelled, current_task
+from tracing import tracer
+
+# Estados de cada repositorio tras sincronizar
+SYNC_UP_TO_DATE = "Actualizado"
+SYNC_FAST_FORWARD = "Avanzado"
+SYNC_AHEAD = "Con commits sin subir"
+SYNC_DIRTY = "Omitido: cambios locales"
+SYNC_DIVERGED = "Omitido: divergente"
+SYNC_NO_UPSTREAM = "Omitido: sin rama remota"
+SYNC_DETACHED = "Omitido: HEAD separado"
+SYNC_ERROR = "Error"
+
+UNITS = {'bytes': 1, 'KiB': 1024, 'MiB': 1024 ** 2, 'GiB': 1024 ** 3}
+_SIZE = re.compile(r'([\d.]+) (bytes|KiB|MiB|GiB)')
+
+
+def format_bytes(count):
+    if count < 1024:
+        return f"{count} bytes"
+    for unit in ('KiB', 'MiB'):
+        if count < 1024 * UNITS[unit]:
+            return f"{count / UNITS[unit]:.1f} {unit}"
+    return f"{count / UNITS['GiB']:.1f} GiB"
+
+
+class ReceivedBytes(RemoteProgress):
+    # Volumen descargado según lo que informa git en "Receiving objects" (o
+    # "Unpacking objects"); en un fetch pequeño puede no informar y queda en 0
+
+    def __init__(self):
+        super().__init__()
+        self.received = 0
+
+    def update(self, op_code, cur_count, max_count=None, message=''):
+        if op_code & self.OP_MASK == self.RECEIVING and message:
+            match = _SIZE.search(message)
+            if match:
+                self.received = int(float(match.group(1)) * UNITS[match.group(2)])
+
+    def line_dropped(self, line):
+        # Con pocos objetos git los desempaqueta sueltos y el volumen va en
+        # "Unpacking objects", una fase que RemoteProgress no reconoce
+        if 'Unpacking objects' in line:
+            match = _SIZE.search(line)
+            if match:
+                self.received = int(float(match.group(1)) * UNITS[match.group(2)])
+
+
+def fetch_env(token=None, url='https://github.com/'):
+    # Configuración para el fetch pasada por GIT_CONFIG_* (git 2.31): así el
+    # token no queda en la URL del remoto ni en la línea de comandos. La
+    # cabecera va sólo al servidor del remoto (url), que puede ser un GitHub
+    # Enterprise; con SSH o rutas locales no hace falta.
+    config = []
+    parsed = urlparse(url or '')
+    if token and parsed.scheme in ('http', 'https') and parsed.hostname:
+        host = parsed.netloc.rpartition('@')[2]
+        basic = base64.b64encode(f'x-access-token:{token}'.encode()).decode()
+        config.append((f'http.{parsed.scheme}://{host}/.extraheader', f'AUTHORIZATION: basic {basic}'))
+    env = dict(os.environ, GIT_CONFIG_COUNT=str(len(config)))
+    for index, (key, value) in enumerate(config):
+        env[f'GIT_CONFIG_KEY_{index}'] = key
+        env[f'GIT_CONFIG_VALUE_{index}'] = value
+    return env
+
+
+def sync_repo(path, token=None, prune=False):
+    # Fetch del remoto de la rama actual y, si el árbol está limpio y la rama
+    # sólo va por detrás, fast-forward. Las ramas remotas borradas sólo se
+    # eliminan con prune. Se usa un Repo propio que se cierra al terminar:
+    # con cientos de clones no conviene dejar sus procesos abiertos.
+    start = time.perf_counter()
+    result = {'path': path, 'state': SYNC_ERROR, 'detail': '', 'received': 0}
+    git_repo = None
+    try:
+        git_repo = Repo(path)
+        tracking = None if git_repo.head.is_detached else git_repo.active_branch.tracking_branch()
+        if tracking is not None and tracking.remote_name in {remote.name for remote in git_repo.remotes}:
+            progress = ReceivedBytes()
+            remote = git_repo.remote(tracking.remote_name)
+            remote.fetch(progress=progress, prune=prune, env=fetch_env(token, remote.url))
+            result['received'] = progress.received
+
+        status = read_status(git_repo)
+        if status.branch is None:
+            result['state'] = SYNC_DETACHED
+        elif status.upstream is None:
+            result['state'] = SYNC_NO_UPSTREAM
+        elif status.ahead and status.behind:
+            result['state'] = SYNC_DIVERGED
+            result['detail'] = f"{status.ahead} por delante, {status.behind} por detrás"
+        elif status.behind and status.dirty:
+            result['state'] = SYNC_DIRTY
+            result['detail'] = f"{status.behind} commits pendientes"
+        elif status.behind:
+            git_repo.git.merge('--ff-only', '@{u}')
+            result['state'] = SYNC_FAST_FORWARD
+            result['detail'] = f"{status.behind} commits"
+        elif status.ahead:
+            result['state'] = SYNC_AHEAD
+            result['detail'] = f"{status.ahead} commits"
+        else:
+            result['state'] = SYNC_UP_TO_DATE
+    except GitCommandError as e:
+        # Última línea de la salida de error de git
+        lines = (e.stderr or '').strip(" '\n").splitlines()
+        result['detail'] = lines[-1].strip(" '") if lines else str(e)
+    except Exception as e:
+        result['detail'] = str(e)
+    finally:
+        if git_repo is not None:
+            git_repo.close()
+    result['duration'] = time.perf_counter() - start
+    return result
+
+
+def sync_all(paths, token=None, max_workers=8, on_result=None, prune=False):
+    # Sincroniza todos los clones con como mucho max_workers procesos git a
+    # la vez. on_result(resultado) se llama (desde un worker) según terminan.
+    task = current_task()
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gitapp-sync') as pool:
+        @tracer.propagate
+        def run(path):
+            if task is not None and task.cancelled:
+                return None
+            with tracer.span(path, 'sync'):
+                return sync_repo(path, token, prune)
+
+        futures = [pool.submit(run, path) for path in paths]
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+                if task is not None:
+                    task.check_cancelled()
+        except TaskCancelled:
+            for future in futures:
+                future.cancel()
+            raise
+    return results
@@ -0,0 +1,290 @@
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from requests import RequestException
+from git import GitCommandError
+
+from git_clone import CLONE_MODES, CloneProgress, clone_options
+from bulk_sync import SYNC_ERROR
+from github_client import API_URL
+from rate_limit import RateLimitExceeded
+from repo_manager import ManagerError, RepoManager
+from tracing import tracer
+
+# Uso sin interfaz gráfica (scripts, CI, benchmarks):
+#
+#   python cli.py [--token T] [--format json|ndjson|text] COMANDO ...
+#
+# El token se toma de --token o de GITHUB_TOKEN. Con --format ndjson cada
+# resultado se escribe en cuanto está disponible, una línea JSON por
+# resultado; con json se escribe una lista al terminar.
+#
+# Código de salida: 0 si todo ha ido bien, 1 si ha fallado algún elemento o
+# la operación completa, 2 si los argumentos no son válidos.
+
+
+class Output:
+    # Escribe los resultados en el formato elegido
+
+    def __init__(self, format, stream=sys.stdout):
+        self.format = format
+        self.stream = stream
+        self.records = []
+
+    def emit(self, record):
+        if self.format == 'ndjson':
+            self.stream.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+            self.stream.flush()
+        elif self.format == 'text':
+            self.stream.write('\t'.join('' if value is None else str(value) for value in record.values()) + '\n')
+            self.stream.flush()
+        else:
+            self.records.append(record)
+
+    def close(self):
+        if self.format == 'json':
+            json.dump(self.records, self.stream, ensure_ascii=False, default=str, indent=2)
+            self.stream.write('\n')
+
+
+def repo_record(manager, repo):
+    return {
+        'full_name': repo['full_name'],
+        'private': repo.get('private'),
+        'default_branch': repo.get('default_branch'),
+        'clone_url': repo.get('clone_url'),
+        'local_path': manager.workspace.path_for(repo),
+    }
+
+
+def parse_since(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise argparse.ArgumentTypeError("la fecha debe tener el formato AAAA-MM-DD")
+
+
+def select_branches(manager, repo, merged, since):
+    # Ramas (salvo la predeterminada) fusionadas y/o sin commits desde since,
+    # con su información de fusión y fecha
+    info = manager.branch_info(repo)
+    default = manager.default_branch(repo)
+    selected = {}
+    for name, details in sorted(info.items()):
+        if name == default:
+            continue
+        if merged and not details['merged']:
+            continue
+        if since and (details['date'] is None or details['date'] >= since):
+            continue
+        selected[name] = details
+    return selected
+
+
+def cmd_list(manager, args, output):
+    if args.workspace:
+        manager.workspace.refresh()
+        manager.workspace.save()
+    for batch in manager.iter_repo_batches(use_graphql=not args.rest):
+        for repo in manager.store.put_many(batch):
+            if args.filter and args.filter.lower() not in repo['full_name'].lower():
+                continue
+            output.emit(repo_record(manager, repo))
+    return 0
+
+
+def cmd_clone(manager, args, output):
+    url = args.repo
+    if '://' not in url and not url.startswith('git@'):
+        url = manager.find_repo(url)['clone_url']
+    directory = args.directory or os.path.basename(url[:-4] if url.endswith('.git') else url)
+    options = clone_options(args.mode, args.depth, args.branch, args.single_branch, args.reference)
+    progress = None
+    if args.progress:
+        # El progreso va a stderr para no mezclarse con los resultados
+        def show(phase, fraction, message):
+            percent = '' if fraction is None else f" {fraction:.0%}"
+            sys.stderr.write(f"\r{phase}{percent} {message}".ljust(79))
+            sys.stderr.flush()
+        progress = CloneProgress(show, interval=0.5)
+    manager.clone(url, directory, options, progress)
+    if args.progress:
+        sys.stderr.write('\n')
+    output.emit({'url': url, 'directory': os.path.abspath(directory), 'options': options})
+    return 0
+
+
+def cmd_sync(manager, args, output):
+    paths = args.paths or None
+    if paths is None:
+        manager.workspace.refresh()
+        manager.workspace.save()
+    failed = []
+
+    def on_result(result):
+        if result['state'] == SYNC_ERROR:
+            failed.append(result)
+        output.emit(result)
+
+    manager.sync(paths, max_workers=args.workers, on_result=on_result, prune=args.prune)
+    return 1 if failed else 0
+
+
+def cmd_branches(manager, args, output):
+    repo = manager.find_repo(args.repo)
+    if args.merged or args.since:
+        for name, details in select_branches(manager, repo, args.merged, args.since).items():
+            output.emit({'name': name, **details})
+        return 0
+    default = manager.default_branch(repo)
+    for branch in manager.branches(repo, args.prefix):
+        output.emit({'name': branch['name'], 'sha': branch['commit']['sha'], 'default': branch['name'] == default})
+    return 0
+
+
+def cmd_create(manager, args, output):
+    repo = manager.create_repo(args.name, args.description, args.private)
+    output.emit(repo_record(manager, repo))
+    return 0
+
+
+def cmd_create_branch(manager, args, output):
+    repos = [manager.find_repo(full_name) for full_name in args.repos]
+    result = manager.create_branch(repos, args.name, max_workers=args.workers)
+    for full_name, error in result.errors.items():
+        output.emit({'repo': full_name, 'branch': args.name, 'error': error})
+    return 1 if result.failed else 0
+
+
+def cmd_delete_branches(manager, args, output):
+    repo = manager.find_repo(args.repo)
+    names = list(args.names)
+    if args.merged or args.since:
+        names += [name for name in select_branches(manager, repo, args.merged, args.since) if name not in names]
+    if not names:
+        return 0
+    if args.dry_run:
+        for name in names:
+            output.emit({'repo': repo['full_name'], 'branch': name, 'deleted': False, 'error': None})
+        return 0
+    result = manager.delete_branches(repo, names, max_workers=args.workers)
+    for name, error in result.errors.items():
+        output.emit({'repo': repo['full_name'], 'branch': name, 'deleted': error is None, 'error': error})
+    return 1 if result.failed else 0
+
+
+def cmd_add_root(manager, args, output):
+    for root in args.roots:
+        manager.workspace.add_root(root)
+    manager.workspace.refresh()
+    manager.workspace.save()
+    for path, full_name in manager.workspace.clones():
+        output.emit({'path': path, 'full_name': full_name})
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='gitapp', description="Gestor de repositorios GitHub sin interfaz gráfica")
+    parser.add_argument('--token', default=os.environ.get('GITHUB_TOKEN', ''),
+                        help="token de GitHub (por defecto, GITHUB_TOKEN)")
+    parser.add_argument('--api-url', default=os.environ.get('GITHUB_API_URL', API_URL),
+                        help="URL de la API (GitHub Enterprise o un servidor de pruebas)")
+    parser.add_argument('--format', choices=('json', 'ndjson', 'text'), default='json')
+    parser.add_argument('--max-concurrency', type=int, default=10,
+                        help="peticiones a la API en curso a la vez (por defecto, 10)")
+    parser.add_argument('--no-cache', action='store_true', help="no usar la caché HTTP en disco")
+    parser.add_argument('--trace', metavar='FICHERO',
+                        help="guardar los tiempos de cada petición y proceso git (formato Chrome trace)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('list', help="lista los repositorios del usuario")
+    command.add_argument('--filter', help="sólo los que contienen este texto")
+    command.add_argument('--rest', action='store_true', help="cargar por REST en lugar de GraphQL")
+    command.add_argument('--workspace', action='store_true', help="buscar antes clones nuevos en las carpetas de trabajo")
+    command.set_defaults(func=cmd_list)
+
+    command = commands.add_parser('clone', help="clona un repositorio (owner/name o URL)")
+    command.add_argument('repo')
+    command.add_argument('directory', nargs='?')
+    command.add_argument('--mode', choices=list(CLONE_MODES), default='full')
+    command.add_argument('--depth', type=int, default=1)
+    command.add_argument('--branch')
+    command.add_argument('--single-branch', action='store_true')
+    command.add_argument('--reference', help="clon local cuyos objetos se reutilizan")
+    command.add_argument('--progress', action='store_true', help="mostrar el progreso en stderr")
+    command.set_defaults(func=cmd_clone)
+
+    command = commands.add_parser('sync', help="fetch y fast-forward de los clones locales")
+    command.add_argument('paths', nargs='*', help="clones (por defecto, todos los de las carpetas de trabajo)")
+    command.add_argument('--workers', type=int, default=8, help="procesos git a la vez (por defecto, 8)")
+    command.add_argument('--prune', action='store_true', help="borrar las ramas remotas que ya no existen")
+    command.set_defaults(func=cmd_sync)
+
+    command = commands.add_parser('branches', help="lista las ramas de un repositorio")
+    command.add_argument('repo', help="owner/name")
+    command.add_argument('--prefix', default='')
+    command.add_argument('--merged', action='store_true', help="sólo las fusionadas en la predeterminada")
+    command.add_argument('--since', type=parse_since, help="sólo las sin commits desde AAAA-MM-DD")
+    command.set_defaults(func=cmd_branches)
+
+    command = commands.add_parser('create', help="crea un repositorio")
+    command.add_argument('name')
+    command.add_argument('--description', default='')
+    command.add_argument('--private', action='store_true')
+    command.set_defaults(func=cmd_create)
+
+    command = commands.add_parser('create-branch', help="crea la misma rama en varios repositorios")
+    command.add_argument('name')
+    command.add_argument('repos', nargs='+', help="owner/name")
+    command.add_argument('--workers', type=int, default=8)
+    command.set_defaults(func=cmd_create_branch)
+
+    command = commands.add_parser('delete-branches', help="elimina ramas de un repositorio")
+    command.add_argument('repo', help="owner/name")
+    command.add_argument('names', nargs='*')
+    command.add_argument('--merged', action='store_true', help="añadir las fusionadas en la predeterminada")
+    command.add_argument('--since', type=parse_since, help="añadir las sin commits desde AAAA-MM-DD")
+    command.add_argument('--dry-run', action='store_true', help="sólo mostrar las que se eliminarían")
+    command.add_argument('--workers', type=int, default=8)
+    command.set_defaults(func=cmd_delete_branches)
+
+    command = commands.add_parser('add-root', help="añade carpetas de trabajo con clones")
+    command.add_argument('roots', nargs='+')
+    command.set_defaults(func=cmd_add_root)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    manager = RepoManager(args.token, max_concurrency=args.max_concurrency, http_cache=not args.no_cache,
+                          base_url=args.api_url)
+    output = Output(args.format)
+    if args.trace:
+        tracer.enable()
+    try:
+        with tracer.action(f"gitapp {args.command}"):
+            if args.token:
+                manager.login()
+            return args.func(manager, args, output)
+    except (ManagerError, RequestException, GitCommandError) as e:
+        sys.stderr.write(f"error: {e}\n")
+        return 1
+    except RateLimitExceeded as e:
+        # Cuota agotada: lo normal en operaciones masivas; se indica cuándo reintentar
+        reset = datetime.fromtimestamp(e.reset_at, timezone.utc).isoformat(timespec='seconds')
+        sys.stderr.write(f"error: {e} (se restablece {reset})\n")
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        output.close()
+        manager.close()
+        if args.trace:
+            tracer.export_chrome_trace(args.trace)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import os
+import shutil
+import threading
+import time
+
+from git import Git, RemoteProgress
+from git.cmd import handle_process_output
+from git.util import finalize_process
+
+from task_runner import TaskCancelled, current_task
+
+# Modos de clonado: (etiqueta, opciones de git clone)
+CLONE_MODES = {
+    'full': ("Completo", []),
+    # Historia completa sin el contenido de los archivos: se descarga al hacer checkout
+    'blobless': ("Sin blobs (--filter=blob:none)", ['--filter=blob:none']),
+    # Sólo commits; árboles y archivos bajo demanda (para CI o builds de un solo uso)
+    'treeless': ("Sin árboles (--filter=tree:0)", ['--filter=tree:0']),
+    'shallow': ("Superficial (--depth)", []),
+}
+
+PHASES = {
+    RemoteProgress.COUNTING: "Contando objetos",
+    RemoteProgress.COMPRESSING: "Comprimiendo objetos",
+    RemoteProgress.WRITING: "Escribiendo objetos",
+    RemoteProgress.RECEIVING: "Recibiendo objetos",
+    RemoteProgress.RESOLVING: "Resolviendo deltas",
+    RemoteProgress.FINDING_SOURCES: "Buscando orígenes",
+    RemoteProgress.CHECKING_OUT: "Extrayendo archivos",
+}
+
+
+def clone_options(mode='full', depth=1, branch=None, single_branch=False, reference=None):
+    options = list(CLONE_MODES[mode][1])
+    if mode == 'shallow':
+        options.append(f'--depth={int(depth)}')
+    if branch:
+        options.append(f'--branch={branch}')
+    if single_branch:
+        options.append('--single-branch')
+    elif mode == 'shallow':
+        # --depth implica --single-branch salvo que se pida lo contrario
+        options.append('--no-single-branch')
+    if reference:
+        # Reutiliza los objetos de un clon local existente; si no sirve se ignora
+        options.append(f'--reference-if-able={reference}')
+    return options
+
+
+class CloneProgress(RemoteProgress):
+    # Pasa la fase, el porcentaje y la velocidad que escribe git en stderr a
+    # callback(fase, fracción o None, mensaje), como mucho cada interval segundos
+
+    def __init__(self, callback, interval=0.1):
+        super().__init__()
+        self.callback = callback
+        self.interval = interval
+        self._last = 0
+
+    def update(self, op_code, cur_count, max_count=None, message=''):
+        now = time.monotonic()
+        stage_end = op_code & self.END
+        if not stage_end and now - self._last < self.interval:
+            return
+        self._last = now
+        phase = PHASES.get(op_code & self.OP_MASK, "Clonando")
+        fraction = cur_count / max_count if max_count else None
+        # message trae el volumen y la velocidad: ", 12.34 MiB | 5.67 MiB/s"
+        self.callback(phase, fraction, message.strip(' ,'))
+
+
+def remove_partial_clone(directory, existed):
+    # Borra sólo lo que ha creado el clon: la carpeta si no existía, y si no
+    # su contenido
+    if not existed:
+        shutil.rmtree(directory, ignore_errors=True)
+        return
+    try:
+        entries = os.listdir(directory)
+    except OSError:
+        return
+    for entry in entries:
+        path = os.path.join(directory, entry)
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def clone(url, directory, options=(), progress=None):
+    # git clone con progreso y cancelable desde la tarea en curso: cancelar
+    # mata el proceso y borra el clon a medias
+    git = Git()
+    Git.check_unsafe_protocols(url)
+    # Una carpeta que ya existía (vacía, elegida por el usuario) se conserva
+    existed = os.path.isdir(directory)
+    process = git.clone(*options, '--', url, directory, as_process=True, v=True,
+                        progress=True, universal_newlines=True)
+
+    task = current_task()
+    killed = threading.Event()
+    if task is not None:
+        def kill():
+            killed.set()
+            process.proc.kill()
+        task.add_cancel_callback(kill)
+
+    handler = (progress or RemoteProgress()).new_message_handler()
+    try:
+        handle_process_output(process, None, handler, finalize_process, decode_streams=False)
+    except Exception:
+        if killed.is_set():
+            remove_partial_clone(directory, existed)
+            raise TaskCancelled(f"Clonado de {url}")
+        raise
+    return directory
@@ -0,0 +1,104 @@
+import os
+import threading
+from collections import defaultdict
+
+import git.cmd
+from git import Repo
+
+from task_runner import current_task
+
+
+class RepoHandles:
+    # Objetos Repo reutilizados por ruta. Cada Repo mantiene sus procesos
+    # `git cat-file --batch` / `--batch-check` abiertos para leer objetos,
+    # así que reutilizarlo ahorra el descubrimiento del repositorio y el
+    # arranque de esos procesos en cada acción. close() los termina; la
+    # ventana del repositorio lo llama al cerrarse.
+
+    def __init__(self):
+        self._repos = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        # Lanza InvalidGitRepositoryError/NoSuchPathError como Repo(path)
+        path = os.path.abspath(path)
+        with self._lock:
+            git_repo = self._repos.get(path)
+        if git_repo is not None:
+            if os.path.isdir(git_repo.git_dir):
+                return git_repo
+            # El clon se ha borrado o movido desde que se abrió
+            self.close(path)
+        return self._remember(path, Repo(path))
+
+    def init(self, path):
+        return self._remember(os.path.abspath(path), Repo.init(path))
+
+    def close(self, path):
+        with self._lock:
+            git_repo = self._repos.pop(os.path.abspath(path), None)
+        if git_repo is not None:
+            git_repo.close()
+
+    def close_all(self):
+        with self._lock:
+            repos, self._repos = list(self._repos.values()), {}
+        for git_repo in repos:
+            git_repo.close()
+
+    def _remember(self, path, git_repo):
+        with self._lock:
+            # Si otro hilo lo abrió a la vez se conserva el primero
+            existing = self._repos.setdefault(path, git_repo)
+        if existing is not git_repo:
+            git_repo.close()
+        return existing
+
+
+class ProcessCounter:
+    # Cuenta los procesos git que lanza GitPython, agrupados por la tarea
+    # (acción del usuario) que los pidió, para medir el efecto de las cachés
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.total = 0
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+        self._original = None
+
+    def install(self):
+        # Todos los procesos de Git.execute pasan por git.cmd.safer_popen
+        if self._original is not None:
+            return
+        self._original = original = git.cmd.safer_popen
+
+        def counting_popen(command, *args, **kwargs):
+            self.record(command)
+            return original(command, *args, **kwargs)
+
+        git.cmd.safer_popen = counting_popen
+
+    def uninstall(self):
+        if self._original is not None:
+            git.cmd.safer_popen = self._original
+            self._original = None
+
+    def record(self, command):
+        task = current_task()
+        action = task.description if task is not None and task.description else 'interfaz'
+        with self._lock:
+            self.total += 1
+            self._counts[action] += 1
+            count = self._counts[action]
+        if self.verbose:
+            args = command if isinstance(command, str) else ' '.join(str(arg) for arg in command[:3])
+            print(f"[git] {action}: proceso {count} ({args})")
+
+    def counts(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self.total = 0
+            self._counts.clear()
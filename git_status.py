@@ -0,0 +1,80 @@
+class GitStatus:
+    # Resultado de un único `git status --porcelain=v2 -z --branch`
+
+    def __init__(self):
+        self.head_oid = None
+        self.branch = None       # None con HEAD separado
+        self.upstream = None
+        self.ahead = 0
+        self.behind = 0
+        self.staged = []         # (código, ruta)
+        self.unstaged = []
+        self.unmerged = []
+        self.untracked = []
+        self.lines = []          # "XY ruta" como en --porcelain=v1, para mostrar
+
+    @property
+    def dirty(self):
+        # Cambios en archivos con seguimiento (como Repo.is_dirty())
+        return bool(self.staged or self.unstaged or self.unmerged)
+
+    @property
+    def clean(self):
+        return not self.dirty and not self.untracked
+
+    @property
+    def up_to_date(self):
+        return self.upstream is not None and self.ahead == 0 and self.behind == 0
+
+    def summary(self):
+        return '\n'.join(self.lines)
+
+
+def parse_status(output):
+    status = GitStatus()
+    fields = output.split('\0')
+    i = 0
+    while i < len(fields):
+        field = fields[i]
+        i += 1
+        if not field:
+            continue
+        kind = field[0]
+        if kind == '#':
+            _, key, value = field.split(' ', 2)
+            if key == 'branch.oid':
+                status.head_oid = None if value == '(initial)' else value
+            elif key == 'branch.head':
+                status.branch = None if value == '(detached)' else value
+            elif key == 'branch.upstream':
+                status.upstream = value
+            elif key == 'branch.ab':
+                ahead, behind = value.split()
+                status.ahead, status.behind = int(ahead), -int(behind)
+        elif kind == '?':
+            path = field[2:]
+            status.untracked.append(path)
+            status.lines.append(f'?? {path}')
+        elif kind in '12u':
+            # La ruta es el último campo; los renombrados llevan la ruta
+            # original en el siguiente campo separado por NUL
+            parts = field.split(' ', {'1': 8, '2': 9, 'u': 10}[kind])
+            xy, path = parts[1], parts[-1]
+            if kind == '2':
+                path = f'{fields[i]} -> {path}'
+                i += 1
+            if kind == 'u':
+                status.unmerged.append((xy, path))
+            else:
+                if xy[0] != '.':
+                    status.staged.append((xy[0], path))
+                if xy[1] != '.':
+                    status.unstaged.append((xy[1], path))
+            status.lines.append(f"{xy.replace('.', ' ')} {path}")
+    return status
+
+
+def read_status(git_repo):
+    # Un solo recorrido del árbol de trabajo para todo lo que necesitan
+    # commit, push y pull
+    return parse_status(git_repo.git.status('--porcelain=v2', '-z', '--branch'))
@@ -0,0 +1,347 @@
+import queue
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from json_stream import iter_array
+from response_cache import KEPT_HEADERS, CacheEntry
+from rate_limit import PRIORITY_INTERACTIVE, RateLimiter, is_rate_limited
+from tracing import tracer
+
+API_URL = 'https://api.github.com'
+
+# Timeouts por defecto: (conexión, lectura) en segundos
+DEFAULT_TIMEOUT = (5, 30)
+
+# Lectura de las respuestas en streaming: tamaño de cada trozo y elementos
+# por tanda entregada
+STREAM_CHUNK_SIZE = 16 * 1024
+STREAM_BATCH_SIZE = 25
+
+
+class GitHubClient:
+    # Cliente HTTP compartido para todas las llamadas a la API de GitHub.
+    # Mantiene una única sesión con pool de conexiones keep-alive, así cada
+    # clic reutiliza la conexión TCP+TLS en lugar de abrir una nueva.
+
+    def __init__(self, token="", base_url=API_URL, timeout=DEFAULT_TIMEOUT,
+                 retries=3, backoff_factor=0.5, pool_size=10, cache=None, limiter=None,
+                 rate_limit_retries=2):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        # ResponseCache opcional para peticiones GET condicionales
+        self.cache = cache
+        # Toda petición a la API pasa por el planificador de cuota
+        self.limiter = limiter or RateLimiter(max_concurrency=pool_size)
+        self.rate_limit_retries = rate_limit_retries
+
+        self.session = requests.Session()
+        self.session.headers.update({'Accept': 'application/vnd.github.v3+json'})
+
+        # Reintentos con backoff exponencial para errores transitorios del servidor.
+        # POST y PATCH no son idempotentes, así que no se reintentan.
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.set_token(token)
+
+    def set_token(self, token):
+        self.token = token
+        if token:
+            self.session.headers['Authorization'] = f'token {token}'
+        else:
+            self.session.headers.pop('Authorization', None)
+
+    def url(self, path):
+        # Acepta tanto rutas relativas ('/user/repos') como URLs completas (repo['url'])
+        if path.startswith(('http://', 'https://')):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, priority=PRIORITY_INTERACTIVE, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        url = self.url(path)
+        resource = 'graphql' if url == self.url('/graphql') else 'core'
+        name = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        with tracer.span(f"{method} {name}", 'http', method=method, url=url) as span:
+            # Un 403/429 por límite de uso no se devuelve como error: el planificador
+            # bloquea el token hasta Retry-After / X-RateLimit-Reset y se reintenta
+            waited = 0.0
+            for attempt in range(self.rate_limit_retries + 1):
+                start = time.perf_counter()
+                self.limiter.acquire(self.token, priority, resource)
+                waited += time.perf_counter() - start
+                response = None
+                try:
+                    if method == 'GET' and self.cache is not None:
+                        response = self._conditional_get(url, **kwargs)
+                    else:
+                        response = self.session.request(method, url, **kwargs)
+                finally:
+                    self.limiter.release(self.token, response, resource)
+                if not is_rate_limited(response):
+                    break
+                response.close()
+            if tracer.enabled:
+                # from_cache sólo existe en los GET que pasan por la caché; en
+                # streaming el cuerpo aún no se ha leído
+                from_cache = getattr(response, 'from_cache', None)
+                size = response.headers.get('Content-Length') if kwargs.get('stream') else len(response.content)
+                span.set(status=response.status_code, bytes=size,
+                         cache=None if from_cache is None else ('hit' if from_cache else 'miss'),
+                         attempts=attempt + 1, quota_wait_ms=round(waited * 1000, 1),
+                         server_ms=round(response.elapsed.total_seconds() * 1000, 1))
+        return response
+
+    def rate_limit(self, resource='core'):
+        # Cuota conocida del token actual (None hasta la primera respuesta)
+        return self.limiter.budget(self.token, resource)
+
+    def graphql(self, query, variables=None, priority=PRIORITY_INTERACTIVE):
+        response = self.post('/graphql', json={'query': query, 'variables': variables or {}}, priority=priority)
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get('errors'):
+            raise GraphQLError(payload['errors'], payload.get('data'))
+        return payload['data']
+
+    def _conditional_get(self, url, params=None, headers=None, stream=False, **kwargs):
+        # Si ya tenemos la respuesta, se revalida con If-None-Match / If-Modified-Since:
+        # un 304 no trae cuerpo y no consume cuota de la API. En streaming el
+        # cuerpo se guarda cuando se termina de leer (_store).
+        full_url = requests.Request('GET', url, params=params).prepare().url
+        key = self.cache.key(full_url, self.token)
+        entry = self.cache.get(key)
+
+        headers = dict(headers or {})
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        response = self.session.get(full_url, headers=headers, stream=stream, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            return cached_response(entry, response)
+
+        response.from_cache = False
+        response.cache_key = key
+        if not stream:
+            self._store(response, response.content)
+        return response
+
+    def _store(self, response, body):
+        if response.status_code == 200 and ('ETag' in response.headers or 'Last-Modified' in response.headers):
+            kept = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+            self.cache.store(response.cache_key, CacheEntry(response.url, response.status_code, kept, body))
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.request('PATCH', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def iter_pages(self, path, params=None, per_page=100, max_workers=4, priority=PRIORITY_INTERACTIVE):
+        # Recorre todas las páginas de un endpoint de lista. La primera página
+        # indica (cabecera Link) cuántas hay; el resto se piden en paralelo.
+        # Produce (indice_pagina, elementos) a medida que llegan, no en orden:
+        # el consumidor es quien las ordena.
+        params = dict(params or {})
+        params['per_page'] = per_page
+        params['page'] = 1
+        response = self.get(path, params=params, priority=priority)
+        response.raise_for_status()
+        yield 1, response.json()
+
+        last_page = last_page_from_links(response.links)
+        if last_page <= 1:
+            return
+
+        def fetch(page):
+            page_params = dict(params, page=page)
+            page_response = self.get(path, params=page_params, priority=priority)
+            page_response.raise_for_status()
+            return page_response.json()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            fetch = tracer.propagate(fetch)
+            futures = {executor.submit(fetch, page): page for page in range(2, last_page + 1)}
+            try:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+            finally:
+                # Si el consumidor abandona o falla una página, no seguir pidiendo
+                for future in futures:
+                    future.cancel()
+
+    def iter_items(self, path, params=None, per_page=100, max_workers=4, priority=PRIORITY_INTERACTIVE,
+                   reduce=None, batch_size=STREAM_BATCH_SIZE):
+        # Como iter_pages, pero los cuerpos se leen en streaming y cada
+        # elemento pasa por reduce (p. ej. quedarse con los campos que se
+        # usan) en cuanto se completa. Produce tandas de elementos en el orden
+        # de la API: las de la primera página según llegan y, como el resto
+        # de páginas se piden en paralelo en cuanto se conocen las cabeceras
+        # de la primera, las de cada página se guardan hasta que le toca.
+        params = dict(params or {})
+        params['per_page'] = per_page
+        params['page'] = 1
+        response = self._open_stream(path, params, priority)
+        last_page = last_page_from_links(response.links)
+        results = queue.Queue()
+        stop = threading.Event()
+
+        def fetch(page):
+            try:
+                page_response = self._open_stream(path, dict(params, page=page), priority)
+                for batch in self.iter_batches(page_response, reduce, batch_size):
+                    if stop.is_set():
+                        page_response.close()
+                        return
+                    results.put((page, batch, False))
+                results.put((page, [], True))
+            except BaseException as e:
+                results.put((page, e, True))
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, last_page - 1))) as executor:
+            futures = [executor.submit(tracer.propagate(fetch), page) for page in range(2, last_page + 1)]
+            try:
+                yield from self.iter_batches(response, reduce, batch_size)
+                pending = {}
+                finished = set()
+                next_page = 2
+                while next_page <= last_page:
+                    page, batch, complete = results.get()
+                    if isinstance(batch, BaseException):
+                        raise batch
+                    if batch:
+                        pending.setdefault(page, []).append(batch)
+                    if complete:
+                        finished.add(page)
+                    while next_page <= last_page:
+                        yield from pending.pop(next_page, [])
+                        if next_page not in finished:
+                            break
+                        next_page += 1
+            finally:
+                # Si el consumidor abandona o falla una página, no seguir leyendo
+                stop.set()
+                response.close()
+                for future in futures:
+                    future.cancel()
+
+    def _open_stream(self, path, params, priority):
+        response = self.get(path, params=params, priority=priority, stream=True)
+        if response.status_code >= 400:
+            response.close()
+        response.raise_for_status()
+        return response
+
+    def iter_batches(self, response, reduce=None, batch_size=STREAM_BATCH_SIZE):
+        # Tandas de elementos del array JSON de una respuesta abierta con
+        # stream=True según se completan. Si la respuesta va a la caché, sus
+        # trozos se guardan y el cuerpo se almacena al terminar de leerlo.
+        keep = self.cache is not None and getattr(response, 'from_cache', None) is False
+        body = []
+        chunks = response.iter_content(STREAM_CHUNK_SIZE)
+        if keep:
+            chunks = _collect(chunks, body)
+        batch = []
+        try:
+            for item in iter_array(chunks):
+                batch.append(item if reduce is None else reduce(item))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        finally:
+            response.close()
+        if batch:
+            yield batch
+        if keep:
+            self._store(response, b''.join(body))
+
+    def get_all_pages(self, path, params=None, per_page=100, max_workers=4, priority=PRIORITY_INTERACTIVE,
+                      reduce=None):
+        return [item for batch in self.iter_items(path, params, per_page, max_workers, priority, reduce)
+                for item in batch]
+
+    def get_external(self, url, headers=None, **kwargs):
+        # Descarga recursos fuera de la API (p. ej. avatares) sin enviar el token
+        kwargs.setdefault('timeout', self.timeout)
+        headers = dict(headers or {}, Authorization=None)
+        with tracer.span(f"GET {url}", 'http', method='GET', url=url) as span:
+            response = self.session.get(url, headers=headers, **kwargs)
+            span.set(status=response.status_code, bytes=len(response.content))
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+class GraphQLError(Exception):
+    # data es la respuesta parcial, si la hay: con alias, los que han
+    # fallado vienen a null y el resto es válido
+
+    def __init__(self, errors, data=None):
+        self.errors = errors
+        self.data = data
+        super().__init__('; '.join(error.get('message', str(error)) for error in errors))
+
+
+def _collect(chunks, body):
+    for chunk in chunks:
+        body.append(chunk)
+        yield chunk
+
+
+def cached_response(entry, revalidation):
+    # Reconstruye una respuesta 200 a partir de la caché tras recibir un 304
+    response = requests.Response()
+    response.status_code = entry.status_code
+    response.reason = 'OK'
+    response.headers = CaseInsensitiveDict(entry.headers)
+    # Las cabeceras de la revalidación (fecha, límites de uso, ETag) son las vigentes
+    for name, value in revalidation.headers.items():
+        if name.lower() not in ('content-length', 'content-type', 'content-encoding', 'transfer-encoding'):
+            response.headers[name] = value
+    response._content = entry.body
+    # Para que iter_content lea del cuerpo guardado y no de la conexión
+    response._content_consumed = True
+    response.url = entry.url
+    response.request = revalidation.request
+    response.elapsed = revalidation.elapsed
+    response.from_cache = True
+    return response
+
+
+def last_page_from_links(links):
+    # requests ya interpreta la cabecera Link en response.links
+    last = links.get('last')
+    if not last:
+        return 1
+    query = urllib.parse.parse_qs(urllib.parse.urlparse(last['url']).query)
+    try:
+        return int(query.get('page', ['1'])[0])
+    except ValueError:
+        return 1
@@ -0,0 +1,84 @@
+from rate_limit import PRIORITY_INTERACTIVE
+from repo_store import RepoRecord
+
+# Repositorios por página y ramas precargadas por repositorio
+PAGE_SIZE = 100
+BRANCHES_PER_REPO = 30
+
+REPOS_QUERY = """
+query($cursor: String, $pageSize: Int!, $branches: Int!) {
+  viewer {
+    repositories(first: $pageSize, after: $cursor,
+                 affiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER],
+                 orderBy: {field: NAME, direction: ASC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        databaseId
+        name
+        nameWithOwner
+        description
+        url
+        isPrivate
+        stargazerCount
+        forkCount
+        createdAt
+        updatedAt
+        primaryLanguage { name }
+        owner { login avatarUrl }
+        repositoryTopics(first: 20) { nodes { topic { name } } }
+        defaultBranchRef { name }
+        refs(refPrefix: "refs/heads/", first: $branches) {
+          totalCount
+          nodes { name target { oid } }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def repo_from_node(node, api_url):
+    # Convierte un nodo GraphQL al mismo RepoRecord que /user/repos para que el
+    # resto de la aplicación no tenga que distinguir de dónde viene
+    refs = node.get('refs') or {'totalCount': 0, 'nodes': []}
+    branches = [{'name': ref['name'], 'commit': {'sha': (ref.get('target') or {}).get('oid')}}
+                for ref in refs['nodes']]
+    return RepoRecord({
+        'id': node['databaseId'],
+        'name': node['name'],
+        'full_name': node['nameWithOwner'],
+        'description': node['description'],
+        'private': node['isPrivate'],
+        'html_url': node['url'],
+        'clone_url': f"{node['url']}.git",
+        'url': f"{api_url}/repos/{node['nameWithOwner']}",
+        'stargazers_count': node['stargazerCount'],
+        'forks_count': node['forkCount'],
+        'language': (node.get('primaryLanguage') or {}).get('name'),
+        'created_at': node['createdAt'],
+        'updated_at': node['updatedAt'],
+        'owner': {'login': node['owner']['login'], 'avatar_url': node['owner']['avatarUrl']},
+        'topics': [item['topic']['name'] for item in (node.get('repositoryTopics') or {}).get('nodes', [])],
+        'default_branch': (node.get('defaultBranchRef') or {}).get('name'),
+        'branches': branches,
+        # Si el repositorio tiene más ramas de las precargadas hay que pedirlas por REST
+        'branches_complete': refs['totalCount'] <= len(branches),
+    })
+
+
+def iter_repo_pages(client, priority=PRIORITY_INTERACTIVE):
+    # Una consulta por cada 100 repositorios, con rama predeterminada,
+    # metadatos y primera página de ramas incluidos. La paginación GraphQL va
+    # por cursor, así que las páginas se piden en serie.
+    cursor = None
+    page = 1
+    while True:
+        data = client.graphql(REPOS_QUERY, {'cursor': cursor, 'pageSize': PAGE_SIZE,
+                                            'branches': BRANCHES_PER_REPO}, priority=priority)
+        connection = data['viewer']['repositories']
+        yield page, [repo_from_node(node, client.base_url) for node in connection['nodes']]
+        if not connection['pageInfo']['hasNextPage']:
+            return
+        cursor = connection['pageInfo']['endCursor']
+        page += 1
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+from PIL import Image
+
+
+class ImageCache:
+    # Caché de imágenes remotas (avatares): los bytes descargados se guardan en
+    # disco junto con su ETag y las miniaturas ya decodificadas en un LRU en
+    # memoria. load_thumbnail hace red y decodificación, así que debe
+    # llamarse desde un worker; en el hilo de Tk sólo se crea el PhotoImage.
+
+    def __init__(self, client, directory=None, max_thumbnails=256, max_age=24 * 3600):
+        self.client = client
+        self.directory = directory
+        self.max_thumbnails = max_thumbnails
+        # Durante max_age segundos la copia en disco se usa sin revalidar
+        self.max_age = max_age
+        self._thumbnails = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def load_thumbnail(self, url, size):
+        key = (url, size)
+        with self._lock:
+            image = self._thumbnails.get(key)
+            if image is not None:
+                self._thumbnails.move_to_end(key)
+                return image
+
+        image = self.decode(self.fetch(url), size)
+
+        with self._lock:
+            self._thumbnails[key] = image
+            while len(self._thumbnails) > self.max_thumbnails:
+                self._thumbnails.popitem(last=False)
+        return image
+
+    def fetch(self, url):
+        data, meta, age = self._read_disk(url)
+        if data is not None and age < self.max_age:
+            return data
+
+        headers = {}
+        if data is not None and meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        response = self.client.get_external(url, headers=headers)
+        if response.status_code == 304 and data is not None:
+            self._touch(url)
+            return data
+        response.raise_for_status()
+        self._write_disk(url, response.content, response.headers.get('ETag'))
+        return response.content
+
+    @staticmethod
+    def decode(data, size):
+        img = Image.open(BytesIO(data))
+        # En JPEG, draft hace que el decodificador escale al cargar (1/2, 1/4, 1/8)
+        # y nunca se decodifica la imagen a tamaño completo
+        img.draft('RGB', size)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA')
+        # thumbnail usa reduce() antes del filtro LANCZOS para el resto de formatos
+        img.thumbnail(size, Image.LANCZOS, reducing_gap=2.0)
+        return img
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.directory, f'{key}.img'), os.path.join(self.directory, f'{key}.json')
+
+    def _read_disk(self, url):
+        if not self.directory:
+            return None, {}, 0
+        data_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(data_path, 'rb') as f:
+                data = f.read()
+            age = time.time() - os.path.getmtime(meta_path)
+        except (OSError, ValueError):
+            return None, {}, 0
+        return data, meta, age
+
+    def _write_disk(self, url, data, etag):
+        if not self.directory:
+            return
+        data_path, meta_path = self._paths(url)
+        suffix = f'.{threading.get_ident()}.tmp'
+        try:
+            with open(data_path + suffix, 'wb') as f:
+                f.write(data)
+            os.replace(data_path + suffix, data_path)
+            with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+                json.dump({'url': url, 'etag': etag}, f)
+            os.replace(meta_path + suffix, meta_path)
+        except OSError:
+            pass
+
+    def _touch(self, url):
+        # Revalidada con éxito: vuelve a contar max_age desde ahora
+        if self.directory:
+            try:
+                os.utime(self._paths(url)[1])
+            except OSError:
+                pass
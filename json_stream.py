@@ -0,0 +1,70 @@
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+def _skip(buffer, pos):
+    while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+class _ArrayParser:
+    # Estado del análisis entre trozos: lo recibido y aún sin consumir, y en
+    # qué punto del array se está
+
+    def __init__(self):
+        self.buffer = ''
+        self.started = False
+        self.finished = False
+
+    def feed(self, text, final=False):
+        # Elementos completos con lo recibido hasta ahora. Un elemento a
+        # medias se deja en el búfer; un número o literal también mientras no
+        # le siga un separador, porque el siguiente trozo podría continuarlo.
+        buffer = self.buffer + text
+        pos = 0
+        items = []
+        while not self.finished:
+            pos = _skip(buffer, pos)
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if not self.started:
+                if char != '[':
+                    raise json.JSONDecodeError("Se esperaba un array JSON", buffer, pos)
+                self.started = True
+                pos += 1
+            elif char == ']':
+                self.finished = True
+                pos += 1
+            elif char == ',':
+                pos += 1
+            else:
+                try:
+                    item, end = _decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break
+                if char not in '{["' and not final and (end == len(buffer) or buffer[end] not in ',]' + _WHITESPACE):
+                    break
+                items.append(item)
+                pos = end
+        self.buffer = buffer[pos:]
+        return items
+
+
+def iter_array(chunks):
+    # Elementos de un array JSON que llega por trozos de bytes (p. ej.
+    # response.iter_content), según se completan: no hace falta tener el
+    # cuerpo entero ni su árbol completo en memoria a la vez
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    parser = _ArrayParser()
+    for chunk in chunks:
+        yield from parser.feed(decoder.decode(chunk))
+    yield from parser.feed(decoder.decode(b'', final=True), final=True)
+    if not parser.finished:
+        raise json.JSONDecodeError("Array JSON incompleto", parser.buffer, len(parser.buffer))
@@ -0,0 +1,127 @@
+import heapq
+import itertools
+import threading
+import time
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+
+class RateLimitExceeded(Exception):
+
+    def __init__(self, reset_at):
+        self.reset_at = reset_at
+        super().__init__(f"Límite de la API de GitHub agotado hasta las {time.strftime('%H:%M:%S', time.localtime(reset_at))}")
+
+
+class Budget:
+    # Cuota conocida de un token según las cabeceras X-RateLimit-*
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset_at = 0
+        self.blocked_until = 0   # Retry-After o límite secundario
+
+    def update(self, response, now):
+        headers = response.headers
+        try:
+            if 'X-RateLimit-Remaining' in headers:
+                self.remaining = int(headers['X-RateLimit-Remaining'])
+            if 'X-RateLimit-Limit' in headers:
+                self.limit = int(headers['X-RateLimit-Limit'])
+            if 'X-RateLimit-Reset' in headers:
+                self.reset_at = int(headers['X-RateLimit-Reset'])
+        except ValueError:
+            pass
+
+        if is_rate_limited(response):
+            retry_after = headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                self.blocked_until = max(self.blocked_until, now + int(retry_after))
+            elif self.remaining == 0 and self.reset_at:
+                self.blocked_until = max(self.blocked_until, self.reset_at)
+            else:
+                # Límite secundario sin indicación: la documentación recomienda esperar un minuto
+                self.blocked_until = max(self.blocked_until, now + 60)
+
+    def wait_time(self, priority, reserve, now):
+        # Segundos que debe esperar una petición de esta prioridad (0 si puede salir ya)
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.remaining is not None and now < self.reset_at:
+            # Las peticiones en segundo plano dejan una reserva para las interactivas
+            floor = reserve if priority == PRIORITY_BACKGROUND else 0
+            if self.remaining <= floor:
+                return self.reset_at - now
+        return 0
+
+
+def is_rate_limited(response):
+    if response.status_code not in (403, 429):
+        return False
+    headers = response.headers
+    return 'Retry-After' in headers or headers.get('X-RateLimit-Remaining') == '0'
+
+
+class RateLimiter:
+    # Planificador delante de todas las llamadas a la API: limita la
+    # concurrencia, da prioridad a las peticiones interactivas sobre las de
+    # segundo plano y, cuando la cuota de un token se agota, retrasa las
+    # peticiones en lugar de dejarlas fallar.
+
+    def __init__(self, max_concurrency=6, reserve=100, max_wait=120):
+        self.max_concurrency = max_concurrency
+        self.reserve = reserve
+        # Espera máxima antes de rendirse con RateLimitExceeded
+        self.max_wait = max_wait
+        self._budgets = {}
+        self._waiters = []
+        self._counter = itertools.count()
+        self._active = 0
+        self._cond = threading.Condition()
+
+    def budget(self, token, resource='core'):
+        with self._cond:
+            budget = self._budgets.get((token, resource))
+            if budget is None:
+                return None
+            return {'limit': budget.limit, 'remaining': budget.remaining,
+                    'reset_at': budget.reset_at, 'blocked_until': budget.blocked_until}
+
+    def acquire(self, token, priority=PRIORITY_INTERACTIVE, resource='core'):
+        # La cuota es independiente por recurso (core, graphql, search...)
+        entry = (priority, next(self._counter))
+        deadline = time.time() + self.max_wait
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.time()
+                    budget = self._budgets.setdefault((token, resource), Budget())
+                    wait = budget.wait_time(priority, self.reserve, now)
+                    if self._waiters[0] == entry and self._active < self.max_concurrency and wait <= 0:
+                        break
+                    if wait > 0 and now + wait > deadline:
+                        raise RateLimitExceeded(now + wait)
+                    # Sin espera por cuota sólo falta un hueco: release() avisará
+                    self._cond.wait(wait if wait > 0 else None)
+                heapq.heappop(self._waiters)
+                self._active += 1
+                # El siguiente en la cola puede tener ya hueco
+                self._cond.notify_all()
+                if budget.remaining is not None:
+                    # Se reserva una unidad hasta que la respuesta diga la cifra real
+                    budget.remaining -= 1
+            except BaseException:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+                raise
+
+    def release(self, token, response=None, resource='core'):
+        with self._cond:
+            self._active -= 1
+            if response is not None:
+                self._budgets.setdefault((token, resource), Budget()).update(response, time.time())
+            self._cond.notify_all()
@@ -0,0 +1,403 @@
+import os
+import sys
+import urllib.parse
+
+from git import GitCommandError
+from requests import RequestException
+
+from app_paths import cache_dir, config_dir
+from branch_ops import branch_info, create_branch_in_repos, delete_branches
+from bulk_sync import fetch_env, sync_all
+from git_clone import clone
+from git_handles import RepoHandles
+from git_status import read_status
+from github_client import API_URL, GitHubClient, GraphQLError
+from graphql_loader import iter_repo_pages
+from repo_store import RepoRecord, RepoStore
+from response_cache import ResponseCache
+from snapshot import AccountSnapshot, account_key
+from workspace import WorkspaceIndex
+
+
+class ManagerError(Exception):
+    # Operación rechazada por GitHub o por git. El mensaje se puede mostrar
+    # tal cual; status_code es el de la respuesta HTTP, si la hubo.
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class AuthenticationError(ManagerError):
+    pass
+
+
+class NotFoundError(ManagerError):
+    pass
+
+
+class DetachedHeadError(ManagerError):
+    pass
+
+
+class BatchResult:
+    # Resultado de una operación sobre varios elementos (ramas, repositorios):
+    # errors es {elemento: None o mensaje de error} y values guarda lo que
+    # devolvió cada elemento que tuvo éxito
+
+    def __init__(self, errors, values=None):
+        self.errors = errors
+        self.values = values or {}
+
+    @property
+    def succeeded(self):
+        return [key for key, error in self.errors.items() if error is None]
+
+    @property
+    def failed(self):
+        return {key: error for key, error in self.errors.items() if error is not None}
+
+    def failure_lines(self, limit=10):
+        return "\n".join(f"{key}: {error}" for key, error in list(self.failed.items())[:limit])
+
+
+class PullResult:
+
+    def __init__(self, branch, changed):
+        self.branch = branch
+        self.changed = changed   # HEAD ha cambiado con el merge
+
+
+class RepoDiff:
+    # Resultado de volver a cargar la lista: los repositorios en su orden y
+    # los full_name nuevos o modificados y los que ya no están
+
+    def __init__(self, repos, changed, removed):
+        self.repos = repos
+        self.changed = changed
+        self.removed = removed
+
+
+def check_response(response, expected, message):
+    if response.status_code == expected:
+        return response
+    if response.status_code == 401:
+        raise AuthenticationError("Token inválido o error de autenticación", 401)
+    if response.status_code == 404:
+        raise NotFoundError(f"{message}: no encontrado", 404)
+    raise ManagerError(f"{message}. Código de estado: {response.status_code}", response.status_code)
+
+
+def configure_git_identity(user):
+    # Autor y committer de los commits hechos desde la aplicación
+    name = user.get('name') or user.get('login', 'Usuario')
+    email = user.get('email') or f"{user['login']}@users.noreply.github.com"
+    os.environ['GIT_AUTHOR_NAME'] = os.environ['GIT_COMMITTER_NAME'] = name
+    os.environ['GIT_AUTHOR_EMAIL'] = os.environ['GIT_COMMITTER_EMAIL'] = email
+
+
+class RepoManager:
+    # Operaciones de GitHub y git sin interfaz: las usan la aplicación Tk y
+    # la línea de comandos. Los métodos bloquean y lanzan ManagerError (o los
+    # errores de requests/GitPython); quien los llama decide en qué hilo.
+
+    def __init__(self, token="", client=None, workspace_path=None, max_concurrency=10, http_cache=True,
+                 base_url=API_URL, snapshot=False):
+        # Cliente HTTP compartido (pool keep-alive) con caché de respuestas
+        # condicionales persistida en disco
+        self.client = client or GitHubClient(
+            token, base_url=base_url, pool_size=max_concurrency,
+            cache=ResponseCache(directory=cache_dir('http')) if http_cache else None)
+        # Metadatos de repositorios compartidos por todas las vistas
+        self.store = RepoStore(self.client)
+        # Clones locales de los repositorios, por carpeta de trabajo
+        self.workspace = WorkspaceIndex(workspace_path or os.path.join(config_dir(), 'workspace.json'))
+        # Repo abiertos por ruta, con sus procesos cat-file, hasta close_git()
+        self.git_repos = RepoHandles()
+        # Último estado conocido de cada cuenta, para arrancar sin esperar a la red
+        self.snapshot = AccountSnapshot(os.path.join(cache_dir(), 'snapshot.sqlite3')) if snapshot else None
+        self.user = None
+
+    @property
+    def token(self):
+        return self.client.token
+
+    def login(self, token=None):
+        if token is not None:
+            self.client.set_token(token)
+        response = check_response(self.client.get('/user'), 200, "No se pudo verificar el token")
+        self.user = response.json()
+        configure_git_identity(self.user)
+        if self.client.cache is not None:
+            # Token válido: fuera de la caché en disco lo antiguo y lo de otras cuentas
+            self.client.cache.prune(self.token)
+        if self.snapshot is not None:
+            self.snapshot.save_user(self._account(), self.user)
+        return self.user
+
+    # Instantánea local
+
+    def _account(self, token=None):
+        return account_key(self.token if token is None else token, self.client.base_url)
+
+    def cached_account(self, token):
+        # Lo guardado en la última sesión con este token (CachedAccount), sin
+        # red; None si no hay nada. Los repositorios pasan al almacén con la
+        # fecha en que se guardaron, así que caducan como si se acabaran de
+        # cargar entonces.
+        if self.snapshot is None:
+            return None
+        cached = self.snapshot.load(self._account(token))
+        if cached is not None:
+            cached.repos = self.store.put_many(cached.repos, fetched_at=cached.saved_at)
+        return cached
+
+    def forget_account(self, token):
+        if self.snapshot is not None:
+            self.snapshot.forget(self._account(token))
+
+    def save_snapshot(self, repos):
+        # Lista completa recién cargada; sólo se escriben las diferencias
+        if self.snapshot is not None:
+            self.snapshot.save_repos(self._account(), repos)
+
+    def _save_repo(self, repo):
+        if self.snapshot is not None:
+            self.snapshot.save_repo(self._account(), repo)
+
+    # Repositorios
+
+    def iter_repo_batches(self, use_graphql=True):
+        # Tandas de repositorios en el orden de la lista según llegan.
+        # GraphQL trae metadatos y ramas en una consulta por cada 100
+        # repositorios (una tanda por consulta); si no está disponible para
+        # este token se vuelve a REST, que se lee en streaming quedándose sólo
+        # con los campos que se usan.
+        if use_graphql:
+            reported = False
+            try:
+                for _, page_repos in iter_repo_pages(self.client):
+                    yield page_repos
+                    reported = True
+                return
+            except (GraphQLError, RequestException) as e:
+                if reported:
+                    raise
+                print(f"Carga por GraphQL no disponible, se usa REST: {e}", file=sys.stderr)
+        yield from self.client.iter_items('/user/repos', reduce=RepoRecord.from_api)
+
+    def list_repos(self, use_graphql=True):
+        repos = self.store.put_many([repo for batch in self.iter_repo_batches(use_graphql) for repo in batch])
+        self.save_snapshot(repos)
+        return repos
+
+    def revalidate_repos(self, previous, use_graphql=True):
+        # Vuelve a cargar la lista completa (la de previous se mostró desde la
+        # instantánea) y sólo modifica en el almacén los repositorios que han
+        # cambiado, así las ventanas abiertas conservan sus objetos
+        loaded = [repo for batch in self.iter_repo_batches(use_graphql) for repo in batch]
+        changed = [data['full_name'] for data in loaded if self.store.differs(data)]
+        names = {data['full_name'] for data in loaded}
+        removed = [repo['full_name'] for repo in previous if repo['full_name'] not in names]
+        for full_name in removed:
+            self.store.remove(full_name)
+        repos = self.store.put_many(loaded)
+        self.save_snapshot(repos)
+        return RepoDiff(repos, changed, removed)
+
+    def find_repo(self, full_name):
+        repo = self.store.get(full_name)
+        if repo is not None:
+            return repo
+        response = check_response(self.client.get(f'/repos/{full_name}'), 200,
+                                  f"No se pudo obtener el repositorio '{full_name}'")
+        return self.store.put_many([RepoRecord.from_api(response.json())])[0]
+
+    def create_repo(self, name, description='', private=False):
+        data = {'name': name, 'description': description, 'private': private}
+        response = check_response(self.client.post('/user/repos', json=data), 201,
+                                  "No se pudo crear el repositorio")
+        repo = self.store.put_many([RepoRecord.from_api(response.json())])[0]
+        self._save_repo(repo)
+        return repo
+
+    def delete_repo(self, repo):
+        check_response(self.client.delete(repo['url']), 204, "No se pudo eliminar el repositorio")
+        self.store.remove(repo['full_name'])
+        if self.snapshot is not None:
+            self.snapshot.remove_repo(self._account(), repo['full_name'])
+
+    def set_visibility(self, repo, private):
+        response = check_response(self.client.patch(repo['url'], json={'private': private}), 200,
+                                  "No se pudo cambiar la visibilidad del repositorio")
+        # La respuesta del PATCH es el repositorio actualizado
+        self.store.apply(repo, response.json())
+        self._save_repo(repo)
+        return repo
+
+    def details(self, repo):
+        if not self.store.is_fresh(repo, 'details'):
+            self.store.refresh(repo)
+            self._save_repo(repo)
+        return repo
+
+    def default_branch(self, repo):
+        if not self.store.is_fresh(repo, 'default_branch'):
+            self.store.refresh(repo)
+            self._save_repo(repo)
+        return repo.get('default_branch')
+
+    # Ramas
+
+    def branches(self, repo, prefix='', on_progress=None):
+        # on_progress(ramas hasta ahora) mientras se carga la lista completa
+        if prefix:
+            return self.store.matching_branches(repo, prefix)
+        if self.store.is_fresh(repo, 'branches'):
+            return repo['branches']
+        branches = self.store.branches(repo, on_progress)
+        self._save_repo(repo)
+        return branches
+
+    def branch_info(self, repo):
+        return branch_info(self.client, repo, self.store.default_branch(repo))
+
+    def set_default_branch(self, repo, name):
+        check_response(self.client.patch(repo['url'], json={'default_branch': name}), 200,
+                       "No se pudo establecer la rama como predeterminada")
+        self.store.update(repo, default_branch=name)
+        self._save_repo(repo)
+
+    def delete_branches(self, repo, names, max_workers=8):
+        result = BatchResult(delete_branches(self.client, repo, names, max_workers))
+        if self.store.is_fresh(repo, 'branches'):
+            gone = set(result.succeeded)
+            self.store.update(repo, branches=[b for b in repo['branches'] if b['name'] not in gone])
+            self._save_repo(repo)
+        return result
+
+    def create_branch(self, repos, name, max_workers=8):
+        # La misma rama en varios repositorios; values tiene la rama creada
+        # en cada uno, por full_name
+        results = create_branch_in_repos(self.client, self.store, repos, name, max_workers)
+        for repo in repos:
+            if results.get(repo['full_name'], (None, None))[1] is not None:
+                self._save_repo(repo)
+        return BatchResult({full_name: error for full_name, (error, _) in results.items()},
+                           {full_name: branch for full_name, (_, branch) in results.items() if branch})
+
+    # Clones locales
+
+    def clone(self, url, directory, options=(), progress=None):
+        clone(url, directory, options, progress)
+        self.workspace.add_clone(directory)
+        self.workspace.save()
+        return directory
+
+    def sync(self, paths=None, max_workers=8, on_result=None, prune=False):
+        # Sin rutas, todos los clones conocidos de las carpetas de trabajo
+        if paths is None:
+            paths = [path for path, _ in self.workspace.clones()]
+        return sync_all(paths, token=self.token, max_workers=max_workers, on_result=on_result, prune=prune)
+
+    def remember_clone(self, repo, path):
+        # Asociación manual: no se volverá a preguntar por este repositorio
+        self.workspace.add_clone(path, repo['full_name'])
+        self.workspace.save()
+
+    def open_git(self, path):
+        # Lanza InvalidGitRepositoryError si no es un repositorio
+        return self.git_repos.get(path)
+
+    def init_git(self, path):
+        return self.git_repos.init(path)
+
+    def close_git(self, repo):
+        local_path = self.workspace.path_for(repo)
+        if local_path:
+            self.git_repos.close(local_path)
+
+    def status(self, git_repo):
+        # Siempre leído en el momento: decide commit, pull y push, y las
+        # ediciones del árbol de trabajo no dejan rastro en .git
+        return read_status(git_repo)
+
+    def branch_status(self, git_repo, operation):
+        status = read_status(git_repo)
+        if status.branch is None:
+            raise DetachedHeadError(f"El repositorio está en HEAD separado: cambie a una rama antes de hacer {operation}")
+        return status
+
+    def commit(self, git_repo, message, files=None):
+        # Añade los archivos indicados (o todos) y hace commit si hay algo
+        # preparado; devuelve si se ha creado el commit
+        if files:
+            for file in files:
+                git_repo.git.add(file)
+        else:
+            git_repo.git.add(A=True)
+        # git add ha cambiado el index: el estado se relee
+        committed = bool(read_status(git_repo).staged)
+        if committed:
+            git_repo.git.commit('-m', message)
+        return committed
+
+    def remote_branches(self, repo, git_repo):
+        # Las de la API si están al día o, si no, ls-remote (sólo lista
+        # referencias, sin descargar objetos)
+        if self.store.is_fresh(repo, 'branches'):
+            names = [branch['name'] for branch in repo['branches']]
+        else:
+            url = repo.get('clone_url') or git_repo.remotes.origin.url
+            output = git_repo.git.ls_remote('--heads', url, env=fetch_env(self.token, url))
+            names = [line.split('\trefs/heads/', 1)[1] for line in output.splitlines() if '\trefs/heads/' in line]
+        return sorted(set(names))
+
+    def authenticated_url(self, repo_url):
+        # URL del repositorio con el token incluido (sólo HTTP: las rutas
+        # locales y SSH no llevan credenciales en la URL)
+        parsed_url = urllib.parse.urlparse(repo_url)
+        if parsed_url.scheme not in ('http', 'https'):
+            return repo_url
+        return parsed_url._replace(netloc=f"{self.token}@{parsed_url.netloc}").geturl()
+
+    def set_origin(self, git_repo, repo):
+        # Configurar el remoto con la URL autenticada
+        if not repo.get('clone_url'):
+            raise ManagerError("No se encontró la URL del repositorio remoto.")
+        authenticated_url = self.authenticated_url(repo['clone_url'])
+        if 'origin' in git_repo.remotes:
+            origin = git_repo.remotes.origin
+            origin.set_url(authenticated_url)
+        else:
+            origin = git_repo.create_remote('origin', authenticated_url)
+        return origin
+
+    def pull(self, repo, git_repo, branch, commit_message=None, discard=False):
+        # Con cambios locales, antes se confirman (commit_message) o se
+        # descartan (discard). Sólo se descarga la rama elegida y se mezcla
+        # en local (fast-forward si es posible).
+        if commit_message:
+            git_repo.git.add(A=True)
+            git_repo.git.commit('-m', commit_message)
+        elif discard:
+            git_repo.git.reset('--hard')
+
+        self.set_origin(git_repo, repo)
+        before = git_repo.git.rev_parse('HEAD')
+        git_repo.git.fetch('origin', f'+refs/heads/{branch}:refs/remotes/origin/{branch}')
+        git_repo.git.merge('--no-edit', f'origin/{branch}')
+        return PullResult(branch, git_repo.git.rev_parse('HEAD') != before)
+
+    def push(self, repo, git_repo, branch, target=None):
+        origin = self.set_origin(git_repo, repo)
+        push_info = origin.push(refspec=f'{branch}:{target or branch}')
+        if push_info and push_info[0].flags & push_info[0].ERROR:
+            raise GitCommandError("git push", push_info[0].summary)
+        return push_info
+
+    def close(self):
+        self.git_repos.close_all()
+        self.client.close()
+        if self.snapshot is not None:
+            self.snapshot.close()
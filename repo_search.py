@@ -0,0 +1,138 @@
+from collections import defaultdict
+
+# Categorías de coincidencia, de mejor a peor
+MATCH_EXACT = 0
+MATCH_PREFIX = 1
+MATCH_WORD_PREFIX = 2
+MATCH_NAME = 3
+MATCH_OTHER_FIELD = 4
+MATCH_FUZZY = 5
+
+WORD_SEPARATORS = '-_. /'
+
+
+def fuzzy_span(query, text):
+    # Si query es una subsecuencia de text devuelve la longitud del tramo que
+    # la contiene (cuanto más corto, mejor); si no, None
+    start = text.find(query[0])
+    if start < 0:
+        return None
+    position = start
+    for char in query[1:]:
+        position = text.find(char, position + 1)
+        if position < 0:
+            return None
+    return position - start + 1
+
+
+class RepoSearchIndex:
+    # Índice de búsqueda sobre la lista de repositorios cargada: nombres y
+    # campos ya pasados a minúsculas y un índice invertido por carácter que
+    # descarta de entrada los repositorios que no pueden coincidir. Si la
+    # consulta amplía la anterior se filtra sobre el resultado previo en
+    # lugar de volver al índice.
+
+    def __init__(self, repos=()):
+        self.repos = []
+        self._names = []
+        self._fields = []      # descripción, lenguaje y topics en minúsculas
+        self._fuzzy_fields = []
+        self._chars = defaultdict(set)
+        self._last_query = None
+        self._last_matches = None
+        self.add(repos)
+
+    def add(self, repos):
+        for repo in repos:
+            index = len(self.repos)
+            name = (repo.get('name') or '').lower()
+            topics = ' '.join(repo.get('topics') or []).lower()
+            language = (repo.get('language') or '').lower()
+            description = (repo.get('description') or '').lower()
+            fields = ' '.join(part for part in (description, language, topics) if part)
+
+            self.repos.append(repo)
+            self._names.append(name)
+            self._fields.append(fields)
+            self._fuzzy_fields.append(' '.join(part for part in (language, topics) if part))
+
+            for char in set(f'{name} {fields}'):
+                self._chars[char].add(index)
+
+        # Con repositorios nuevos el resultado anterior ya no sirve para acotar
+        self._last_query = None
+        self._last_matches = None
+
+    def clear(self):
+        self.__init__()
+
+    def search(self, query):
+        query = query.lower().strip()
+        if not query:
+            self._last_query, self._last_matches = None, None
+            return list(self.repos)
+
+        terms = query.split()
+        if self._last_query is not None and query.startswith(self._last_query):
+            # Búsqueda incremental: todo lo que coincide con la nueva consulta
+            # coincidía ya con la anterior
+            candidates = [index for index, _ in self._last_matches]
+        else:
+            candidates = self._candidates(terms)
+
+        matches = []
+        for index in candidates:
+            score = self._score(index, terms)
+            if score is not None:
+                matches.append((index, score))
+
+        self._last_query = query
+        self._last_matches = matches
+        ranked = sorted(matches, key=lambda match: (match[1], match[0]))
+        return [self.repos[index] for index, _ in ranked]
+
+    def _candidates(self, terms):
+        # Todo término debe aparecer (como subcadena o subsecuencia), así que
+        # al menos todos sus caracteres tienen que estar en el repositorio
+        postings = [self._chars.get(char, set()) for char in set(''.join(terms))]
+        postings.sort(key=len)
+        if not postings or not postings[0]:
+            return []
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return sorted(result)
+
+    def _score(self, index, terms):
+        name = self._names[index]
+        total = (0, 0)
+        for term in terms:
+            score = self._term_score(index, name, term)
+            if score is None:
+                return None
+            total = (total[0] + score[0], total[1] + score[1])
+        return total
+
+    def _term_score(self, index, name, term):
+        if name == term:
+            return (MATCH_EXACT, 0)
+        if name.startswith(term):
+            return (MATCH_PREFIX, 0)
+        position = name.find(term)
+        if position >= 0:
+            if name[position - 1] in WORD_SEPARATORS:
+                return (MATCH_WORD_PREFIX, position)
+            return (MATCH_NAME, position)
+        if term in self._fields[index]:
+            return (MATCH_OTHER_FIELD, 0)
+
+        # Coincidencia difusa (subsecuencia) en el nombre, lenguaje o topics
+        span = fuzzy_span(term, name)
+        if span is None:
+            span = fuzzy_span(term, self._fuzzy_fields[index])
+            if span is None:
+                return None
+            span += len(name)
+        return (MATCH_FUZZY, span - len(term))
@@ -0,0 +1,386 @@
+import sys
+import threading
+import time
+from operator import attrgetter
+from urllib.parse import quote
+
+# Campos de un repositorio que usa la aplicación (los mismos que trae la
+# consulta GraphQL); del centenar que devuelve la API REST el resto se
+# descarta al leer cada respuesta
+REPO_FIELDS = ('id', 'name', 'full_name', 'description', 'private', 'html_url', 'clone_url', 'url',
+               'stargazers_count', 'forks_count', 'language', 'created_at', 'updated_at', 'topics',
+               'default_branch', 'owner')
+
+# Orden en que se asignan: de full_name y html_url dependen los campos
+# derivados
+_UPDATE_ORDER = ('full_name', 'html_url') + tuple(key for key in REPO_FIELDS if key not in ('full_name', 'html_url'))
+_UPDATE_KEYS = frozenset(_UPDATE_ORDER)
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class RepoRecord:
+    # Repositorio en memoria. Con decenas de miles de repositorios (varias
+    # cuentas y organizaciones) un diccionario por repositorio pesa mucho,
+    # así que cada campo es un slot y lo que se puede deducir de full_name no
+    # se guarda: name y el login del propietario son sus dos partes, y url,
+    # html_url y clone_url salen de un prefijo común a todos los
+    # repositorios del mismo servidor. Lo que no encaja con esa deducción
+    # (p. ej. un repositorio renombrado en una respuesta antigua) va a
+    # _extra, igual que cualquier campo que no tenga slot.
+    #
+    # Se lee como un diccionario (repo['name'], repo.get('topics'),
+    # repo.update(...)) y un slot sin asignar es un campo ausente: update()
+    # con los datos de REST no borra las ramas precargadas por GraphQL.
+
+    __slots__ = ('full_name', 'id', 'description', 'private', 'stargazers_count', 'forks_count', 'language',
+                 'created_at', 'updated_at', 'topics', 'default_branch', 'avatar_url', 'branches',
+                 'branches_complete', '_api', '_web', '_extra')
+
+    def __init__(self, data=None):
+        self._extra = None
+        if data:
+            self.update(data)
+
+    @classmethod
+    def from_api(cls, data):
+        # Sólo los campos que usa la aplicación de un repositorio de la API
+        repo = cls()
+        for key in _UPDATE_ORDER:
+            if key in data:
+                repo[key] = data[key]
+        return repo
+
+    @property
+    def owner_login(self):
+        return self.full_name.partition('/')[0]
+
+    @property
+    def name(self):
+        return self._override('name') or self.full_name.partition('/')[2]
+
+    @property
+    def owner(self):
+        owner = self._override('owner')
+        if owner is None:
+            owner = {'login': self.owner_login, 'avatar_url': getattr(self, 'avatar_url', None)}
+        return owner
+
+    @property
+    def url(self):
+        return self._override('url') or self._api + self.full_name
+
+    @property
+    def html_url(self):
+        return self._override('html_url') or self._web + self.full_name
+
+    @property
+    def clone_url(self):
+        return self._override('clone_url') or f'{self._web}{self.full_name}.git'
+
+    def _override(self, key):
+        return self._extra.get(key) if self._extra is not None else None
+
+    def _set_extra(self, key, value):
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def _drop_extra(self, key):
+        if self._extra is not None:
+            self._extra.pop(key, None)
+            if not self._extra:
+                self._extra = None
+
+    def _set_name(self, value):
+        if value == self.full_name.partition('/')[2]:
+            self._drop_extra('name')
+        else:
+            self._set_extra('name', value)
+
+    def _set_owner(self, value):
+        # Del propietario sólo se usan el login y el avatar
+        owner = value or {}
+        self.avatar_url = _intern(owner.get('avatar_url'))
+        if owner.get('login') == self.owner_login:
+            self._drop_extra('owner')
+        else:
+            self._set_extra('owner', {'login': owner.get('login'), 'avatar_url': self.avatar_url})
+
+    def _set_prefixed(self, key, value, prefix_slot):
+        # Guarda sólo el prefijo si value es prefijo + full_name
+        if isinstance(value, str) and value.endswith(self.full_name) and len(value) > len(self.full_name):
+            setattr(self, prefix_slot, sys.intern(value[:-len(self.full_name)]))
+            self._drop_extra(key)
+        else:
+            self._set_extra(key, value)
+
+    def _set_clone_url(self, value):
+        if value == f'{getattr(self, "_web", None)}{self.full_name}.git':
+            self._drop_extra('clone_url')
+        else:
+            self._set_extra('clone_url', value)
+
+    def _set_topics(self, value):
+        self.topics = tuple(_intern(topic) for topic in value) if value is not None else None
+
+    def __setitem__(self, key, value):
+        setter = _SETTERS.get(key)
+        if setter is None:
+            self._set_extra(key, value)
+        elif key in _DERIVED and not hasattr(self, 'full_name'):
+            # Sin full_name no hay de qué deducirlo
+            self._set_extra(key, value)
+        else:
+            setter(self, value)
+
+    def __getitem__(self, key):
+        getter = _GETTERS.get(key)
+        try:
+            if getter is not None:
+                return getter(self)
+            if self._extra is not None:
+                return self._extra[key]
+        except (AttributeError, KeyError):
+            pass
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def update(self, data=(), **fields):
+        if isinstance(data, RepoRecord):
+            data = dict(data.items())
+        if fields:
+            data = dict(data, **fields)
+        for key in _UPDATE_ORDER:
+            if key in data:
+                self[key] = data[key]
+        for key, value in data.items():
+            if key not in _UPDATE_KEYS:
+                self[key] = value
+
+    def items(self):
+        for key, getter in _GETTERS.items():
+            try:
+                yield key, getter(self)
+            except AttributeError:
+                pass
+        if self._extra is not None:
+            yield from ((key, value) for key, value in self._extra.items() if key not in _GETTERS)
+
+    def keys(self):
+        return [key for key, _ in self.items()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f'RepoRecord({getattr(self, "full_name", None)!r})'
+
+
+# Campos que se calculan a partir de full_name y de los prefijos compartidos
+_DERIVED = frozenset(('name', 'owner', 'url', 'html_url', 'clone_url'))
+
+# Lectura de cada campo con nombre (slot o propiedad) y escritura: tal cual
+# en los slots, con una sola copia de las cadenas que se repiten entre
+# repositorios y deduciendo lo que se pueda en los derivados
+_GETTERS = {key: attrgetter(key) for key in REPO_FIELDS + ('branches', 'branches_complete')}
+_SETTERS = {key: RepoRecord.__dict__[key].__set__ for key in RepoRecord.__slots__
+            if not key.startswith('_') and key != 'avatar_url'}
+_SETTERS.update({
+    'language': lambda repo, value: setattr(repo, 'language', _intern(value)),
+    'default_branch': lambda repo, value: setattr(repo, 'default_branch', _intern(value)),
+    'topics': RepoRecord._set_topics,
+    'name': RepoRecord._set_name,
+    'owner': RepoRecord._set_owner,
+    'url': lambda repo, value: repo._set_prefixed('url', value, '_api'),
+    'html_url': lambda repo, value: repo._set_prefixed('html_url', value, '_web'),
+    'clone_url': RepoRecord._set_clone_url,
+})
+
+
+def slim_branch(data):
+    return {'name': data['name'], 'commit': {'sha': data['commit']['sha']}}
+
+
+def branch_from_ref(ref):
+    # Elemento de /git/matching-refs con la forma de /branches
+    return {'name': ref['ref'][len('refs/heads/'):], 'commit': {'sha': ref['object']['sha']}}
+
+
+# Vigencia (segundos) de cada grupo de datos de un repositorio
+DEFAULT_TTLS = {
+    'details': 300,          # descripción, estrellas, visibilidad, fechas...
+    'default_branch': 600,
+    'branches': 120,
+}
+
+
+class _Call:
+    # Petición en curso compartida por todos los que piden la misma clave
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RepoStore:
+    # Almacén único de metadatos de repositorios, indexado por full_name. Los
+    # RepoRecord se actualizan en el sitio, así que todas las ventanas que
+    # muestran un repositorio ven el mismo objeto. Cada grupo de campos tiene
+    # su propia vigencia y las peticiones idénticas simultáneas se agrupan en
+    # una sola (single-flight).
+
+    def __init__(self, client, ttls=None):
+        self.client = client
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self._repos = {}
+        self._fetched_at = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def put_many(self, repos, fetched_at=None):
+        # Registra repositorios recién cargados (/user/repos o GraphQL) y
+        # devuelve los objetos canónicos en el mismo orden. fetched_at es
+        # cuándo se obtuvieron, si no es ahora (instantánea local): caducan
+        # según esa fecha.
+        now = time.time() if fetched_at is None else fetched_at
+        result = []
+        with self._lock:
+            for data in repos:
+                full_name = data['full_name']
+                repo = self._repos.get(full_name)
+                if repo is None:
+                    repo = self._repos[full_name] = data
+                else:
+                    repo.update(data)
+                self._fetched_at[(full_name, 'details')] = now
+                if data.get('default_branch'):
+                    self._fetched_at[(full_name, 'default_branch')] = now
+                if data.get('branches_complete'):
+                    self._fetched_at[(full_name, 'branches')] = now
+                result.append(repo)
+        return result
+
+    def differs(self, data):
+        # Si aplicar data cambiaría el repositorio guardado (o es nuevo)
+        repo = self._repos.get(data['full_name'])
+        return repo is None or any(repo.get(key) != value for key, value in data.items())
+
+    def get(self, full_name):
+        return self._repos.get(full_name)
+
+    def remove(self, full_name):
+        with self._lock:
+            self._repos.pop(full_name, None)
+            for field in self.ttls:
+                self._fetched_at.pop((full_name, field), None)
+
+    def update(self, repo, **fields):
+        # Escritura local tras una operación que ya ha tenido éxito en GitHub
+        with self._lock:
+            repo.update(fields)
+            now = time.time()
+            if 'default_branch' in fields:
+                self._fetched_at[(repo['full_name'], 'default_branch')] = now
+            if 'branches' in fields:
+                self._fetched_at[(repo['full_name'], 'branches')] = now
+
+    def apply(self, repo, data):
+        # Actualiza el repositorio con la respuesta completa de un PATCH/GET
+        with self._lock:
+            repo.update(RepoRecord.from_api(data))
+            now = time.time()
+            self._fetched_at[(repo['full_name'], 'details')] = now
+            self._fetched_at[(repo['full_name'], 'default_branch')] = now
+
+    def invalidate(self, repo, field):
+        with self._lock:
+            self._fetched_at.pop((repo['full_name'], field), None)
+
+    def is_fresh(self, repo, field):
+        fetched_at = self._fetched_at.get((repo['full_name'], field))
+        return fetched_at is not None and time.time() - fetched_at < self.ttls[field]
+
+    def details(self, repo):
+        if not self.is_fresh(repo, 'details'):
+            self.refresh(repo)
+        return repo
+
+    def default_branch(self, repo):
+        if not self.is_fresh(repo, 'default_branch'):
+            self.refresh(repo)
+        return repo.get('default_branch')
+
+    def branches(self, repo, on_progress=None):
+        # Todas las ramas: la primera página dice cuántas hay y el resto se
+        # piden en paralelo. on_progress(ramas hasta ahora) se llama con cada
+        # tanda que llega, en orden, si esta llamada es la que las pide.
+        if not self.is_fresh(repo, 'branches'):
+            def fetch():
+                branches = []
+                for batch in self.client.iter_items(f"{repo['url']}/branches", reduce=slim_branch):
+                    branches.extend(batch)
+                    if on_progress is not None:
+                        on_progress(list(branches))
+                self.update(repo, branches=branches, branches_complete=True)
+            self._single_flight((repo['full_name'], 'branches'), fetch)
+        return repo['branches']
+
+    def matching_branches(self, repo, prefix):
+        # Ramas que empiezan por prefix. Con la lista completa en memoria se
+        # filtra aquí; si no, lo hace GitHub (/git/matching-refs) y sólo se
+        # descargan las que coinciden. El resultado no se guarda.
+        if self.is_fresh(repo, 'branches'):
+            return [branch for branch in repo['branches'] if branch['name'].startswith(prefix)]
+        return self.client.get_all_pages(f"{repo['url']}/git/matching-refs/heads/{quote(prefix)}",
+                                         reduce=branch_from_ref)
+
+    def refresh(self, repo):
+        def fetch():
+            response = self.client.get(repo['url'])
+            response.raise_for_status()
+            self.apply(repo, response.json())
+        self._single_flight((repo['full_name'], 'details'), fetch)
+        return repo
+
+    def _single_flight(self, key, func):
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+        return call.result
@@ -0,0 +1,215 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Cabeceras de la respuesta original que hay que conservar para poder
+# reconstruirla (Link es necesaria para la paginación)
+KEPT_HEADERS = ('Content-Type', 'Link', 'ETag', 'Last-Modified')
+
+
+class CacheEntry:
+
+    def __init__(self, url, status_code, headers, body):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+    @property
+    def etag(self):
+        return self.headers.get('ETag')
+
+    @property
+    def last_modified(self):
+        return self.headers.get('Last-Modified')
+
+    def to_json(self):
+        return {
+            'url': self.url,
+            'status_code': self.status_code,
+            'headers': self.headers,
+            'body': base64.b64encode(self.body).decode('ascii'),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['url'], data['status_code'], data['headers'], base64.b64decode(data['body']))
+
+
+def token_tag(token):
+    # Prefijo de las claves de un token: permite saber de qué cuenta es cada
+    # fichero de la caché en disco sin guardar el token
+    return hashlib.sha256(f'{token}'.encode()).hexdigest()[:16]
+
+
+class ResponseCache:
+    # Caché de respuestas para peticiones condicionales (ETag / Last-Modified).
+    # En memoria es un LRU limitado por bytes; opcionalmente persiste en disco
+    # para que tras reiniciar la aplicación baste con revalidar. En disco
+    # también hay límite de bytes y de entradas (se expulsan las usadas hace
+    # más tiempo) y prune() borra lo antiguo y lo de otros tokens: son
+    # respuestas de la API, con datos de repositorios privados.
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, directory=None, max_disk_bytes=128 * 1024 * 1024,
+                 max_disk_entries=5000, max_age=7 * 86400):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.max_disk_entries = max_disk_entries
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        # Ficheros en disco {clave: bytes}, del usado hace más tiempo al más
+        # reciente; se lee el directorio la primera vez que hace falta
+        self._disk = None
+        self._disk_size = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(url, token):
+        # El token forma parte de la clave: la misma URL devuelve datos distintos por usuario
+        digest = hashlib.sha256(f'{token}\n{url}'.encode()).hexdigest()
+        return f'{token_tag(token)}-{digest}'
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def store(self, key, entry):
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def prune(self, token):
+        # Borra del disco las entradas de otros tokens y las que llevan más
+        # de max_age sin usarse. Devuelve cuántas se han borrado.
+        if not self.directory:
+            return 0
+        prefix = f'{token_tag(token)}-'
+        oldest = time.time() - self.max_age
+        removed = 0
+        with self._lock:
+            self._scan_disk()
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                key = name[:-len('.json')] if name.endswith('.json') else None
+                try:
+                    stale = os.stat(path).st_mtime < oldest
+                except OSError:
+                    continue
+                if key is None or not key.startswith(prefix) or stale:
+                    if self._remove_disk(key, path):
+                        removed += 1
+                    if key is not None:
+                        self._entries.pop(key, None)
+            self._size = sum(len(entry.body) for entry in self._entries.values())
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remember(self, key, entry):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.body)
+            if len(entry.body) > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._size += len(entry.body)
+            # Expulsar las entradas menos usadas hasta volver al límite
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def _scan_disk(self):
+        # Bajo el cerrojo
+        if self._disk is not None:
+            return
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            files.append((stat.st_mtime, name[:-len('.json')], stat.st_size))
+        files.sort()
+        self._disk = OrderedDict((key, size) for _, key, size in files)
+        self._disk_size = sum(self._disk.values())
+
+    def _remove_disk(self, key, path=None):
+        # Bajo el cerrojo
+        try:
+            os.remove(path or self._path(key))
+        except OSError:
+            return False
+        if key is not None and self._disk is not None and key in self._disk:
+            self._disk_size -= self._disk.pop(key)
+        return True
+
+    def _read_disk(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = CacheEntry.from_json(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+        # El mtime es el último uso: lo que se sigue leyendo no se expulsa
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            if self._disk is not None and key in self._disk:
+                self._disk.move_to_end(key)
+        return entry
+
+    def _write_disk(self, key, entry):
+        if not self.directory:
+            return
+        path = self._path(key)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry.to_json(), f)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            # La caché en disco es opcional: un fallo de escritura no debe romper la petición
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._scan_disk()
+            self._disk_size -= self._disk.pop(key, 0)
+            self._disk[key] = size
+            self._disk_size += size
+            # Expulsar los ficheros usados hace más tiempo hasta volver a los límites
+            while self._disk and (self._disk_size > self.max_disk_bytes or len(self._disk) > self.max_disk_entries):
+                oldest = next(iter(self._disk))
+                if not self._remove_disk(oldest):
+                    self._disk_size -= self._disk.pop(oldest)
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from repo_store import RepoRecord
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    account TEXT PRIMARY KEY,
+    user TEXT NOT NULL,
+    saved_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS repos (
+    account TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (account, full_name)
+);
+"""
+
+
+def account_key(token, base_url):
+    # Identidad del token sin guardarlo: el mismo token contra otro servidor
+    # (GitHub Enterprise) es otra cuenta
+    return hashlib.sha256(f'{base_url}\0{token}'.encode()).hexdigest()
+
+
+def format_age(seconds):
+    if seconds < 60:
+        return "unos segundos"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)} h"
+    days = int(seconds // 86400)
+    return f"{days} día" if days == 1 else f"{days} días"
+
+
+def _dump(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True, default=str)
+
+
+class CachedAccount:
+    # Estado de la cuenta guardado en la última sesión con el mismo token
+
+    def __init__(self, user, repos, saved_at):
+        self.user = user
+        self.repos = repos
+        self.saved_at = saved_at
+
+    @property
+    def age(self):
+        return time.time() - self.saved_at
+
+
+class AccountSnapshot:
+    # Instantánea local (SQLite) del usuario y de la lista de repositorios con
+    # su rama predeterminada y sus ramas, por cuenta. Permite mostrar la
+    # ventana principal nada más introducir el token, sin esperar a la red.
+    # Cada repositorio es una fila con su JSON: al guardar una lista sólo se
+    # escriben las filas que han cambiado.
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # Se usa desde los workers de TaskRunner, siempre bajo el cerrojo
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(SCHEMA)
+
+    def load(self, account):
+        with self._lock:
+            row = self._db.execute('SELECT user, saved_at FROM accounts WHERE account = ?', (account,)).fetchone()
+            if row is None:
+                return None
+            data = self._db.execute('SELECT data FROM repos WHERE account = ? ORDER BY position',
+                                    (account,)).fetchall()
+        return CachedAccount(json.loads(row[0]), [RepoRecord(json.loads(text)) for text, in data], row[1])
+
+    def save_user(self, account, user):
+        with self._lock:
+            self._db.execute('INSERT INTO accounts (account, user, saved_at) VALUES (?, ?, ?) '
+                             'ON CONFLICT (account) DO UPDATE SET user = excluded.user',
+                             (account, _dump(user), time.time()))
+
+    def save_repos(self, account, repos):
+        # La lista completa recién cargada. Devuelve cuántas filas se han
+        # escrito o borrado.
+        rows = [(repo['full_name'], _dump(repo.to_dict())) for repo in repos]
+        with self._lock:
+            stored = {full_name: (position, data) for full_name, position, data in self._db.execute(
+                'SELECT full_name, position, data FROM repos WHERE account = ?', (account,))}
+            names = {full_name for full_name, _ in rows}
+            removed = [(account, full_name) for full_name in stored if full_name not in names]
+            written = [(account, full_name, position, data) for position, (full_name, data) in enumerate(rows)
+                       if stored.get(full_name) != (position, data)]
+            self._db.execute('BEGIN')
+            try:
+                self._db.executemany('DELETE FROM repos WHERE account = ? AND full_name = ?', removed)
+                self._db.executemany('INSERT OR REPLACE INTO repos (account, full_name, position, data) '
+                                     'VALUES (?, ?, ?, ?)', written)
+                self._db.execute('UPDATE accounts SET saved_at = ? WHERE account = ?', (time.time(), account))
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        return len(removed) + len(written)
+
+    def save_repo(self, account, repo):
+        # Un repositorio modificado por una operación (ramas, visibilidad...);
+        # los nuevos van al final de la lista
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO repos (account, full_name, position, data) VALUES (?, ?, '
+                '(SELECT COALESCE(MAX(position), -1) + 1 FROM repos WHERE account = ?), ?) '
+                'ON CONFLICT (account, full_name) DO UPDATE SET data = excluded.data',
+                (account, repo['full_name'], account, _dump(repo.to_dict())))
+
+    def remove_repo(self, account, full_name):
+        with self._lock:
+            self._db.execute('DELETE FROM repos WHERE account = ? AND full_name = ?', (account, full_name))
+
+    def forget(self, account):
+        # Token revocado: no se conserva nada de esa cuenta
+        with self._lock:
+            self._db.execute('DELETE FROM repos WHERE account = ?', (account,))
+            self._db.execute('DELETE FROM accounts WHERE account = ?', (account,))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
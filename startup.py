@@ -0,0 +1,123 @@
+import importlib
+import re
+import sys
+import threading
+import time
+
+# Momento en que empieza a cargarse la aplicación (este módulo se importa el primero)
+STARTED_AT = time.time()
+
+PROFILE_FLAG = '--profile-startup'
+
+# Módulos pesados que la ventana del token no necesita
+HEAVY_MODULES = ('requests', 'git', 'PIL')
+
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+class LazyModule:
+    # Módulo que se importa la primera vez que se usa uno de sus atributos.
+    # import_module es seguro entre hilos, así que da igual qué hilo llegue
+    # primero.
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attribute)
+
+
+# Sólo los usa el perfilado
+json = LazyModule('json')
+subprocess = LazyModule('subprocess')
+
+
+def preload(names):
+    # Importa los módulos en un hilo aparte mientras el usuario escribe el
+    # token; los errores se dejan para cuando se usen de verdad
+    def run():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+
+    thread = threading.Thread(target=run, name='gitapp-preload', daemon=True)
+    thread.start()
+    return thread
+
+
+class StartupProfile:
+    # Marcas de tiempo del arranque en el proceso perfilado. finish() las
+    # escribe como JSON en stdout para el proceso que lo lanzó.
+
+    def __init__(self):
+        self.marks = [("inicio de GITApp", STARTED_AT)]
+
+    def mark(self, label):
+        self.marks.append((label, time.time()))
+
+    def finish(self, error=None):
+        report = {
+            'marks': self.marks,
+            'heavy_modules': sorted(name for name in HEAVY_MODULES if name in sys.modules),
+            'error': error,
+        }
+        sys.stdout.write(json.dumps(report) + '\n')
+        sys.stdout.flush()
+
+
+def is_profiled_child():
+    return 'importtime' in sys._xoptions
+
+
+def parse_importtime(output, depth=0):
+    # {módulo: microsegundos acumulados} de los módulos importados a la
+    # profundidad indicada (0: los que importa directamente el programa)
+    totals = {}
+    for line in output.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match and (len(match.group(3)) - 1) // 2 == depth:
+            totals[match.group(4)] = totals.get(match.group(4), 0) + int(match.group(2))
+    return totals
+
+
+def profile_startup(script, args=()):
+    # Lanza el script con -X importtime y PROFILE_FLAG; devuelve las marcas
+    # (segundos desde el lanzamiento, incluido el arranque del intérprete),
+    # los imports de primer nivel y los módulos pesados ya cargados
+    launched_at = time.time()
+    process = subprocess.run([sys.executable, '-X', 'importtime', script, PROFILE_FLAG, *args],
+                             capture_output=True, text=True)
+    report = None
+    for line in reversed(process.stdout.splitlines()):
+        try:
+            report = json.loads(line)
+            break
+        except ValueError:
+            continue
+    if report is None:
+        lines = [line for line in process.stderr.splitlines() if not line.startswith('import time:')]
+        report = {'marks': [], 'heavy_modules': [], 'error': '\n'.join(lines[-5:]) or f"código {process.returncode}"}
+    report['marks'] = [(label, at - launched_at) for label, at in report['marks']]
+    report['imports'] = parse_importtime(process.stderr)
+    return report
+
+
+def print_startup_report(report, top=15):
+    print("Arranque (segundos desde el lanzamiento):")
+    for label, seconds in report['marks']:
+        print(f"  {label:<32}{seconds:>8.3f}")
+    if report['error']:
+        print(f"  (sin ventana: {report['error']})")
+    print()
+    print(f"Imports de primer nivel más lentos (ms acumulados, {len(report['imports'])} en total):")
+    for name, micros in sorted(report['imports'].items(), key=lambda item: -item[1])[:top]:
+        print(f"  {name:<32}{micros / 1000:>8.1f}")
+    print()
+    loaded = ', '.join(report['heavy_modules']) or "ninguno"
+    print(f"Módulos pesados cargados antes de la ventana del token: {loaded}")
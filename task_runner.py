@@ -0,0 +1,178 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from tracing import tracer
+
+_local = threading.local()
+
+
+def current_task():
+    # Tarea que se está ejecutando en este hilo (None fuera de un worker)
+    return getattr(_local, 'task', None)
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class Task:
+
+    def __init__(self, runner, func, args, kwargs, on_success, on_error, description):
+        self.runner = runner
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.on_success = on_success
+        self.on_error = on_error
+        self.description = description
+        self.future = None
+        self._cancelled = threading.Event()
+        self._cancel_callbacks = []
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        # La cancelación es cooperativa: si la tarea no ha empezado no llega a
+        # ejecutarse; si ya está en marcha se avisa a sus callbacks (p. ej. para
+        # matar un proceso git) y sus resultados se descartan.
+        if self._cancelled.is_set():
+            return
+        self._cancelled.set()
+        if self.future is not None and self.future.cancel():
+            # No llegó a empezar: se da por terminada para sacarla de la lista
+            self.runner._queue.put((self, None, (False, TaskCancelled(self.description))))
+        for callback in list(self._cancel_callbacks):
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def add_cancel_callback(self, callback):
+        self._cancel_callbacks.append(callback)
+        if self.cancelled:
+            callback()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise TaskCancelled(self.description)
+
+    def report(self, callback, *args):
+        # Desde el worker: ejecutar callback(*args) en el hilo de la interfaz
+        self.runner._queue.put((self, callback, args))
+
+
+class TaskRunner:
+    # Ejecuta trabajo de red y git en un pool de hilos y devuelve los resultados
+    # al hilo de Tk a través de una cola que se vacía con master.after, así el
+    # mainloop nunca se bloquea.
+
+    def __init__(self, master, max_workers=8, poll_interval=50, error_handler=None):
+        self.master = master
+        self.poll_interval = poll_interval
+        self.error_handler = error_handler
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gitapp-task')
+        self._queue = queue.Queue()
+        self._in_flight = []
+        self._listeners = []
+        self._poll_id = None
+        self._closed = False
+
+    @property
+    def in_flight(self):
+        return list(self._in_flight)
+
+    def add_listener(self, callback):
+        # callback(tareas_en_curso) se llama en el hilo de Tk cada vez que cambia la lista
+        self._listeners.append(callback)
+
+    def submit(self, func, *args, on_success=None, on_error=None, description="", **kwargs):
+        task = Task(self, func, args, kwargs, on_success, on_error, description)
+        self._in_flight.append(task)
+        task.future = self._executor.submit(self._run, task)
+        self._notify()
+        self._schedule_poll()
+        return task
+
+    def cancel_all(self):
+        for task in list(self._in_flight):
+            task.cancel()
+
+    def shutdown(self):
+        self._closed = True
+        self.cancel_all()
+        if self._poll_id is not None:
+            try:
+                self.master.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, task):
+        _local.task = task
+        try:
+            if task.cancelled:
+                raise TaskCancelled(task.description)
+            # Cada tarea es una acción del usuario: sus peticiones y procesos git cuelgan de ella
+            with tracer.action(task.description):
+                result = task.func(*task.args, **task.kwargs)
+        except BaseException as e:
+            self._queue.put((task, None, (False, e)))
+        else:
+            self._queue.put((task, None, (True, result)))
+        finally:
+            _local.task = None
+
+    def _schedule_poll(self):
+        if self._poll_id is None and not self._closed:
+            self._poll_id = self.master.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        changed = False
+        while True:
+            try:
+                task, callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if callback is not None:
+                # Progreso intermedio reportado por el worker
+                if not task.cancelled:
+                    self._call(callback, *args)
+                continue
+
+            if task in self._in_flight:
+                self._in_flight.remove(task)
+                changed = True
+            if task.cancelled:
+                continue
+            ok, value = args
+            if ok:
+                if task.on_success is not None:
+                    self._call(task.on_success, value)
+            elif isinstance(value, TaskCancelled):
+                continue
+            elif task.on_error is not None:
+                self._call(task.on_error, value)
+            elif self.error_handler is not None:
+                self._call(self.error_handler, value)
+
+        if changed:
+            self._notify()
+        if self._in_flight or not self._queue.empty():
+            self._schedule_poll()
+
+    def _call(self, callback, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            # Un error en un callback no debe detener el vaciado de la cola
+            self.master.report_callback_exception(type(e), e, e.__traceback__)
+
+    def _notify(self):
+        for listener in self._listeners:
+            self._call(listener, self.in_flight)
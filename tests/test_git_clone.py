@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+import task_runner  # noqa: E402
+from bare_repos import make_bare_repo  # noqa: E402
+from git_clone import clone  # noqa: E402
+from task_runner import Task, TaskCancelled  # noqa: E402
+
+# upload-pack que tarda en responder: da tiempo a cancelar el clon en marcha
+SLOW_UPLOAD_PACK = '--upload-pack=sleep 3; git upload-pack'
+
+
+class CancelCloneTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.bare = make_bare_repo(os.path.join(self.tmp.name, 'origen.git'), files=5, commits=2, branches=0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def cancelled_clone(self, directory):
+        # Clona dentro de una tarea y la cancela al poco de empezar
+        task = Task(None, None, (), {}, None, None, "Clonado de prueba")
+        task_runner._local.task = task
+        timer = threading.Timer(0.5, task.cancel)
+        timer.start()
+        try:
+            with self.assertRaises(TaskCancelled):
+                clone(f'file://{self.bare}', directory, [SLOW_UPLOAD_PACK])
+        finally:
+            timer.cancel()
+            task_runner._local.task = None
+
+    def test_cancel_into_existing_directory_keeps_it(self):
+        directory = os.path.join(self.tmp.name, 'elegida')
+        os.mkdir(directory)
+        self.cancelled_clone(directory)
+        self.assertTrue(os.path.isdir(directory))
+        self.assertEqual(os.listdir(directory), [])
+
+    def test_cancel_into_new_directory_removes_it(self):
+        directory = os.path.join(self.tmp.name, 'nueva')
+        self.cancelled_clone(directory)
+        self.assertFalse(os.path.exists(directory))
+
+
+if __name__ == '__main__':
+    unittest.main()
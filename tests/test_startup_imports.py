@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from startup import HEAVY_MODULES  # noqa: E402
+
+LOADED = """
+import json, sys
+import GITApp
+print(json.dumps(sorted(sys.modules)))
+"""
+# Paquetes de HEAVY_MODULES (requests con sus adaptadores, GitPython, Pillow)
+# y los que arrastran: urllib3 y gitdb
+HEAVY_PACKAGES = set(HEAVY_MODULES) | {'urllib3', 'gitdb'}
+
+
+class StartupImportsTest(unittest.TestCase):
+    # Presupuesto de arranque: hasta la ventana del token no se importa nada
+    # pesado (ver benchmarks/check_startup_budget.py, que además mide tiempos)
+
+    def test_gitapp_import_does_not_load_heavy_modules(self):
+        output = subprocess.run([sys.executable, '-c', LOADED], cwd=ROOT, check=True,
+                                stdout=subprocess.PIPE, env=dict(os.environ, PYTHONPATH=ROOT)).stdout
+        loaded = json.loads(output)
+        heavy = [name for name in loaded if name.split('.')[0] in HEAVY_PACKAGES]
+        self.assertEqual(heavy, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,268 @@
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+from startup import LazyModule
+
+git_cmd = LazyModule('git.cmd')
+
+# Tramos que se conservan como mucho (los más antiguos se descartan)
+MAX_SPANS = 20000
+
+_CREDENTIALS = re.compile(r'://[^/@\s]+@')
+
+
+def redact(text):
+    # Las URL autenticadas de los remotos llevan el token: https://TOKEN@github.com/...
+    return _CREDENTIALS.sub('://***@', text)
+
+
+class Span:
+    # Un tramo medido: una acción del usuario, una petición HTTP o un proceso
+    # git. parent_id enlaza con el tramo que lo contiene (None en las acciones).
+
+    __slots__ = ('id', 'parent_id', 'name', 'category', 'thread_id', 'start', 'duration', 'args')
+
+    def __init__(self, span_id, parent_id, name, category, args):
+        self.id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.category = category
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        self.duration = None
+        self.args = args
+
+    def set(self, **args):
+        self.args.update(args)
+
+
+class _NullSpan:
+    # Lo que devuelve span() con el registro desactivado: no mide nada
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+
+    def __init__(self, tracer, span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self):
+        self.tracer._push(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None and 'error' not in self.span.args:
+            self.span.args['error'] = f"{exc_type.__name__}: {exc}"
+        self.tracer._pop(self.span)
+        return False
+
+
+class Tracer:
+    # Registro de tramos anidados por hilo. Desactivado (lo normal), span()
+    # sólo comprueba un atributo y devuelve NULL_SPAN. Los hilos de los pools
+    # internos no heredan el tramo en curso: las funciones que se les pasan
+    # se envuelven con propagate().
+
+    def __init__(self, max_spans=MAX_SPANS):
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self._spans = deque(maxlen=max_spans)
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._git_installed = False
+        self._open_processes = {}
+        self._listeners = []
+
+    def enable(self):
+        self.install_git()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def add_listener(self, callback):
+        # callback(tramo) al cerrarse cada tramo, desde el hilo que lo cierra
+        self._listeners.append(callback)
+
+    def spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def current(self):
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else None
+
+    def span(self, name, category, **args):
+        if not self.enabled:
+            return NULL_SPAN
+        parent = self.current()
+        return _ActiveSpan(self, Span(next(self._ids), parent.id if parent else None, name, category, args))
+
+    def action(self, description):
+        # Acción del usuario: raíz de los tramos que se hagan en su tarea
+        return self.span(description or "acción", 'accion')
+
+    def propagate(self, func):
+        # Para pasar a un pool: los tramos de func cuelgan del tramo actual
+        parent = self.current() if self.enabled else None
+        if parent is None:
+            return func
+
+        def run(*args, **kwargs):
+            stack = self._local.__dict__.setdefault('stack', [])
+            stack.append(parent)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stack.pop()
+        return run
+
+    def _push(self, span):
+        self._local.__dict__.setdefault('stack', []).append(span)
+
+    def _pop(self, span):
+        stack = self._local.stack
+        if stack and stack[-1] is span:
+            stack.pop()
+        self._finish(span)
+
+    def _finish(self, span):
+        span.duration = time.perf_counter() - span.start
+        with self._lock:
+            self._spans.append(span)
+        for listener in list(self._listeners):
+            try:
+                listener(span)
+            except Exception:
+                pass
+
+    # Procesos git
+
+    def install_git(self):
+        # Envuelve Git.execute (todos los comandos de GitPython) y, para los
+        # procesos que siguen en marcha al volver (clone, fetch con progreso),
+        # AutoInterrupt.wait, que es donde terminan. Los procesos persistentes
+        # (cat-file --batch, con istream) no terminan nunca: su tramo se
+        # cierra al arrancarlos. Sólo se instala al activar el registro la
+        # primera vez.
+        if self._git_installed:
+            return
+        self._git_installed = True
+        execute = git_cmd.Git.execute
+        auto_interrupt = git_cmd.Git.AutoInterrupt
+        wait = auto_interrupt.wait
+        delete = auto_interrupt.__del__
+        tracer = self
+
+        def traced_execute(git_self, command, *args, **kwargs):
+            if not tracer.enabled:
+                return execute(git_self, command, *args, **kwargs)
+            text = redact(command if isinstance(command, str) else ' '.join(str(part) for part in command))
+            parent = tracer.current()
+            span = Span(next(tracer._ids), parent.id if parent else None, text, 'git',
+                        {'command': text, 'cwd': git_self._working_dir})
+            try:
+                result = execute(git_self, command, *args, **kwargs)
+            except Exception as e:
+                span.args['status'] = getattr(e, 'status', None)
+                span.args['error'] = redact(str(e).strip().splitlines()[-1] if str(e).strip() else type(e).__name__)
+                tracer._finish(span)
+                raise
+            if isinstance(result, auto_interrupt):
+                if kwargs.get('istream') is not None:
+                    span.args['persistent'] = True
+                    tracer._finish(span)
+                    return result
+                # Se cierra en wait()
+                with tracer._lock:
+                    tracer._open_processes[id(result)] = span
+                return result
+            output = result[1] if isinstance(result, tuple) else result
+            span.args['status'] = result[0] if isinstance(result, tuple) else 0
+            span.args['bytes'] = len(output) if isinstance(output, (str, bytes)) else None
+            tracer._finish(span)
+            return result
+
+        def traced_wait(process, *args, **kwargs):
+            with tracer._lock:
+                span = tracer._open_processes.pop(id(process), None)
+            if span is None:
+                return wait(process, *args, **kwargs)
+            try:
+                status = wait(process, *args, **kwargs)
+            except Exception as e:
+                span.args['status'] = getattr(e, 'status', None)
+                span.args['error'] = redact(str(e).strip().splitlines()[-1] if str(e).strip() else type(e).__name__)
+                raise
+            else:
+                span.args['status'] = status
+            finally:
+                tracer._finish(span)
+            return status
+
+        def traced_del(process):
+            # Un proceso que se descarta sin wait() no deja su tramo abierto:
+            # otro objeto podría reutilizar el mismo id()
+            with tracer._lock:
+                tracer._open_processes.pop(id(process), None)
+            delete(process)
+
+        git_cmd.Git.execute = traced_execute
+        auto_interrupt.wait = traced_wait
+        auto_interrupt.__del__ = traced_del
+
+    # Exportación
+
+    def chrome_trace(self):
+        # Formato Trace Event (chrome://tracing, Perfetto): un evento completo
+        # ("ph": "X") por tramo, en microsegundos desde el arranque
+        events = []
+        pid = os.getpid()
+        for span in self.spans():
+            args = {key: value for key, value in span.args.items() if value is not None}
+            args['id'] = span.id
+            if span.parent_id is not None:
+                args['parent'] = span.parent_id
+            events.append({
+                'name': span.name,
+                'cat': span.category,
+                'ph': 'X',
+                'ts': round((span.start - self.origin) * 1e6, 1),
+                'dur': round(span.duration * 1e6, 1),
+                'pid': pid,
+                'tid': span.thread_id,
+                'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, default=str)
+
+
+# Registro compartido por toda la aplicación; GITAPP_TRACE=1 lo activa al arrancar
+tracer = Tracer()
+if os.environ.get('GITAPP_TRACE'):
+    tracer.enable()
@@ -0,0 +1,99 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualList(ttk.Frame):
+    # Lista con scroll que sólo crea botones para las filas visibles (más un
+    # pequeño margen) y los reutiliza al desplazarse. Cambiar los elementos
+    # (refrescar o filtrar) sólo actualiza el texto de esas filas, sin crear
+    # ni destruir widgets, así el coste no depende del número de repositorios.
+
+    def __init__(self, master, text=str, command=None, row_height=30, overscan=3, **kwargs):
+        super().__init__(master, **kwargs)
+        self.text = text
+        self.command = command
+        self.row_height = row_height
+        self.overscan = overscan
+        self.items = []
+        self._rows = []        # (id de la ventana en el canvas, botón)
+        self._row_items = []   # elemento mostrado por cada fila reutilizable
+        self._row_texts = []
+        self._width = 1
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, yscrollincrement=row_height)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", self._on_configure)
+        self._bind_mousewheel(self.canvas)
+
+    def set_items(self, items, reset_scroll=True):
+        self.items = items
+        if reset_scroll:
+            self.canvas.yview_moveto(0)
+        self.render()
+
+    def render(self):
+        height = max(self.canvas.winfo_height(), self.row_height)
+        self.canvas.configure(scrollregion=(0, 0, self._width, max(len(self.items) * self.row_height, height)))
+
+        top = self.canvas.canvasy(0)
+        first = max(int(top // self.row_height) - self.overscan, 0)
+        count = int(height // self.row_height) + 1 + 2 * self.overscan
+        last = min(first + count, len(self.items))
+        self._ensure_rows(count)
+
+        for slot, (window_id, button) in enumerate(self._rows):
+            index = first + slot
+            if index < last:
+                item = self.items[index]
+                text = self.text(item)
+                if self._row_texts[slot] != text:
+                    button.configure(text=text)
+                    self._row_texts[slot] = text
+                self._row_items[slot] = item
+                self.canvas.coords(window_id, 5, index * self.row_height + 2)
+            else:
+                # Fila sobrante: se aparta fuera de la zona visible
+                self._row_items[slot] = None
+                self.canvas.coords(window_id, 5, -2 * self.row_height)
+
+    def _ensure_rows(self, count):
+        while len(self._rows) < count:
+            slot = len(self._rows)
+            button = ttk.Button(self.canvas, command=lambda s=slot: self._on_click(s))
+            self._bind_mousewheel(button)
+            window_id = self.canvas.create_window(5, -2 * self.row_height, window=button, anchor="nw",
+                                                  width=max(self._width - 10, 1), height=self.row_height - 4)
+            self._rows.append((window_id, button))
+            self._row_items.append(None)
+            self._row_texts.append(None)
+
+    def _on_click(self, slot):
+        item = self._row_items[slot]
+        if item is not None and self.command:
+            self.command(item)
+
+    def _on_configure(self, event):
+        self._width = event.width
+        for window_id, _ in self._rows:
+            self.canvas.itemconfigure(window_id, width=max(event.width - 10, 1))
+        self.render()
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self.render()
+
+    def _bind_mousewheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_mousewheel)
+        widget.bind("<Button-4>", self._on_mousewheel)
+        widget.bind("<Button-5>", self._on_mousewheel)
+
+    def _on_mousewheel(self, event):
+        if getattr(event, 'num', None) == 4 or getattr(event, 'delta', 0) > 0:
+            self.canvas.yview_scroll(-1, "units")
+        else:
+            self.canvas.yview_scroll(1, "units")
+        self.render()
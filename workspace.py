@@ -0,0 +1,304 @@
+import configparser
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+# Directorios que nunca contienen clones y que harían el recorrido muy lento
+SKIPPED_DIRS = {'node_modules', '__pycache__', 'venv', '.venv', 'site-packages'}
+
+
+def full_name_from_url(url):
+    # 'owner/name' en minúsculas a partir de cualquier URL de remoto de GitHub:
+    # https://[token@]github.com/owner/name.git, git@github.com:owner/name.git,
+    # ssh://git@github.com/owner/name
+    url = url.strip()
+    if '://' in url:
+        path = urlparse(url).path
+    elif ':' in url:
+        path = url.split(':', 1)[1]
+    else:
+        return None
+    parts = [part for part in path.split('/') if part]
+    if len(parts) < 2:
+        return None
+    name = parts[-1]
+    if name.endswith('.git'):
+        name = name[:-4]
+    return f'{parts[-2]}/{name}'.lower()
+
+
+def git_dir(path):
+    # Directorio git de un clon: .git o, en worktrees y submódulos, el que
+    # indica el fichero .git ("gitdir: ...")
+    dot_git = os.path.join(path, '.git')
+    if os.path.isdir(dot_git):
+        return dot_git
+    try:
+        with open(dot_git, encoding='utf-8') as f:
+            line = f.readline().strip()
+    except OSError:
+        return None
+    if not line.startswith('gitdir:'):
+        return None
+    target = os.path.join(path, line[len('gitdir:'):].strip())
+    # Los worktrees comparten la configuración del repositorio principal
+    try:
+        with open(os.path.join(target, 'commondir'), encoding='utf-8') as f:
+            target = os.path.join(target, f.read().strip())
+    except OSError:
+        pass
+    return os.path.normpath(target)
+
+
+def read_remotes(config_path):
+    parser = configparser.ConfigParser(strict=False, interpolation=None)
+    try:
+        parser.read(config_path, encoding='utf-8')
+    except (configparser.Error, UnicodeDecodeError):
+        return []
+    names = []
+    for section in parser.sections():
+        if section.startswith('remote ') and parser.has_option(section, 'url'):
+            full_name = full_name_from_url(parser.get(section, 'url'))
+            if full_name and full_name not in names:
+                names.append(full_name)
+    return names
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _replace_clone(clones, path, clone):
+    # Se conserva la asociación elegida por el usuario (add_clone)
+    previous = clones.get(path)
+    if previous and previous.get('manual'):
+        clone['manual'] = previous['manual']
+    clones[path] = clone
+
+
+class WorkspaceIndex:
+    # Índice persistente de los clones locales bajo las carpetas de trabajo
+    # del usuario, asociados a los repositorios de GitHub por la URL de sus
+    # remotos. El recorrido inicial es paralelo y no entra en los
+    # repositorios encontrados; después refresh() sólo vuelve a listar los
+    # directorios cuyo mtime ha cambiado (se ha creado o borrado algo dentro).
+
+    def __init__(self, path=None, max_depth=4, max_workers=8):
+        self.path = path
+        self.max_depth = max_depth
+        self.max_workers = max_workers
+        self.roots = []
+        self._dirs = {}      # directorio recorrido -> (mtime, profundidad)
+        self._clones = {}    # ruta del clon -> {'config_mtime', 'remotes', 'manual'}
+        self._by_name = {}   # 'owner/name' -> [rutas]
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self.roots = data.get('roots', [])
+            self._dirs = {path: tuple(value) for path, value in data.get('dirs', {}).items()}
+            self._clones = data.get('clones', {})
+            self._rebuild_names()
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = {'roots': self.roots, 'dirs': self._dirs, 'clones': self._clones}
+            tmp_path = f'{self.path}.{threading.get_ident()}.tmp'
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                pass
+
+    def add_root(self, root):
+        root = os.path.abspath(root)
+        with self._lock:
+            if root in self.roots:
+                return False
+            self.roots.append(root)
+        return True
+
+    def path_for(self, repo):
+        # Primer clon del repositorio que sigue existiendo en disco
+        for path in self._by_name.get(repo['full_name'].lower(), ()):
+            if os.path.isdir(path):
+                return path
+        return None
+
+    def is_cloned(self, repo):
+        # Sin acceder al disco: se usa al pintar cada fila de la lista
+        return repo['full_name'].lower() in self._by_name
+
+    def clones(self):
+        # (ruta, 'owner/name' o None) de cada clon que sigue existiendo
+        with self._lock:
+            entries = sorted(self._clones.items())
+        result = []
+        for path, entry in entries:
+            if os.path.isdir(path):
+                names = entry.get('remotes') or []
+                result.append((path, entry.get('manual') or (names[0] if names else None)))
+        return result
+
+    def add_clone(self, path, full_name=None):
+        # Registra un clon elegido o creado desde la aplicación. Si se indica
+        # full_name queda asociado aunque sus remotos no apunten a GitHub.
+        path = os.path.abspath(path)
+        # Aún sin .git (se inicializará después): refresh() leerá sus remotos
+        # cuando aparezca el fichero de configuración
+        entry = self._read_clone(path) or {'config_path': os.path.join(path, '.git', 'config'),
+                                           'config_mtime': None, 'remotes': []}
+        if full_name:
+            entry['manual'] = full_name.lower()
+        with self._lock:
+            self._clones[path] = entry
+            self._rebuild_names()
+
+    def refresh(self):
+        # Actualización incremental; devuelve True si ha cambiado el índice
+        # El recorrido se hace sin el cerrojo sobre una copia; al final sólo
+        # se aplican sus cambios, para no perder un add_clone hecho mientras
+        with self._lock:
+            dirs = dict(self._dirs)
+            before = {path: dict(entry) for path, entry in self._clones.items()}
+            roots = list(self.roots)
+        clones = {path: dict(entry) for path, entry in before.items()}
+
+        changed = False
+        stale = []
+        for path, (mtime, depth) in list(dirs.items()):
+            current = _mtime(path)
+            if current is None:
+                dirs.pop(path)
+                changed = True
+            elif current != mtime:
+                stale.append((path, depth))
+        # Carpetas de trabajo añadidas desde el último recorrido
+        stale.extend((root, 0) for root in roots if root not in dirs)
+
+        for path, depth in list(stale):
+            clone = self._read_clone(path)
+            if clone is not None:
+                # Un directorio ya recorrido se ha convertido en clon (git
+                # init), o la carpeta de trabajo es ella misma un clon
+                stale.remove((path, depth))
+                previous = clones.get(path)
+                _replace_clone(clones, path, clone)
+                changed = changed or clones[path] != previous
+                for subdir in [d for d in dirs if d == path or d.startswith(path + os.sep)]:
+                    del dirs[subdir]
+                    changed = True
+
+        if stale:
+            # Sólo se recorren de nuevo los directorios modificados; los
+            # subdirectorios que ya estaban en el índice no se repiten
+            self._walk(stale, dirs, clones, known=set(dirs))
+            changed = True
+
+        for path, entry in list(clones.items()):
+            config_path = entry.get('config_path')
+            current = _mtime(config_path) if config_path else None
+            if current is None and not os.path.isdir(path):
+                del clones[path]
+                changed = True
+            elif current != entry.get('config_mtime'):
+                # Remotos cambiados (git remote add/set-url)
+                updated = self._read_clone(path)
+                if updated is not None:
+                    _replace_clone(clones, path, updated)
+                    changed = True
+
+        if changed:
+            with self._lock:
+                self._dirs = dirs
+                for path, entry in before.items():
+                    # Desaparecido del disco, salvo que se haya vuelto a registrar
+                    if path not in clones and self._clones.get(path) == entry:
+                        del self._clones[path]
+                for path, entry in clones.items():
+                    if before.get(path) != entry:
+                        _replace_clone(self._clones, path, entry)
+                self._rebuild_names()
+            self.save()
+        return changed
+
+    def _walk(self, frontier, dirs, clones, known=()):
+        # Recorrido en anchura: cada nivel se lista en paralelo
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while frontier:
+                next_frontier = []
+                for (path, depth), result in zip(frontier, pool.map(self._scan_dir, frontier)):
+                    if result is None:
+                        dirs.pop(path, None)
+                        continue
+                    mtime, found_clones, subdirs = result
+                    dirs[path] = (mtime, depth)
+                    for clone_path, clone in found_clones.items():
+                        _replace_clone(clones, clone_path, clone)
+                    if depth < self.max_depth:
+                        next_frontier.extend((subdir, depth + 1) for subdir in subdirs if subdir not in known)
+                frontier = next_frontier
+
+    def _scan_dir(self, item):
+        path, _ = item
+        mtime = _mtime(path)
+        if mtime is None:
+            return None
+        clones = {}
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.') or entry.name in SKIPPED_DIRS:
+                        continue
+                    try:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                    except OSError:
+                        continue
+                    clone = self._read_clone(entry.path)
+                    if clone is not None:
+                        # Un clon: no se desciende dentro de él
+                        clones[entry.path] = clone
+                    else:
+                        subdirs.append(entry.path)
+        except OSError:
+            return None
+        return mtime, clones, subdirs
+
+    def _read_clone(self, path):
+        directory = git_dir(path)
+        if directory is None:
+            return None
+        config_path = os.path.join(directory, 'config')
+        return {'config_path': config_path, 'config_mtime': _mtime(config_path),
+                'remotes': read_remotes(config_path)}
+
+    def _rebuild_names(self):
+        by_name = {}
+        for path, entry in sorted(self._clones.items()):
+            names = list(entry.get('remotes', []))
+            if entry.get('manual'):
+                names.insert(0, entry['manual'])
+            for full_name in names:
+                paths = by_name.setdefault(full_name, [])
+                if path not in paths:
+                    paths.append(path)
+        self._by_name = by_name